@@ -1,7 +1,7 @@
 import logging
 import MetaTrader5 as mt5
 from model.trades import Trade
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +61,8 @@ class MetatraderHandler:
         self.initialize_mt5()
         for i in range(trades_len):
             trade_details = trades[i] if len(trades) > 1 else trades[0]
-            trade_details['volume'] = volume
+            # Risk based sizing sets the volume, the default lot size applies otherwise
+            trade_details.setdefault('volume', volume)
             trade_id = self.open_trade(trade_details)
             if trade_id:
                 trade = Trade(
@@ -311,6 +312,52 @@ class MetatraderHandler:
             logger.error("Exception occurred while getting all positions: %s", e)
             return []
 
+    def get_account_info(self) -> Optional[Any]:
+        """
+        Get the account info, balance, equity and margin included.
+
+        Returns:
+            Optional[Any]: The account info if successful, None otherwise.
+        """
+        self.initialize_mt5()
+        account_info = mt5.account_info()
+        if account_info is None:
+            logger.error("Failed to get account info, error code = %s", mt5.last_error())
+        return account_info
+
+    def get_symbol_info(self, symbol: str) -> Optional[Any]:
+        """
+        Get the specification and the last prices of a symbol.
+
+        Args:
+            symbol (str): Trading symbol.
+
+        Returns:
+            Optional[Any]: The symbol info if the symbol is available, None otherwise.
+        """
+        self.initialize_mt5()
+        symbol_info = mt5.symbol_info(symbol)
+        if symbol_info is None:
+            logger.error(f"Symbol {symbol} not found.")
+        return symbol_info
+
+    def get_price(self, symbol: str, direction: str) -> Optional[float]:
+        """
+        Get the current price an order of the given direction would fill at.
+
+        Args:
+            symbol (str): Trading symbol.
+            direction (str): Trade direction (e.g., 'buy', 'sell').
+
+        Returns:
+            Optional[float]: The ask for a buy, the bid for a sell, None if the symbol has no tick.
+        """
+        self.initialize_mt5()
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            return None
+        return tick.ask if 'buy' in direction.lower() else tick.bid
+
     def get_account_balance(self) -> Optional[float]:
         """
         Get the current account balance.
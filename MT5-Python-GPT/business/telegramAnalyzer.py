@@ -3,9 +3,11 @@ from model.messages import Message
 from model.trade_updates import TradeUpdate
 import logging
 import re
+from functools import partial
 from typing import Dict, Any, Optional
 from telethon import TelegramClient, events
 from utility.utility import prefilter_message, extract_trade_data, create_trade_dicts
+from business.positionSizer import PositionSizer
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,8 @@ class TelegramAnalyzer:
         self.metatraderHandlers = metatraderHandlers
         self.dbHandler = dbHandler
         self.destination_chat_id = -1002404066652
+        # Risk based lot sizes, the default ones apply without RISK_PER_TRADE_PERCENT
+        self.sizer = PositionSizer(risk_percent=config.get('RISK_PER_TRADE_PERCENT'))
 
         # Telegram client setup
         self.client = TelegramClient(
@@ -101,7 +105,7 @@ class TelegramAnalyzer:
             db_message_id = self.dbHandler.insert_message(message)
             for mt_handler in self.metatraderHandlers:
                 parsed_text['account_id'] = mt_handler.account
-                trades = create_trade_dicts(parsed_text, db_message_id, self.config, "MT5")
+                trades = create_trade_dicts(parsed_text, db_message_id, self.config, "MT5", partial(self.sizer.lots, mt_handler))
                 trade_results = mt_handler.open_multiple_trades(trades, parsed_text['symbol'])
                 if trade_results:
                     for trade in trade_results:
@@ -97,6 +97,7 @@ class dbHandler:
 
             # Fetch the ID of the newly inserted record
             new_record_id = cursor.fetchone()[0]
+            message.mark_clean()
             logger.info(f"✅ Record added to 'messages' successfully with ID: {new_record_id}")
             return new_record_id  # Return the ID of the new record
 
@@ -135,7 +136,7 @@ class dbHandler:
             if record:
                 # If a record is found, log the success and create a Message instance
                 logger.info(f"✅ Message found with ID: {telegram_id} from chat: {chat_id}")
-                message = Message(id=record[0], telegram_id=record[1], timestamp=record[2], text=record[3], processed=record[4], chat_id=record[5])
+                message = Message.from_record(record)
                 return message
             else:
                 # If no record is found, log a warning and return None
@@ -152,7 +153,7 @@ class dbHandler:
 
     def update_message(self, update_data):
         """
-        Update the columns of a message dynamically based on the provided update data.
+        Update the modified columns of a message, nothing is sent to the database if none changed.
 
         Args:
             update_data (Message): An instance of the Message class containing updated data.
@@ -160,9 +161,12 @@ class dbHandler:
         Raises:
             Exception: If there is an error during the update operation.
         """
+        message_dict = update_data.changes()
+        if not message_dict:
+            logger.info(f"☑️ Message with ID {update_data.telegram_id} unchanged. No update made.")
+            return
         conn = self._connect()  # Establish connection
         cursor = conn.cursor()
-        message_dict = update_data.to_dict()
         # Dynamically create the SET clause and values tuple
         set_clause = ', '.join([f"{key} = %s" for key in message_dict.keys()])
         values = tuple(message_dict.values()) + (update_data.telegram_id, str(update_data.chat_id),)  # Add message_id as the last value for WHERE clause
@@ -179,6 +183,7 @@ class dbHandler:
             conn.commit()
 
             # Check if the update was successful (rows affected)
+            update_data.mark_clean()
             if cursor.rowcount > 0:
                 logger.info(f"✅ Message with ID {update_data.telegram_id} updated successfully.")
             else:
@@ -221,7 +226,7 @@ class dbHandler:
             if records:
                 logger.info("✅ Latest message and trade found.")
                 for record in records:
-                    trade = Trade(id=record[0], message_id=record[1], asset=record[2], type=record[3], entry=record[4], stop_loss=record[5], take_profit=record[6], status=record[7], break_even=record[8], order_id=record[9], volume=record[10], account_id=record[11])
+                    trade = Trade.from_record(record)
                     response.append(trade)
                 return response
             else:
@@ -263,6 +268,7 @@ class dbHandler:
 
             # Fetch the ID of the newly inserted record
             new_record_id = cursor.fetchone()[0]
+            trade.mark_clean()
             logger.info(f"✅ Record added to 'trades' successfully with ID: {new_record_id}")
             return new_record_id  # Return the ID of the new record
 
@@ -298,7 +304,7 @@ class dbHandler:
             if records:
                 logger.info(f"✅ Trade found with ID: {message_id}")
                 for record in records:
-                    trade = Trade(id=record[0], message_id=record[1], asset=record[2], type=record[3], entry=record[4], stop_loss=record[5], take_profit=record[6], status=record[7], break_even=record[8], order_id=record[9], volume=record[10], account_id=record[11])
+                    trade = Trade.from_record(record)
                     response.append(trade)
                 return response
             else:
@@ -333,7 +339,7 @@ class dbHandler:
             if records:
                 logger.info(f"✅ Trade found")
                 for record in records:
-                    trade = Trade(id=record[0], message_id=record[1], asset=record[2], type=record[3], entry=record[4], stop_loss=record[5], take_profit=record[6], status=record[7], break_even=record[8], order_id=record[9], volume=record[10], account_id=record[11])
+                    trade = Trade.from_record(record)
                     response.append(trade)
                 return response
             else:
@@ -389,7 +395,7 @@ class dbHandler:
 
     def update_trade(self, update_data):
         """
-        Update the columns of a trade dynamically based on the provided update data.
+        Update the modified columns of a trade, nothing is sent to the database if none changed.
 
         Args:
             update_data (Trade): An instance of the Trade class containing updated data.
@@ -397,9 +403,12 @@ class dbHandler:
         Raises:
             Exception: If there is an error during the update operation.
         """
+        trade_dict = update_data.changes()
+        if not trade_dict:
+            logger.info(f"☑️ Trade with ID {update_data.message_id} unchanged. No update made.")
+            return
         conn = self._connect()  # Establish connection
         cursor = conn.cursor()
-        trade_dict = update_data.to_dict()
         # Dynamically create the SET clause and values tuple
         set_clause = ', '.join([f"{key} = %s" for key in trade_dict.keys()])
         values = tuple(trade_dict.values()) + (update_data.id, update_data.message_id, str(update_data.order_id))  # Add message_id as the last value for WHERE clause
@@ -416,6 +425,7 @@ class dbHandler:
             conn.commit()
 
             # Check if the update was successful (rows affected)
+            update_data.mark_clean()
             if cursor.rowcount > 0:
                 logger.info(f"✅ Trade with ID {update_data.message_id} updated successfully.")
             else:
@@ -451,7 +461,7 @@ class dbHandler:
             if records:
                 logger.info(f"✅ Software Accounts found with environment: {env}")
                 for record in records:
-                    account = SoftwareAccounts(mt5_account_id=record[0], mt5_server=record[1], mt5_broker=record[2], mt5_balance=record[3], environment=record[4], telegram_id=record[5], telegram_phone=record[6], telegram_channels=record[7], telegram_session=record[8], mt5_password=record[9], telegram_hash=record[10])
+                    account = SoftwareAccounts.from_record(record)
                     response.append(account)
                 return response
             else:
@@ -20,7 +20,7 @@ CREATE TABLE IF NOT EXISTS trades (
     order_id TEXT,
     volume DOUBLE PRECISION,
     account_id INTEGER,
-    FOREIGN KEY (message_id) REFERENCES messages(id),
+    FOREIGN KEY (message_id) REFERENCES messages(id)
 );
 ---
 CREATE TABLE IF NOT EXISTS trade_updates (
@@ -1,17 +1,19 @@
-class Message():
-    def __init__(self, telegram_id: int, chat_id: str, timestamp: str, text: str, processed: bool, id: int = None):
-        self.id = id
-        self.telegram_id = telegram_id
-        self.chat_id = chat_id
-        self.timestamp = timestamp
-        self.text = text
-        self.processed = processed
+from dataclasses import dataclass
+from typing import ClassVar, Optional, Tuple
+from model.record import Record
 
-    def to_dict(self):
-        return {
-            'telegram_id': self.telegram_id,
-            'chat_id': str(self.chat_id),
-            'timestamp': self.timestamp,
-            'text': self.text,
-            'processed': self.processed
-        }
\ No newline at end of file
+
+@dataclass(slots=True)
+class Message(Record):
+    telegram_id: int
+    chat_id: str
+    timestamp: str
+    text: str
+    processed: bool
+    id: Optional[int] = None
+
+    COLUMNS: ClassVar[Tuple[str, ...]] = ('id', 'telegram_id', 'timestamp', 'text', 'processed', 'chat_id')
+    UPDATE_COLUMNS: ClassVar[Tuple[str, ...]] = ('telegram_id', 'chat_id', 'timestamp', 'text', 'processed')
+
+    def __post_init__(self):
+        self.chat_id = str(self.chat_id)
@@ -0,0 +1,56 @@
+from typing import Any, ClassVar, Dict, Optional, Sequence, Tuple
+
+
+class Record:
+    """
+    Base class for the database models.
+
+    Subclasses are slotted dataclasses that declare the table columns they map to, so rows can be
+    turned into instances (and instances back into column/value pairs) without positional indexing.
+    Instances keep the values last read from or written to the database, so updates only send the
+    columns that changed.
+    """
+    # Values of UPDATE_COLUMNS as stored in the database, see mark_clean().
+    __slots__ = ('_clean',)
+
+    # Columns of the table, in the order returned by the model queries.
+    COLUMNS: ClassVar[Tuple[str, ...]] = ()
+    # Columns written back by the dynamic UPDATE statements (primary key excluded).
+    UPDATE_COLUMNS: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def from_record(cls, record: Sequence, columns: Optional[Sequence[str]] = None):
+        """
+        Build an instance from a database row.
+
+        Args:
+            record (Sequence): The row returned by the cursor.
+            columns (Optional[Sequence[str]]): Column names of the row, defaults to COLUMNS.
+
+        Returns:
+            Record: A new instance of the model.
+        """
+        instance = cls(**dict(zip(columns or cls.COLUMNS, record)))
+        instance.mark_clean()
+        return instance
+
+    def to_dict(self):
+        return {column: getattr(self, column) for column in self.UPDATE_COLUMNS}
+
+    def mark_clean(self) -> None:
+        """Remember the current values of UPDATE_COLUMNS as the ones stored in the database."""
+        self._clean = tuple(getattr(self, column) for column in self.UPDATE_COLUMNS)
+
+    def changes(self) -> Dict[str, Any]:
+        """
+        Return the UPDATE_COLUMNS modified since the instance was loaded or last saved.
+
+        Returns:
+            Dict[str, Any]: The modified columns with their new value. Every column is reported for an
+                instance that was never loaded from (or saved to) the database.
+        """
+        clean = getattr(self, '_clean', None)
+        current = {column: getattr(self, column) for column in self.UPDATE_COLUMNS}
+        if clean is None:
+            return current
+        return {column: value for (column, value), old in zip(current.items(), clean) if value != old}
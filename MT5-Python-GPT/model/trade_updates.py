@@ -1,8 +1,16 @@
-class TradeUpdate():
-    def __init__(self, trade_id: int , update_text: str, new_value: int, order_id: str, account_id: int ,id: int = None):
-        self.trade_id = trade_id
-        self.update_text = update_text
-        self.new_value = new_value
-        self.order_id = order_id
-        self.id = id
-        self.account_id = account_id
+from dataclasses import dataclass
+from typing import ClassVar, Optional, Tuple
+from model.record import Record
+
+
+@dataclass(slots=True)
+class TradeUpdate(Record):
+    trade_id: int
+    update_text: str
+    new_value: int
+    order_id: str
+    account_id: int
+    id: Optional[int] = None
+
+    COLUMNS: ClassVar[Tuple[str, ...]] = ('id', 'trade_id', 'update_text', 'new_value', 'order_id', 'account_id')
+    UPDATE_COLUMNS: ClassVar[Tuple[str, ...]] = ('trade_id', 'update_text', 'new_value', 'order_id', 'account_id')
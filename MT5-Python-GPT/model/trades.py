@@ -1,40 +1,28 @@
-class Trade():
-    def __init__(self,
-                 message_id: int,
-                 asset: str,
-                 type: str,
-                 volume: float,
-                 stop_loss: float,
-                 take_profit: float,
-                 entry: float,
-                 break_even: float,
-                 order_id: str,
-                 status: str,
-                 account_id: int,
-                 id: str = None):
-        self.message_id = message_id
-        self.asset = asset
-        self.type = type
-        self.volume = volume
-        self.stop_loss = stop_loss
-        self.take_profit = take_profit
-        self.entry = entry
-        self.break_even = break_even
-        self.order_id = order_id
-        self.status = status
-        self.account_id = account_id
-        self.id = id
+from dataclasses import dataclass
+from typing import ClassVar, Optional, Tuple
+from model.record import Record
 
-    def to_dict(self):
-        return {
-            'asset': self.asset,
-            'type': self.type,
-            'volume': self.volume,
-            'stop_loss': self.stop_loss,
-            'take_profit': self.take_profit,
-            'entry': self.entry,
-            'break_even': self.break_even,
-            'status': self.status,
-            'account_id': self.account_id,
-            'order_id': self.order_id
-        }
\ No newline at end of file
+
+@dataclass(slots=True)
+class Trade(Record):
+    message_id: int
+    asset: str
+    type: str
+    volume: float
+    stop_loss: float
+    take_profit: float
+    entry: float
+    break_even: float
+    order_id: str
+    status: str
+    account_id: int
+    id: Optional[str] = None
+
+    COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'id', 'message_id', 'asset', 'type', 'entry', 'stop_loss', 'take_profit',
+        'status', 'break_even', 'order_id', 'volume', 'account_id'
+    )
+    UPDATE_COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'asset', 'type', 'volume', 'stop_loss', 'take_profit', 'entry',
+        'break_even', 'status', 'account_id', 'order_id'
+    )
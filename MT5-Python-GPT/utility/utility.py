@@ -19,7 +19,8 @@ def read_file(file_path: str) -> str:
         raise e_io
 
 def generate_broker_config(symbol, default_trades, lot_sizes, account):
-    lot_size = lot_sizes[0] if account.mt5_balance == 100000 else lot_sizes[1]
+    # Accounts of 100k and more use the first lot size, a balance of 100000.0 or 150000 is not a small account
+    lot_size = lot_sizes[0] if float(account.mt5_balance or 0) >= 100000 else lot_sizes[1]
 
     return {
         "symbol": symbol,
@@ -30,6 +31,8 @@ def generate_broker_config(symbol, default_trades, lot_sizes, account):
 def read_env_vars():
     config = {}
     config['ENV'] = os.environ.get('ENVIRONMENT')
+    # Percent of the equity risked per signal, the configured lot sizes apply when unset
+    config['RISK_PER_TRADE_PERCENT'] = float(os.environ['RISK_PER_TRADE_PERCENT']) if os.environ.get('RISK_PER_TRADE_PERCENT') else None
 
     config['DB'] = {
         'HOST': os.environ.get('DB_HOST'),
@@ -219,8 +222,15 @@ def extract_trade_data(message: str) -> Optional[Dict[str, Any]]:
         logger.error(f"❌ Error extracting trade data: {e}")
         return None
 
-def create_trade_dicts(trade_dict, message_id, config, mt_key):
-    """Create trade dictionaries from parsed trade data."""
+def create_trade_dicts(trade_dict, message_id, config, mt_key, size_lots=None):
+    """
+    Create trade dictionaries from parsed trade data.
+
+    Args:
+        size_lots: Computes the lots of each position from the risk of the signal, see PositionSizer.lots()
+            bound to the handler of the account. The default lot size of the symbol applies when it is None
+            or returns None.
+    """
     try:
         tps = trade_dict.get('take_profits', {})
         symbol_config = config[mt_key]['TRADE_MANAGEMENT'][trade_dict['symbol'].upper()]
@@ -264,6 +274,15 @@ def create_trade_dicts(trade_dict, message_id, config, mt_key):
                 }
                 trade_dicts.append(new_trade_dict)
 
+        if size_lots is not None:
+            # The risk of the signal is split between the positions opened for it
+            n_positions = max(len(trade_dicts), symbol_config['default_trades'])
+            volume = size_lots(symbol_config['symbol'], trade_dict['direction'], trade_dict['entry_price'],
+                               trade_dict.get('stop_loss'), n_positions, symbol_config.get('risk_percent'))
+            if volume:
+                for new_trade_dict in trade_dicts:
+                    new_trade_dict['volume'] = volume
+
         return trade_dicts
     except Exception as e:
         logger.error(f"❌ Error creating trade dictionaries: {e}")
@@ -0,0 +1,206 @@
+import logging
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set
+from business.riskEngine import RiskEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DrawdownRules:
+    """Loss rules of a prop-firm account, in percent of its initial balance. None disables a rule."""
+    daily_loss_percent: Optional[float] = None
+    max_drawdown_percent: Optional[float] = None
+    # Share of a limit used at which new orders are blocked, and at which every position is closed.
+    block_at: float = 0.8
+    flatten_at: float = 0.95
+
+
+# Rules of the brokers of the account configurations; Vantage is a retail broker without loss rules.
+PROP_FIRM_RULES: Dict[str, DrawdownRules] = {
+    'ftmo': DrawdownRules(daily_loss_percent=5.0, max_drawdown_percent=10.0),
+    'fundingpips': DrawdownRules(daily_loss_percent=5.0, max_drawdown_percent=10.0),
+}
+
+
+def rules_for_broker(broker: str, settings: Dict[str, Any]) -> Optional[DrawdownRules]:
+    """
+    Resolve the drawdown rules of an account.
+
+    Args:
+        broker (str): The broker of the account, e.g. 'ftmo'.
+        settings (Dict[str, Any]): The DRAWDOWN settings of the configuration, their values override the
+            rules of the broker.
+
+    Returns:
+        Optional[DrawdownRules]: The rules, None if the account is not monitored.
+    """
+    if not settings.get('ENABLED', True):
+        return None
+    overrides = {
+        field: settings.get(key) for field, key in (
+            ('daily_loss_percent', 'DAILY_LOSS_PERCENT'),
+            ('max_drawdown_percent', 'MAX_DRAWDOWN_PERCENT'),
+            ('block_at', 'BLOCK_AT'),
+            ('flatten_at', 'FLATTEN_AT'),
+        ) if settings.get(key) is not None
+    }
+    rules = replace(PROP_FIRM_RULES.get((broker or '').lower(), DrawdownRules()), **overrides)
+    if rules.daily_loss_percent is None and rules.max_drawdown_percent is None:
+        return None
+    return rules
+
+
+class _EquityTracker:
+    """Equity of an account, from the balance at the start of the day, the deals of the day and the open positions."""
+    __slots__ = ('initial_balance', 'day', 'day_start_balance', 'realized', 'floating', 'seen', 'last_deal_time',
+                 'state', 'daily_breached', 'max_breached')
+
+    def __init__(self, initial_balance: Optional[float]) -> None:
+        self.initial_balance = initial_balance
+        self.day = None
+        self.day_start_balance = 0.0
+        self.realized = 0.0
+        self.floating = 0.0
+        # Tickets of the deals of the day already added to realized
+        self.seen: Set[int] = set()
+        self.last_deal_time = 0
+        self.state = 'ok'
+        self.daily_breached = False
+        self.max_breached = False
+
+    @property
+    def equity(self) -> float:
+        return self.day_start_balance + self.realized + self.floating
+
+
+class DrawdownMonitor:
+    def __init__(self, risk_engine: RiskEngine) -> None:
+        """
+        Initialize the real-time drawdown monitor of the prop-firm accounts.
+
+        Every poll() reads the positions snapshot and only the deals closed since the previous poll, so
+        the equity of the day is aggregated incrementally: balance at the start of the day, plus the
+        realized PnL of the deals of the day, plus the floating PnL of the open positions. The daily
+        loss is measured from the start of the day balance and the drawdown from the initial balance,
+        both against limits in percent of the initial balance, as the prop firms do.
+
+        When a limit is used at rules.block_at, new orders are rejected by the risk engine; at
+        rules.flatten_at every position is closed at once and the account stays blocked until the next
+        day, or for good after a max drawdown breach. The day rolls over at midnight UTC.
+
+        Args:
+            risk_engine (RiskEngine): The pre-trade checks of the accounts, used to block the new orders.
+        """
+        self.risk_engine = risk_engine
+        self.flattened = 0
+        self._trackers: Dict[int, _EquityTracker] = {}
+
+    def poll(self, mt_handler: Any, rules: DrawdownRules, initial_balance: Optional[float] = None) -> str:
+        """
+        Update the equity of an account and act on its rules, called on the broker thread.
+
+        Args:
+            mt_handler (Any): The handler of the account, logged in, see MetatraderHandler.
+            rules (DrawdownRules): The loss rules of the account.
+            initial_balance (Optional[float]): The size of the account, the balance at the first poll if None.
+
+        Returns:
+            str: The state of the account, 'ok', 'blocked' or 'flattened'.
+        """
+        account = mt_handler.account
+        tracker = self._trackers.get(account)
+        if tracker is None:
+            tracker = self._trackers[account] = _EquityTracker(float(initial_balance) if initial_balance else None)
+        if tracker.day != datetime.now(timezone.utc).date():
+            if not self._start_day(mt_handler, tracker):
+                return tracker.state
+        else:
+            self._add_deals(tracker, mt_handler.get_deals(datetime.fromtimestamp(tracker.last_deal_time, timezone.utc)))
+        positions = mt_handler.get_positions_snapshot()
+        tracker.floating = sum(position.profit + position.swap for position in positions.values())
+
+        usage, reason = self._usage(tracker, rules)
+        if usage >= rules.flatten_at:
+            if positions:
+                self._flatten(mt_handler, positions, reason)
+            tracker.daily_breached = True
+            # The drawdown from the initial balance does not recover with the day
+            tracker.max_breached = tracker.max_breached or reason.startswith('drawdown')
+        if tracker.daily_breached or tracker.max_breached:
+            tracker.state = 'flattened'
+            self.risk_engine.block(account, f"drawdown limit reached, {reason}")
+        elif usage >= rules.block_at:
+            tracker.state = 'blocked'
+            self.risk_engine.block(account, f"drawdown limit approaching, {reason}")
+        else:
+            tracker.state = 'ok'
+            self.risk_engine.unblock(account)
+        return tracker.state
+
+    def metrics(self) -> Dict[int, Dict[str, Any]]:
+        """Return, by account, the equity, the daily loss, the drawdown and the state."""
+        return {
+            account: {
+                'equity': round(tracker.equity, 2),
+                'daily_loss': round(tracker.day_start_balance - tracker.equity, 2),
+                'drawdown': round((tracker.initial_balance or 0.0) - tracker.equity, 2),
+                'state': tracker.state,
+            }
+            for account, tracker in list(self._trackers.items())
+        }
+
+    def _start_day(self, mt_handler: Any, tracker: _EquityTracker) -> bool:
+        # Seeded once a day from the balance and the deals since midnight, then kept up to date by the new deals only
+        balance = mt_handler.get_account_balance()
+        if balance is None:
+            # A failed account_info() is not a zero balance, the day is started again at the next poll
+            logger.warning(f"⚠️ Balance of account {mt_handler.account} not available, drawdown check skipped")
+            return False
+        midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        tracker.day = midnight.date()
+        tracker.realized = 0.0
+        tracker.seen.clear()
+        tracker.last_deal_time = int(midnight.timestamp())
+        tracker.daily_breached = False
+        self._add_deals(tracker, mt_handler.get_deals(midnight))
+        tracker.day_start_balance = balance - tracker.realized
+        if tracker.initial_balance is None:
+            tracker.initial_balance = tracker.day_start_balance
+        logger.info(f"✅ Drawdown monitor of account {mt_handler.account}: day start balance {tracker.day_start_balance:.2f}, "
+                    f"initial balance {tracker.initial_balance:.2f}")
+        return True
+
+    @staticmethod
+    def _add_deals(tracker: _EquityTracker, deals: list) -> None:
+        for deal in deals:
+            if deal.ticket in tracker.seen:
+                continue
+            tracker.seen.add(deal.ticket)
+            tracker.realized += deal.profit + deal.commission + deal.swap
+            # The history is queried again from this second, the tickets already seen are skipped
+            tracker.last_deal_time = max(tracker.last_deal_time, int(deal.time))
+
+    @staticmethod
+    def _usage(tracker: _EquityTracker, rules: DrawdownRules):
+        usages = []
+        equity = tracker.equity
+        if not tracker.initial_balance or tracker.initial_balance <= 0:
+            return 0.0, "no initial balance"
+        if rules.daily_loss_percent:
+            limit = tracker.initial_balance * rules.daily_loss_percent / 100
+            loss = tracker.day_start_balance - equity
+            usages.append((loss / limit, f"daily loss {loss:.2f} of {limit:.2f}"))
+        if rules.max_drawdown_percent:
+            limit = tracker.initial_balance * rules.max_drawdown_percent / 100
+            drawdown = tracker.initial_balance - equity
+            usages.append((drawdown / limit, f"drawdown {drawdown:.2f} of {limit:.2f}"))
+        return max(usages) if usages else (0.0, "no loss rule")
+
+    def _flatten(self, mt_handler: Any, positions: Dict[int, Any], reason: str) -> None:
+        logger.error(f"❌ {reason} on account {mt_handler.account}, closing {len(positions)} positions")
+        outcome = mt_handler.close_positions(list(positions), positions)
+        self.flattened += len(outcome['done'])
+        if outcome['failed']:
+            logger.error(f"❌ Positions {list(outcome['failed'])} of account {mt_handler.account} not closed, retrying at the next poll")
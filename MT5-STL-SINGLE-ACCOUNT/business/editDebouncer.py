@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EditDebouncer:
+    def __init__(self, callback: Callable[..., Awaitable[Any]], window: float = 2.0) -> None:
+        """
+        Initialize the coalescer of the message edits.
+
+        The first edit of a message opens a window; the edits received until it closes replace each
+        other, and only the latest one is passed to the callback.
+
+        Args:
+            callback (Callable[..., Awaitable[Any]]): The coroutine function called with the latest edit.
+            window (float): Seconds the edits of a message are collected before the callback runs.
+        """
+        self.callback = callback
+        self.window = window
+        self.received = 0
+        self.dispatched = 0
+        self._pending: Dict[Hashable, Tuple] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, key: Hashable, *args: Any) -> None:
+        """
+        Register an edit.
+
+        Args:
+            key (Hashable): The identity of the edited message, e.g. (chat ID, message ID).
+            *args (Any): The arguments of the callback, replacing those of the previous edits.
+        """
+        self.received += 1
+        if key not in self._pending:
+            asyncio.get_running_loop().call_later(self.window, self._dispatch, key)
+        self._pending[key] = args
+
+    def metrics(self) -> Dict[str, int]:
+        """Return the number of edits received, dispatched, pending and dropped as superseded."""
+        return {
+            'received': self.received,
+            'dispatched': self.dispatched,
+            'pending': len(self._pending),
+            'coalesced': self.received - self.dispatched - len(self._pending),
+        }
+
+    async def drain(self) -> None:
+        """Dispatch the pending edits without waiting for their window and wait for the callbacks."""
+        for key in list(self._pending):
+            self._dispatch(key)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _dispatch(self, key: Hashable) -> None:
+        # The timer of an edit already dispatched by drain() finds nothing to do.
+        if key not in self._pending:
+            return
+        args = self._pending.pop(key)
+        self.dispatched += 1
+        task = asyncio.create_task(self.callback(*args))
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ Error dispatching message edit: {task.exception()}")
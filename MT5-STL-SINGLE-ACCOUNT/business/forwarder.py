@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Set, Tuple
+from telethon import errors
+from business.tgSessionPool import TelegramSessionPool
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int) -> None:
+        """
+        Initialize a token bucket limiting the requests sent to a chat.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (int): Maximum number of tokens, i.e. the allowed burst.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for a token, and for the end of a flood wait if one is in progress."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def block(self, seconds: float) -> None:
+        """Hold every request for a flood wait, the bucket restarts empty."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self._updated = self._blocked_until
+
+
+class BatchForwarder:
+    def __init__(self, sessions: TelegramSessionPool, window: float = 0.25, max_batch: int = 100,
+                 rate: float = 20 / 60, burst: int = 5, max_retries: int = 3) -> None:
+        """
+        Initialize the forwarder of the source messages to their destination channels.
+
+        Messages of the same source chat for the same destination submitted within the window are
+        forwarded with a single forward_messages call. Each destination has its own token bucket, and a
+        flood wait holds the destination for the time requested by Telegram before retrying.
+
+        Args:
+            sessions (TelegramSessionPool): The Telegram sessions, the one owning the source chat forwards.
+            window (float): Seconds a batch stays open for more messages.
+            max_batch (int): Number of messages that closes a batch right away (Telegram accepts 100).
+            rate (float): Forward requests per second allowed per destination.
+            burst (int): Forward requests allowed in a burst per destination.
+            max_retries (int): Flood waits tolerated for a batch before giving up.
+        """
+        self.sessions = sessions
+        self.window = window
+        self.max_batch = max_batch
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.batches = 0
+        self.forwarded = 0
+        self.flood_waits = 0
+        self.failed = 0
+        self._pending: Dict[Tuple[int, int], List[Tuple[Any, asyncio.Future]]] = {}
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, chat_id: int, destination: int, message: Any) -> asyncio.Future:
+        """
+        Queue a message to forward.
+
+        Args:
+            chat_id (int): The chat ID the message comes from.
+            destination (int): The chat ID the message is forwarded to.
+            message (Any): The Telethon message.
+
+        Returns:
+            asyncio.Future: Resolved with the forwarded message, or None if the forward failed.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (chat_id, destination)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            loop.call_later(self.window, self._flush, key, batch)
+        batch.append((message, future))
+        if len(batch) >= self.max_batch:
+            self._flush(key, batch)
+        return future
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the forwarding counters, with the average number of messages per forward call."""
+        return {
+            'batches': self.batches,
+            'forwarded': self.forwarded,
+            'messages_per_batch': self.forwarded / self.batches if self.batches else 0.0,
+            'pending': sum(len(batch) for batch in self._pending.values()),
+            'flood_waits': self.flood_waits,
+            'failed': self.failed,
+        }
+
+    async def drain(self) -> None:
+        """Send the open batches right away and wait for every forward in progress."""
+        for key, batch in list(self._pending.items()):
+            self._flush(key, batch)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _flush(self, key: Tuple[int, int], batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        # The timer of a batch closed early by max_batch must not flush the next one.
+        if self._pending.get(key) is not batch:
+            return
+        del self._pending[key]
+        task = asyncio.create_task(self._send(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key: Tuple[int, int], batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        chat_id, destination = key
+        bucket = self._buckets.setdefault(destination, TokenBucket(self.rate, self.burst))
+        messages = [message for message, _ in batch]
+        forwarded = [None] * len(batch)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            try:
+                forwarded = await self.sessions.forward(chat_id, destination, messages)
+                self.batches += 1
+                self.forwarded += len(messages)
+                break
+            except errors.FloodWaitError as e:
+                self.flood_waits += 1
+                bucket.block(e.seconds)
+                if attempt == self.max_retries:
+                    self.failed += len(messages)
+                    logger.error(f"❌ Forward of {len(messages)} messages to {destination} dropped after {attempt + 1} flood waits")
+            except Exception as e:
+                self.failed += len(messages)
+                logger.error(f"❌ Error forwarding {len(messages)} messages to {destination}: {e}")
+                break
+        # Telegram returns the forwarded messages in the order of the ids sent.
+        for (_, future), forwarded_message in zip(batch, forwarded):
+            if not future.done():
+                future.set_result(forwarded_message)
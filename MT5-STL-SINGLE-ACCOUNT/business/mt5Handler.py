@@ -1,11 +1,16 @@
 import logging
+import time
 import MetaTrader5 as mt5
+from datetime import datetime, timedelta, timezone
 from data.trade import Trade
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
 class MetatraderHandler:
+    # Retcodes of a request sent at a price that moved, requote, price changed and off quotes
+    STALE_PRICE_RETCODES = (10004, 10020, 10021)
+
     def __init__(self, account: int, password: str, server: str):
         """
         Initialize the MetaTrader handler.
@@ -199,24 +204,23 @@ class MetatraderHandler:
             return None
 
     """
-    def update_trade_break_even(self, order_id, new_sl: Optional[float] = None):
+    def update_trade_break_even(self, order_id, new_sl: Optional[float] = None, positions: Optional[Dict[int, Any]] = None):
         """
         Update the stop loss to break even for a given trade.
 
         Args:
             order_id (int): The ID of the trade to update.
             new_sl (Optional[float]): New stop loss value, defaults to the entry price if not provided.
+            positions (Optional[Dict[int, Any]]): Snapshot from get_positions_snapshot() to reuse instead of querying MT5.
 
         Returns:
             Optional[float]: The new stop loss value if successful, None otherwise.
         """
 
-        position = mt5.positions_get(ticket=int(order_id))
-        if not position:
-            logger.error(f"Position with trade ID {order_id} not found.")
+        position = self.get_position(order_id, positions)
+        if position is None:
             return None
 
-        position = position[0]
         stoploss = new_sl if new_sl is not None else position.price_open
 
         request = {
@@ -233,7 +237,7 @@ class MetatraderHandler:
                 logger.error(f"Failed to update stoploss/takeprofit for trade ID {order_id}, retcode = {result.retcode if result else 'None'}")
                 if result.retcode == 10016:  # Invalid stop loss
                     logger.error(f"Invalid stop loss value for trade ID {order_id}.")
-                    self.close_trade(order_id)
+                    self.close_trade(order_id, positions)
                 return None
             else:
                 logger.info(f"Stoploss/Takeprofit updated for trade ID {order_id}")
@@ -242,7 +246,7 @@ class MetatraderHandler:
             logger.error(f"Exception occurred while updating stoploss/takeprofit for trade ID {order_id}: {e}")
             return None
 
-    def update_trade(self, order_id, new_sl: Optional[float] = None, new_tps: Optional[float] = None) -> None:
+    def update_trade(self, order_id, new_sl: Optional[float] = None, new_tps: Optional[float] = None, positions: Optional[Dict[int, Any]] = None) -> None:
         """
         Update stop loss and take profit for a trade.
 
@@ -250,15 +254,14 @@ class MetatraderHandler:
             order_id (int): The ID of the trade to update.
             new_sl (Optional[float]): New stop loss value.
             new_tps (Optional[float]): New take profit value.
+            positions (Optional[Dict[int, Any]]): Snapshot from get_positions_snapshot() to reuse instead of querying MT5.
         """
 
 
-        position = mt5.positions_get(ticket=int(order_id))
-        if not position:
-            logger.error(f"Position with trade ID {order_id} not found.")
+        position = self.get_position(order_id, positions)
+        if position is None:
             return None
 
-        position = position[0]
         stoploss = new_sl if new_sl is not None else position.sl
         takeprofits = new_tps if new_tps is not None else position.tp
 
@@ -279,24 +282,23 @@ class MetatraderHandler:
         except Exception as e:
             logger.error(f"Exception occurred while updating stoploss/takeprofit for trade ID {order_id}: {e}")
 
-    def close_trade(self, order_id: int) -> Optional[int]:
+    def close_trade(self, order_id: int, positions: Optional[Dict[int, Any]] = None) -> Optional[int]:
         """
         Close a trade based on the provided order ID.
 
         Args:
             order_id (int): The ID of the trade to close.
+            positions (Optional[Dict[int, Any]]): Snapshot from get_positions_snapshot() to reuse instead of querying MT5.
 
         Returns:
             Optional[int]: The result code of the close operation if successful, None otherwise.
         """
 
 
-        position = mt5.positions_get(ticket=int(order_id))
-        if not position:
-            logger.error(f"Position with trade ID {order_id} not found.")
+        position = self.get_position(order_id, positions)
+        if position is None:
             return None
 
-        position = position[0]
         request = {
             "action": mt5.TRADE_ACTION_DEAL,
             "symbol": position.symbol,
@@ -320,6 +322,184 @@ class MetatraderHandler:
             logger.error(f"Exception occurred while closing trade ID {order_id}: {e}")
             return None
 
+    def close_positions(self, tickets: List[int], positions: Optional[Dict[int, Any]] = None,
+                        volumes: Optional[Dict[int, float]] = None) -> Dict[str, Any]:
+        """
+        Close several positions back-to-back, in full or in part.
+
+        The positions come from one snapshot and the prices from one tick per symbol, every request is
+        built before the first is sent. A request refused for a stale price is sent once more at a fresh tick.
+
+        Args:
+            tickets (List[int]): The tickets of the positions to close.
+            positions (Optional[Dict[int, Any]]): Snapshot from get_positions_snapshot() to reuse, taken here if None.
+            volumes (Optional[Dict[int, float]]): Volume to close by ticket, the whole position for the tickets not in it.
+
+        Returns:
+            Dict[str, Any]: 'done' the closed tickets, 'failed' the tickets not closed mapped to their retcode
+            (None if the position is not open or the request raised), 'seconds' the wall time of the batch.
+        """
+        start = time.perf_counter()
+        positions = positions if positions is not None else self.get_positions_snapshot()
+        ticks, requests, failed = {}, {}, {}
+        for ticket in tickets:
+            position = self.get_position(ticket, positions)
+            if position is None:
+                failed[int(ticket)] = None
+                continue
+            if position.symbol not in ticks:
+                ticks[position.symbol] = mt5.symbol_info_tick(position.symbol)
+            requests[int(ticket)] = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": position.symbol,
+                "volume": (volumes or {}).get(int(ticket), position.volume),
+                "type": mt5.ORDER_TYPE_SELL if position.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY,
+                "position": int(ticket),
+                "price": self._close_price(position, ticks[position.symbol]),
+                "magic": 0,
+                "comment": "Close trade",
+                "type_filling": mt5.ORDER_FILLING_IOC,
+            }
+        done = self._send_batch(requests, failed, positions)
+        seconds = time.perf_counter() - start
+        logger.info(f"{len(done)}/{len(tickets)} positions closed in {seconds:.3f} seconds.")
+        return {'done': done, 'failed': failed, 'seconds': seconds}
+
+    def modify_positions(self, modifications: List[Tuple[int, Optional[float], Optional[float]]],
+                         positions: Optional[Dict[int, Any]] = None) -> Dict[str, Any]:
+        """
+        Change the stop loss and take profit of several positions back-to-back.
+
+        Args:
+            modifications (List[Tuple[int, Optional[float], Optional[float]]]): (ticket, stop loss, take profit)
+                of every position, None keeps the current level.
+            positions (Optional[Dict[int, Any]]): Snapshot from get_positions_snapshot() to reuse, taken here if None.
+
+        Returns:
+            Dict[str, Any]: 'done' the modified tickets, 'failed' the tickets not modified mapped to their retcode
+            (None if the position is not open or the request raised), 'seconds' the wall time of the batch.
+        """
+        start = time.perf_counter()
+        positions = positions if positions is not None else self.get_positions_snapshot()
+        requests, failed = {}, {}
+        for ticket, new_sl, new_tp in modifications:
+            position = self.get_position(ticket, positions)
+            if position is None:
+                failed[int(ticket)] = None
+                continue
+            requests[int(ticket)] = {
+                "action": mt5.TRADE_ACTION_SLTP,
+                "symbol": position.symbol,
+                "sl": float(new_sl if new_sl is not None else position.sl),
+                "tp": float(new_tp if new_tp is not None else position.tp),
+                "position": int(ticket),
+            }
+        done = self._send_batch(requests, failed)
+        seconds = time.perf_counter() - start
+        logger.info(f"{len(done)}/{len(modifications)} positions modified in {seconds:.3f} seconds.")
+        return {'done': done, 'failed': failed, 'seconds': seconds}
+
+    def break_even_positions(self, tickets: List[int], new_sl: Optional[float] = None,
+                             positions: Optional[Dict[int, Any]] = None) -> Dict[str, Any]:
+        """
+        Move the stop loss of several positions to break even back-to-back, see update_trade_break_even().
+
+        Args:
+            tickets (List[int]): The tickets of the positions.
+            new_sl (Optional[float]): New stop loss value, defaults to the entry price of each position.
+            positions (Optional[Dict[int, Any]]): Snapshot from get_positions_snapshot() to reuse, taken here if None.
+
+        Returns:
+            Dict[str, Any]: The outcome of modify_positions(), with 'levels' the stop loss sent for each ticket.
+        """
+        positions = positions if positions is not None else self.get_positions_snapshot()
+        levels = {}
+        for ticket in tickets:
+            position = self.get_position(ticket, positions)
+            if position is not None:
+                levels[int(ticket)] = float(new_sl if new_sl is not None else position.price_open)
+        outcome = self.modify_positions([(ticket, stoploss, None) for ticket, stoploss in levels.items()], positions)
+        # A position whose break even is refused as an invalid stop is closed, as update_trade_break_even() does
+        invalid = [ticket for ticket, retcode in outcome['failed'].items() if retcode == 10016]
+        if invalid:
+            logger.error(f"Invalid stop loss value for trade IDs {invalid}.")
+            self.close_positions(invalid, positions)
+        outcome['levels'] = levels
+        return outcome
+
+    def _send_batch(self, requests: Dict[int, Dict[str, Any]], failed: Dict[int, Optional[int]],
+                    positions: Optional[Dict[int, Any]] = None) -> List[int]:
+        done = []
+        for ticket, request in requests.items():
+            try:
+                result = mt5.order_send(request)
+                if result is not None and positions is not None and result.retcode in self.STALE_PRICE_RETCODES:
+                    # The tick of the batch is stale, a close is retried once at the current price
+                    request["price"] = self._close_price(positions[ticket], mt5.symbol_info_tick(request["symbol"]))
+                    result = mt5.order_send(request)
+                if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                    logger.error(f"Request on trade ID {ticket} failed, retcode = {result.retcode if result else 'None'}")
+                    failed[ticket] = result.retcode if result else None
+                else:
+                    done.append(ticket)
+            except Exception as e:
+                logger.error(f"Exception occurred while sending the request on trade ID {ticket}: {e}")
+                failed[ticket] = None
+        return done
+
+    @staticmethod
+    def _close_price(position: Any, tick: Any) -> float:
+        if tick is None:
+            return 0.0
+        return tick.bid if position.type == mt5.ORDER_TYPE_BUY else tick.ask
+
+    def get_positions_snapshot(self, strict: bool = False) -> Optional[Dict[int, Any]]:
+        """
+        Get every open position with a single positions_get() call.
+
+        The snapshot is meant to be taken once per signal and passed to update_trade,
+        update_trade_break_even and close_trade so that each trade does not query MT5 again.
+
+        Args:
+            strict (bool): Return None instead of an empty snapshot if the call fails, for the callers
+                that read a missing position as a closed one.
+
+        Returns:
+            Optional[Dict[int, Any]]: Mapping of position ticket to the MT5 position record
+            (price_open, sl, tp, volume, type, symbol, ...). Empty, or None if strict, if the call fails.
+        """
+        failed = None if strict else {}
+        try:
+            positions = mt5.positions_get()
+            if positions is None:
+                logger.error("No positions found, error code = %s", mt5.last_error())
+                return failed
+            return {position.ticket: position for position in positions}
+        except Exception as e:
+            logger.error("Exception occurred while getting the positions snapshot: %s", e)
+            return failed
+
+    def get_position(self, order_id: int, positions: Optional[Dict[int, Any]] = None) -> Optional[Any]:
+        """
+        Get a single open position, from the given snapshot when available.
+
+        Args:
+            order_id (int): The ticket of the position.
+            positions (Optional[Dict[int, Any]]): Snapshot from get_positions_snapshot(), if any.
+
+        Returns:
+            Optional[Any]: The MT5 position record, or None if the position is not open.
+        """
+        if positions is not None:
+            position = positions.get(int(order_id))
+        else:
+            position = mt5.positions_get(ticket=int(order_id))
+            position = position[0] if position else None
+
+        if position is None:
+            logger.error(f"Position with trade ID {order_id} not found.")
+        return position
+
     def get_all_position(self) -> List[int]:
         """
         Get all open positions.
@@ -342,6 +522,112 @@ class MetatraderHandler:
             logger.error("Exception occurred while getting all positions: %s", e)
             return []
 
+    def get_symbol_value(self, symbol: str) -> Optional[float]:
+        """
+        Get the money gained or lost by one lot of a symbol for a price move of 1.0.
+
+        Args:
+            symbol (str): Trading symbol.
+
+        Returns:
+            Optional[float]: The tick value divided by the tick size, None if the symbol is not available.
+        """
+        symbol_info = mt5.symbol_info(symbol)
+        if symbol_info is None or not symbol_info.trade_tick_size:
+            logger.error(f"Symbol {symbol} not found, its value per lot is unknown.")
+            return None
+        return symbol_info.trade_tick_value / symbol_info.trade_tick_size
+
+    def get_price(self, symbol: str, direction: str) -> Optional[float]:
+        """
+        Get the current price an order of the given direction would fill at.
+
+        Args:
+            symbol (str): Trading symbol.
+            direction (str): Trade direction (e.g., 'buy', 'sell').
+
+        Returns:
+            Optional[float]: The ask for a buy, the bid for a sell, None if the symbol has no tick.
+        """
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            return None
+        return tick.ask if 'buy' in direction.lower() else tick.bid
+
+    def get_realized_profit(self, since: datetime) -> float:
+        """
+        Get the PnL of the deals closing positions since the given time, commissions and swaps included.
+
+        Args:
+            since (datetime): Start of the period.
+
+        Returns:
+            float: The realized PnL, 0.0 if the history is not available.
+        """
+        deals = mt5.history_deals_get(since, datetime.now(timezone.utc) + timedelta(days=1))
+        if deals is None:
+            logger.error("Failed to get the deals history, error code = %s", mt5.last_error())
+            return 0.0
+        return sum(deal.profit + deal.commission + deal.swap for deal in deals if deal.entry != mt5.DEAL_ENTRY_IN)
+
+    def get_deals(self, since: datetime) -> List[Any]:
+        """
+        Get the buy and sell deals since the given time, deposits and withdrawals excluded.
+
+        Args:
+            since (datetime): Start of the period.
+
+        Returns:
+            List[Any]: The deals, empty if the history is not available.
+        """
+        deals = mt5.history_deals_get(since, datetime.now(timezone.utc) + timedelta(days=1))
+        if deals is None:
+            logger.error("Failed to get the deals history, error code = %s", mt5.last_error())
+            return []
+        return [deal for deal in deals if deal.type in (mt5.DEAL_TYPE_BUY, mt5.DEAL_TYPE_SELL)]
+
+    def get_closed_profit(self, order_id: int) -> Optional[float]:
+        """
+        Get the realized PnL of a closed position, commissions and swaps included.
+
+        Args:
+            order_id (int): The ticket of the position.
+
+        Returns:
+            Optional[float]: The PnL of the deals of the position, None if the history is not available.
+        """
+        deals = mt5.history_deals_get(position=int(order_id))
+        if not deals:
+            return None
+        return sum(deal.profit + deal.commission + deal.swap for deal in deals)
+
+    def get_account_info(self) -> Optional[Any]:
+        """
+        Get the account info, balance, equity and margin included.
+
+        Returns:
+            Optional[Any]: The account info if successful, None otherwise.
+        """
+        account_info = mt5.account_info()
+        if account_info is None:
+            logger.error("Failed to get account info, error code = %s", mt5.last_error())
+        return account_info
+
+    def get_symbol_info(self, symbol: str) -> Optional[Any]:
+        """
+        Get the specification and the last prices of a symbol.
+
+        Args:
+            symbol (str): Trading symbol.
+
+        Returns:
+            Optional[Any]: The symbol info if the symbol is available, None otherwise.
+        """
+        symbol_info = mt5.symbol_info(symbol)
+        if symbol_info is None:
+            logger.error(f"Symbol {symbol} not found.")
+        return symbol_info
+
     def get_account_balance(self) -> Optional[float]:
         """
         Get the current account balance.
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Priority classes of the queued messages, lower runs first.
+PRIORITY_CREATE = 0
+PRIORITY_CLOSE = 1
+PRIORITY_BE = 2
+PRIORITY_EDIT = 3
+PRIORITY_NOISE = 4
+PRIORITY_NAMES = ('create', 'close', 'be', 'edit', 'noise')
+
+# extract_trade_data() message type -> priority class.
+MESSAGE_TYPE_PRIORITIES = {'create': PRIORITY_CREATE, 'close': PRIORITY_CLOSE, 'update': PRIORITY_BE}
+
+
+def classify_message(parsed_text: Optional[Dict[str, Any]], edited: bool = False) -> int:
+    """
+    Return the priority class of a Telegram message.
+
+    Args:
+        parsed_text (Optional[Dict[str, Any]]): The result of extract_trade_data(), None if the message
+            did not pass the prefilter.
+        edited (bool): Whether the message is an edit of an earlier one.
+
+    Returns:
+        int: One of the PRIORITY_* classes.
+    """
+    if edited:
+        return PRIORITY_EDIT
+    if parsed_text is None:
+        return PRIORITY_NOISE
+    return MESSAGE_TYPE_PRIORITIES.get(parsed_text['message_type'], PRIORITY_NOISE)
+
+
+class _Channel:
+    """Pending messages of a channel, and the number of them being processed."""
+    __slots__ = ('signals', 'noise', 'in_flight')
+
+    def __init__(self) -> None:
+        self.signals: Deque[Tuple] = deque()
+        self.noise: Deque[Tuple] = deque()
+        self.in_flight = 0
+
+    def head(self) -> Optional[Tuple]:
+        if self.signals:
+            return self.signals[0]
+        return self.noise[0] if self.noise else None
+
+
+class SignalQueue:
+    def __init__(self, workers: int = 4, channel_limit: int = 1, channel_limits: Optional[Dict[int, int]] = None,
+                 metrics_interval: float = 60.0) -> None:
+        """
+        Initialize the ingest queue between the Telegram callbacks and the trade execution.
+
+        Across channels the message with the best priority class (create > close > BE > edit > noise) runs
+        first, so an entry signal is never stuck behind a backlog of updates of other channels. Within a
+        channel the signals keep their arrival order, as a BE or close without a reply applies to the
+        latest signal of the channel; noise never holds back the signals of its channel.
+
+        Args:
+            workers (int): Number of messages processed concurrently.
+            channel_limit (int): Default number of messages of a channel processed concurrently.
+            channel_limits (Optional[Dict[int, int]]): Chat ID -> concurrency cap, overriding the default.
+            metrics_interval (float): Seconds between two metrics log lines, 0 to disable them.
+        """
+        self.workers = workers
+        self.channel_limit = channel_limit
+        self.channel_limits = channel_limits or {}
+        self.metrics_interval = metrics_interval
+        self._channels: Dict[int, _Channel] = {}
+        self._cond = asyncio.Condition()
+        self._seq = 0
+        self._tasks = []
+        self._enqueued = [0] * len(PRIORITY_NAMES)
+        self._processed = [0] * len(PRIORITY_NAMES)
+        self._failed = [0] * len(PRIORITY_NAMES)
+        self._wait_total = [0.0] * len(PRIORITY_NAMES)
+        self._wait_max = [0.0] * len(PRIORITY_NAMES)
+
+    def start(self) -> None:
+        """Start the workers on the running event loop, unless they are already running."""
+        if any(not task.done() for task in self._tasks):
+            return
+        self._tasks = [asyncio.create_task(self._worker(), name=f"signal-worker-{i}") for i in range(self.workers)]
+        if self.metrics_interval:
+            self._tasks.append(asyncio.create_task(self._report(), name="signal-metrics"))
+
+    async def drain(self, timeout: float = 30.0) -> bool:
+        """
+        Wait until the queued signals are processed and no message is in flight.
+
+        Queued noise is not waited for. The workers keep running, call stop() afterwards.
+
+        Args:
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            bool: True if the queue was drained, False if the timeout expired first.
+        """
+        deadline = time.monotonic() + timeout
+        while any(state.signals or state.in_flight for state in self._channels.values()):
+            if time.monotonic() >= deadline:
+                logger.warning(f"⚠️ Signal queue not drained after {timeout}s")
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def stop(self) -> None:
+        """Cancel the workers, the messages still queued are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def put(self, channel: int, priority: int, handler: Callable[..., Awaitable[Any]], *args: Any,
+                  channel_priority: int = 0) -> None:
+        """
+        Queue a message for processing.
+
+        Args:
+            channel (int): The chat ID the message comes from.
+            priority (int): One of the PRIORITY_* classes, see classify_message().
+            handler (Callable[..., Awaitable[Any]]): The coroutine function processing the message.
+            *args (Any): The arguments passed to the handler.
+            channel_priority (int): Priority of the channel, lower runs first among messages of the same class.
+        """
+        async with self._cond:
+            self._seq += 1
+            item = (priority, channel_priority, self._seq, channel, time.monotonic(), handler, args)
+            state = self._channels.setdefault(channel, _Channel())
+            (state.noise if priority == PRIORITY_NOISE else state.signals).append(item)
+            self._enqueued[priority] += 1
+            self._cond.notify()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return the queue metrics.
+
+        Returns:
+            Dict[str, Any]: 'classes' maps each priority class to its queued, enqueued, processed and failed
+                counts and its average and maximum wait in seconds; 'channels' maps each chat ID to its
+                queued and in flight counts.
+        """
+        queued = [0] * len(PRIORITY_NAMES)
+        channels = {}
+        for channel, state in self._channels.items():
+            for item in (*state.signals, *state.noise):
+                queued[item[0]] += 1
+            channels[channel] = {'queued': len(state.signals) + len(state.noise), 'in_flight': state.in_flight}
+        classes = {
+            name: {
+                'queued': queued[priority],
+                'enqueued': self._enqueued[priority],
+                'processed': self._processed[priority],
+                'failed': self._failed[priority],
+                'avg_wait': self._wait_total[priority] / self._processed[priority] if self._processed[priority] else 0.0,
+                'max_wait': self._wait_max[priority],
+            }
+            for priority, name in enumerate(PRIORITY_NAMES)
+        }
+        return {'classes': classes, 'channels': channels}
+
+    def _next(self) -> Optional[Tuple]:
+        best = None
+        for channel, state in self._channels.items():
+            head = state.head()
+            if head is None or state.in_flight >= self.channel_limits.get(channel, self.channel_limit):
+                continue
+            if best is None or head[:3] < best[:3]:
+                best = head
+        if best is not None:
+            state = self._channels[best[3]]
+            (state.signals if state.signals and state.signals[0] is best else state.noise).popleft()
+            state.in_flight += 1
+        return best
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._cond:
+                item = self._next()
+                while item is None:
+                    await self._cond.wait()
+                    item = self._next()
+            priority, _, _, channel, enqueued_at, handler, args = item
+            wait = time.monotonic() - enqueued_at
+            self._wait_total[priority] += wait
+            self._wait_max[priority] = max(self._wait_max[priority], wait)
+            try:
+                await handler(*args)
+            except Exception as e:
+                self._failed[priority] += 1
+                logger.error(f"❌ Error processing {PRIORITY_NAMES[priority]} message of channel {channel}: {e}")
+            finally:
+                self._processed[priority] += 1
+                async with self._cond:
+                    self._channels[channel].in_flight -= 1
+                    self._cond.notify()
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            classes = self.metrics()['classes']
+            summary = ", ".join(
+                f"{name} {stats['queued']} queued / {stats['processed']} done / {stats['max_wait']:.2f}s max wait"
+                for name, stats in classes.items() if stats['enqueued']
+            )
+            if summary:
+                logger.info(f"☑️ Signal queue: {summary}")
@@ -0,0 +1,145 @@
+import asyncio
+import inspect
+import logging
+import signal
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _SupervisedTask:
+    """A coroutine function run by the supervisor, and its restart state."""
+    __slots__ = ('name', 'factory', 'restart', 'task', 'restarts', 'last_error', 'started_at')
+
+    def __init__(self, name: str, factory: Callable[[], Awaitable[Any]], restart: bool) -> None:
+        self.name = name
+        self.factory = factory
+        self.restart = restart
+        self.task: Optional[asyncio.Task] = None
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+        self.started_at: Optional[float] = None
+
+
+class TaskSupervisor:
+    def __init__(self, backoff_initial: float = 1.0, backoff_max: float = 60.0, stable_after: float = 60.0,
+                 shutdown_timeout: float = 30.0) -> None:
+        """
+        Initialize the supervisor of the tasks of the single asyncio runtime.
+
+        Every task is restarted when it fails or returns, after a delay doubled on each consecutive
+        failure; a task that ran for stable_after seconds starts again from the initial delay. On
+        SIGINT/SIGTERM the shutdown hooks run in registration order, e.g. to drain the orders in flight,
+        then the tasks are cancelled and awaited.
+
+        Args:
+            backoff_initial (float): Seconds before the first restart of a task.
+            backoff_max (float): Maximum seconds between two restarts.
+            stable_after (float): Seconds of run after which the restart delay is reset.
+            shutdown_timeout (float): Seconds each shutdown hook may take before the next one runs.
+        """
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.shutdown_timeout = shutdown_timeout
+        self._tasks: Dict[str, _SupervisedTask] = {}
+        self._hooks: List[Callable[[], Any]] = []
+        self._stop: Optional[asyncio.Event] = None
+
+    def add(self, name: str, factory: Callable[[], Awaitable[Any]], restart: bool = True) -> None:
+        """
+        Register a task, started by run().
+
+        Args:
+            name (str): The task name, used in the logs and the metrics.
+            factory (Callable[[], Awaitable[Any]]): The coroutine function run by the task.
+            restart (bool): Whether the task is restarted when it fails or returns.
+        """
+        self._tasks[name] = _SupervisedTask(name, factory, restart)
+
+    def on_shutdown(self, hook: Callable[[], Any]) -> None:
+        """Register a function or coroutine function called on shutdown, before the tasks are cancelled."""
+        self._hooks.append(hook)
+
+    def request_stop(self) -> None:
+        """Start the graceful shutdown."""
+        if self._stop is not None:
+            self._stop.set()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Return the state of every task, by task name."""
+        return {
+            name: {
+                'running': entry.task is not None and not entry.task.done(),
+                'restarts': entry.restarts,
+                'last_error': entry.last_error,
+            }
+            for name, entry in self._tasks.items()
+        }
+
+    async def run(self) -> None:
+        """Run the tasks until a stop is requested, then shut down gracefully."""
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows event loops have no signal handlers, Ctrl+C cancels the main task instead.
+                pass
+        for entry in self._tasks.values():
+            entry.task = asyncio.create_task(self._supervise(entry), name=entry.name)
+        logger.info(f"✅ Supervisor started {len(self._tasks)} tasks: {', '.join(self._tasks)}")
+        try:
+            await self._stop.wait()
+        except asyncio.CancelledError:
+            logger.warning("⚠️ Supervisor cancelled, shutting down")
+        finally:
+            await self.shutdown()
+
+    async def cancel(self, name: str) -> None:
+        """Cancel a task and wait for it, it is not restarted."""
+        entry = self._tasks[name]
+        if entry.task is not None:
+            entry.task.cancel()
+            await asyncio.gather(entry.task, return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """Run the shutdown hooks, then cancel the tasks and wait for them."""
+        for hook in self._hooks:
+            try:
+                result = hook()
+                if inspect.isawaitable(result):
+                    await asyncio.wait_for(result, self.shutdown_timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"❌ Shutdown hook {getattr(hook, '__qualname__', hook)} timed out after {self.shutdown_timeout}s")
+            except Exception as e:
+                logger.error(f"❌ Error in shutdown hook {getattr(hook, '__qualname__', hook)}: {e}")
+        tasks = [entry.task for entry in self._tasks.values() if entry.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("✅ Supervisor stopped")
+
+    async def _supervise(self, entry: _SupervisedTask) -> None:
+        delay = self.backoff_initial
+        while True:
+            entry.started_at = time.monotonic()
+            try:
+                await entry.factory()
+                entry.last_error = None
+                logger.warning(f"⚠️ Task {entry.name} returned")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                entry.last_error = f"{type(e).__name__}: {e}"
+                logger.error(f"❌ Task {entry.name} failed: {entry.last_error}")
+            if not entry.restart:
+                return
+            if time.monotonic() - entry.started_at >= self.stable_after:
+                delay = self.backoff_initial
+            logger.info(f"☑️ Restarting task {entry.name} in {delay:g} seconds...")
+            await asyncio.sleep(delay)
+            entry.restarts += 1
+            delay = min(delay * 2, self.backoff_max)
@@ -1,140 +1,257 @@
-from telethon.tl.types import PeerChannel
 from data.trade import Trade
 from data.tg_message import Message
 from data.tradeUpdate import TradeUpdate
+import asyncio
 import logging
 import re
-from typing import Dict, Any, Optional
-from telethon import TelegramClient, events
+from functools import partial
+from typing import Dict, Any, List, Optional, Set
+from telethon import events
 from data.dbHandler import dbHandler
+from data.configService import ConfigService
+from data.journal import SignalJournal
+from data.channelRoute import ChannelRoute
+from business.signalQueue import SignalQueue, classify_message
+from business.tgSessionPool import TelegramSessionPool
+from business.entityCache import EntityCache
+from business.forwarder import BatchForwarder
+from business.editDebouncer import EditDebouncer
+from business.brokerWorker import BrokerWorker
 from business.mt5Handler import MetatraderHandler
-from utility.utility_tg import prefilter_message, extract_trade_data, create_trade_entries
+from business.riskEngine import RiskEngine
+from business.positionSizer import PositionSizer
+from business.tpLadder import TpLadder
+from utility.utility_tg import prefilter_message, parse_message, create_trade_entries, diff_trade_levels
 
 logger = logging.getLogger(__name__)
 
 class TelegramAnalyzer:
-    def __init__(self, config: Dict[str, Any],db_handler: dbHandler, mt5_handler: MetatraderHandler) -> None:
+    def __init__(self, config: Dict[str, Any],db_handler: dbHandler, mt5_handler: MetatraderHandler, config_service: Optional[ConfigService] = None, journal: Optional[SignalJournal] = None, signal_queue: Optional[SignalQueue] = None, entity_cache: Optional[EntityCache] = None, edit_window: float = 2.0, broker: Optional[BrokerWorker] = None, risk_engine: Optional[RiskEngine] = None, sizer: Optional[PositionSizer] = None, ladder: Optional[TpLadder] = None, default_dst_chat_id: Optional[int] = None) -> None:
         """Initialize the Telegram handler."""
-        self.config = config
+        self._config = config
+        self.account_id = config["mt5_account_id"]
+        self.config_service = config_service
         self.db_handler = db_handler
-        self.gold_dst_chat_id = -1002404066652
-        self.index_dst_chat_id = -1002535578509
-        # Telegram client setup
-        self.client = TelegramClient(
-            config["tg_session"],
+        # Writes go through the journal when given, so handling a signal never waits on the database
+        self.writer = journal if journal is not None else db_handler
+        # The Telegram callbacks only classify the messages, they are processed by priority from this queue
+        self.signal_queue = signal_queue if signal_queue is not None else SignalQueue()
+        # Routing of the source channels, loaded once when there is no configuration service to keep it current
+        self._routes = None if config_service is not None else {route.chat_id: route for route in db_handler.get_channel_routes()}
+        # Forward destination of the subscribed channels without a channel_route row, None to ignore them
+        self.default_dst_chat_id = default_dst_chat_id
+        self._default_routes: Dict[int, ChannelRoute] = {}
+        # Telegram sessions setup, tg_session holds comma separated session names sharing the source channels
+        self.sessions = TelegramSessionPool(
+            [session.strip() for session in config["tg_session"].split(",")],
             config["tg_id"],
             config["tg_hash"],
-            timeout=10,
-            retry_delay=5,
-            request_retries=10
+            config["tg_phone"],
+            config["tg_channels"],
+            entity_cache
         )
         self.mt5_handler = mt5_handler
         self.mt5_handler.initialize_mt5()
+        # Every MetaTrader 5 call runs on the broker thread, the event loop only waits for the result
+        self.broker = broker if broker is not None else BrokerWorker()
+        # Pre-trade limits of the account, None to send the orders unchecked
+        self.risk_engine = risk_engine
+        # Risk based lot sizes, None to keep the configured ones
+        self.sizer = sizer
+        # Partial closes of one position per signal at its take profits, None to open one position per take profit
+        self.ladder = ladder
+
+        # Forwards are submitted from the Telegram callbacks, so a burst of a channel is sent as one batch
+        self.forwarder = BatchForwarder(self.sessions)
+        # Forwarded IDs waiting for their batch, stored off the queue worker so a slow forward never holds a channel
+        self._forward_tasks: Set[asyncio.Task] = set()
+        # Channels edit a signal several times in a row, only the latest edit within the window is processed
+        self.edit_debouncer = EditDebouncer(self.dispatch_edit, edit_window)
 
         # Register event handlers
-        self.client.on(events.NewMessage(chats=config["tg_channels"]))(self.handle_new_message)
-        self.client.on(events.MessageEdited(chats=config["tg_channels"]))(self.handle_edited_message)
+        self.sessions.on(events.NewMessage, self.handle_new_message)
+        self.sessions.on(events.MessageEdited, self.handle_edited_message)
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Account configuration, read from the live snapshot of the configuration service when available."""
+        if self.config_service is not None:
+            return self.config_service.get_account_config(self.account_id) or self._config
+        return self._config
+
+    def get_route(self, chat_id: int) -> Optional[ChannelRoute]:
+        """Return the routing of an enabled source channel, None if the channel is not routed or disabled."""
+        route = self.config_service.get_channel_route(chat_id) if self.config_service is not None else self._routes.get(chat_id)
+        if route is None and self.default_dst_chat_id is not None and chat_id in self.config["tg_channels"]:
+            # Subscribed channels are routed to the default destination until they get a channel_route row
+            route = self.default_route(chat_id)
+        if route is None or not route.enabled:
+            logger.warning(f"⚠️ No enabled route for chat {chat_id}, message ignored")
+            return None
+        return route
+
+    def default_route(self, chat_id: int) -> ChannelRoute:
+        """Return the routing of a subscribed channel without a channel_route row, logged on its first message."""
+        if chat_id not in self._default_routes:
+            logger.warning(f"⚠️ No route for chat {chat_id}, forwarded to the default destination")
+            self._default_routes[chat_id] = ChannelRoute(chat_id=chat_id, dst_chat_id=self.default_dst_chat_id)
+        return self._default_routes[chat_id]
 
     async def start(self) -> None:
-        """Start the Telegram client."""
-        await self.client.connect()
-        if not await self.client.is_user_authorized():
-            await self.client.send_code_request(self.config["tg_phone"])
-            await self.client.sign_in(self.config["tg_phone"], input("Enter the code: "))
-        logger.info("✅ Telegram client started!")
-        await self.client.run_until_disconnected()
+        """Start the Telegram sessions."""
+        routes = self.config_service.snapshot.routes if self.config_service is not None else self._routes
+        preload = [route.dst_chat_id for route in routes.values()]
+        if self.default_dst_chat_id is not None:
+            preload.append(self.default_dst_chat_id)
+        self.signal_queue.start()
+        await self.sessions.run(preload=preload)
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Process the pending edits and the queued signals, send the open forward batches, then disconnect."""
+        await self.edit_debouncer.drain()
+        await self.signal_queue.drain(timeout)
+        await self.forwarder.drain()
+        await asyncio.gather(*self._forward_tasks, return_exceptions=True)
+        await self.signal_queue.stop()
+        await self.sessions.disconnect()
 
     # Forexeprt free_  -1001187867079
 
     async def get_all_chats(self) -> None:
         """Retrieve and print all chats."""
-        dialogs = await self.client.get_dialogs()
+        dialogs = await self.sessions.sessions[0].client.get_dialogs()
         for dialog in dialogs:
             logger.info(f"Chat Name: {dialog.name}, Chat ID: {dialog.id}")
 
     async def get_messages_by_id(self,  chat_id: int, limit: int):
+        client = self.sessions.session_for(chat_id).client
         if isinstance(chat_id, int):
-            entity = await self.client.get_entity(PeerChannel(chat_id))
+            entity = await self.sessions.get_input_peer(chat_id)
         else:
-            entity = await self.client.get_entity(chat_id)
+            entity = await client.get_entity(chat_id)
 
         messages = []
-        async for message in self.client.iter_messages(entity, limit=limit):
+        async for message in client.iter_messages(entity, limit=limit):
             messages.append(message)
 
         return messages
 
     async def handle_new_message(self, event: events.NewMessage.Event) -> None:
+        self.sessions.record(event.chat_id)
+        route = self.get_route(event.chat_id)
+        if route is None:
+            return
+        msg_raw_text = event.message.message
+        msg_parsed_text = parse_message(msg_raw_text, route.parser_profile) if prefilter_message(msg_raw_text) else None
+        forwarded = self.forwarder.submit(event.chat_id, route.dst_chat_id, event.message) if msg_parsed_text is not None else None
+        await self.signal_queue.put(event.chat_id, classify_message(msg_parsed_text), self.process_new_message, event, route, msg_parsed_text, forwarded, channel_priority=route.priority)
+
+    async def handle_edited_message(self, event: events.NewMessage.Event) -> None:
+        self.sessions.record(event.chat_id)
+        route = self.get_route(event.chat_id)
+        if route is None:
+            return
+        self.edit_debouncer.submit((event.chat_id, event.message.id), event, route)
+
+    async def dispatch_edit(self, event: events.NewMessage.Event, route: ChannelRoute) -> None:
+        self.forwarder.submit(event.chat_id, route.dst_chat_id, event.message)
+        await self.signal_queue.put(event.chat_id, classify_message(None, edited=True), self.process_edited_message, event, route, channel_priority=route.priority)
+
+    async def process_new_message(self, event: events.NewMessage.Event, route: ChannelRoute, msg_parsed_text: Optional[Dict[str, Any]], forwarded: Optional[asyncio.Future]) -> None:
         msg_raw_text = event.message.message
-        msg_src_chl_name = event.chat.title
+        msg_src_chl_name = route.name or getattr(event.chat, 'title', None) or str(event.chat_id)
         msg_reply_id = event.message.reply_to_msg_id if event.message.is_reply else None
-        msg_dst_id = self.config["dst_channel_gold"] if msg_src_chl_name == "Pips Exchange (FX & Gold VIP)" else self.config["dst_channel_index"]
+        msg_dst_id = route.dst_chat_id
 
-        if not prefilter_message(msg_raw_text):
+        if msg_parsed_text is None:
             logger.error(f"❌ Invalid message: {msg_raw_text}")
             return
 
-        forwarded_message = await self.client.forward_messages(msg_dst_id, event.message)
+        if not route.allows(self.account_id):
+            logger.info(f"☑️ Signals of chat {event.chat_id} are not traded on account {self.account_id}")
+            return
 
         db_message = Message(
             tg_msg_id=event.message.id,
             tg_chat_id=event.chat_id,
             tg_src_chat_name=msg_src_chl_name,
-            tg_dst_msg_id=int(forwarded_message.id),
+            tg_dst_msg_id=None,
             tg_dst_chat_id=msg_dst_id,
             msg_body=msg_raw_text,
             msg_status="new",
             msg_timestamp=event.message.date
         )
 
-        msg_parsed_text = extract_trade_data(msg_raw_text)
         if msg_parsed_text['message_type'] == 'create':
-            self.create_new_signal_trade(msg_parsed_text, db_message)
+            await self.broker.call(self.create_new_signal_trade, msg_parsed_text, db_message)
         elif msg_parsed_text['message_type'] == 'update':
             logger.info(f'📝 New trade signal to put the position in break even: {msg_parsed_text}')
-            if msg_reply_id:
-                replied_message = self.db_handler.get_message_by_id(msg_reply_id, event.chat_id)
-                trades_to_update = self.db_handler.get_trades_by_id(replied_message.msg_id)
-            else:
-                trades_to_update = self.db_handler.get_open_trades_based_on_src_tg_chat(tg_src_chat_name=msg_src_chl_name)
-            trade_update_response = self.update_signal_trade_be(trades_to_update, msg_parsed_text, msg_raw_text)
-            if trade_update_response:
-                self.db_handler.insert_trade_update(trade_update_response)
+            trades_to_update = await asyncio.to_thread(self.get_signal_trades, event.chat_id, msg_reply_id)
+            # The handler stores the trades and their BE updates itself
+            await self.broker.call(self.update_signal_trade_be, trades_to_update, msg_parsed_text, msg_raw_text)
         elif msg_parsed_text['message_type']  == 'close':
-            if msg_reply_id:
-                replied_message = self.db_handler.get_message_by_id(msg_reply_id, event.chat_id)
-                trades_to_close = self.db_handler.get_trades_by_id(replied_message.msg_id)
-            else:
-                trades_to_close = self.db_handler.get_open_trades_based_on_src_tg_chat(tg_src_chat_name=msg_src_chl_name)
-            self.close_signal_trade(msg_parsed_text, msg_raw_text, trades_to_close)
-    async def handle_edited_message(self, event: events.NewMessage.Event) -> None:
-        msg_raw_edited_text = event.message.message
-        msg_src_chl_name = event.chat.title
-        msg_dst_id = self.config["dst_channel_gold"] if msg_src_chl_name == "Pips Exchange (FX & Gold VIP)" else self.config["dst_channel_index"]
+            trades_to_close = await asyncio.to_thread(self.get_signal_trades, event.chat_id, msg_reply_id)
+            await self.broker.call(self.close_signal_trade, msg_parsed_text, msg_raw_text, trades_to_close)
+        if forwarded is not None:
+            task = asyncio.create_task(self.store_forwarded_id(db_message, forwarded))
+            self._forward_tasks.add(task)
+            task.add_done_callback(self._forward_tasks.discard)
 
+    def get_signal_trades(self, chat_id: int, reply_id: Optional[int]) -> List[Trade]:
+        """Return the trades of the replied signal, or the open trades of the latest signal of the chat without a reply."""
+        if reply_id:
+            replied_message = self.db_handler.get_message_by_id(reply_id, chat_id, Message.KEY_COLUMNS)
+            return self.db_handler.get_trades_by_id(replied_message.msg_id)
+        return self.db_handler.get_open_trades_of_latest_signal(chat_id)
 
-        forwarded_message = await self.client.forward_messages(msg_dst_id, event.message)
-        existing_message = self.db_handler.get_message_by_id(event.message.id, event.chat_id)
+    async def store_forwarded_id(self, message: Message, forwarded: asyncio.Future) -> None:
+        """Record the ID of the forwarded copy on a stored message, once its forward batch is sent."""
+        forwarded_message = await forwarded
+        if forwarded_message is not None and message.msg_id is not None:
+            message.tg_dst_msg_id = int(forwarded_message.id)
+            self.writer.update_message(message)
 
-        msg_parsed_edited_text = extract_trade_data(msg_raw_edited_text)
+    async def process_edited_message(self, event: events.NewMessage.Event, route: ChannelRoute) -> None:
+        msg_raw_edited_text = event.message.message
+        existing_message = await asyncio.to_thread(self.db_handler.get_message_by_id, event.message.id, event.chat_id)
+        if existing_message is None:
+            # Not a stored signal, e.g. a message that was not a signal or sent before startup
+            logger.info(f"Edited message {event.message.id} of chat {event.chat_id} not stored, edit ignored")
+            return
+
+        msg_parsed_edited_text = parse_message(msg_raw_edited_text, route.parser_profile)
         if msg_parsed_edited_text['message_type'] == 'create':
-            existing_trades = self.db_handler.get_trades_by_id(existing_message.msg_id)
-            self.update_signal_trade(existing_trades, msg_parsed_edited_text, existing_message.msg_id, msg_raw_edited_text)
+            # The edit is compared with the stored version of the signal, not with the live levels of its trades
+            msg_parsed_previous_text = parse_message(existing_message.msg_body, route.parser_profile) if existing_message.msg_body else None
+            existing_trades = await asyncio.to_thread(self.db_handler.get_trades_by_id, existing_message.msg_id)
+            await self.broker.call(self.update_signal_trade, existing_trades, msg_parsed_edited_text, existing_message.msg_id, msg_raw_edited_text, msg_parsed_previous_text)
             existing_message.msg_status = "updated"
             existing_message.msg_body = msg_raw_edited_text
-            self.db_handler.update_message(existing_message)
+            self.writer.update_message(existing_message)
 
     def create_new_signal_trade(self, parsed_text, message):
         logger.info(f'🆕 New trade signal to open a new position: {parsed_text}')
         try:
-            db_message_id = self.db_handler.insert_message(message)
+            db_message_id = self.writer.insert_message(message)
+            message.msg_id = db_message_id
             trade_results = []
-            trades = create_trade_entries(parsed_text, db_message_id, self.config)
+            trades = create_trade_entries(parsed_text, db_message_id, self.config,
+                                          partial(self.sizer.lots, self.mt5_handler) if self.sizer is not None else None,
+                                          self.ladder is not None)
             n_trades_to_open = len(trades) if len(trades) > 1 else trades[0]["n_trades"]
             for i in range(0, n_trades_to_open, 1):
                 trade = trades[i] if len(trades) > 1 else trades[0]
+                if self.risk_engine is not None:
+                    # Market signals carry no entry price, the risk is measured from the current price
+                    entry_price = trade['entry_price'] or self.mt5_handler.get_price(trade['symbol'], trade['direction'])
+                    if self.risk_engine.check(self.account_id, trade['symbol'], trade['direction'], trade['lot_size'], entry_price, trade['SL'], self.mt5_handler.get_symbol_value):
+                        continue
                 trade_id = self.mt5_handler.open_trade(trade)
                 if trade_id:
+                    if self.risk_engine is not None:
+                        self.risk_engine.on_fill(self.account_id, int(trade_id), trade['symbol'], trade['direction'], trade['lot_size'], entry_price, trade['SL'])
+                    if self.ladder is not None and trade.get('ladder'):
+                        self.ladder.add(self.mt5_handler, int(trade_id), trade['symbol'], trade['direction'], trade['lot_size'], trade['ladder'])
                     trade = Trade(
                         msg_id=int(trade['db_message_id']),
                         order_id=int(trade_id),
@@ -146,27 +263,34 @@ class TelegramAnalyzer:
                         stop_loss=trade['SL'],
                         take_profit=trade['TP'],
                         entry_price=trade['entry_price'],
-                        account_id=int(trade['account_id'])
+                        account_id=int(trade['account_id']),
+                        tg_src_chat_id=message.tg_chat_id
                     )
                     trade_results.append(trade)
             if trade_results:
                 for trade in trade_results:
-                    self.db_handler.insert_trade(trade)
+                    trade.trade_id = self.writer.insert_trade(trade)
         except Exception as e:
             logger.error(f"❌ Error processing new trade signal: {e}")
 
     def update_signal_trade_be(self, trades_to_update, parsed_text, text):
         try:
             trades_updated, trade_update_results = [],[]
+            new_sl = parsed_text['stop_loss'] if parsed_text['stop_loss'] is not None and \
+                                                     parsed_text[
+                                                         'stop_loss'] != 0 else None
+            outcome = self.mt5_handler.break_even_positions(
+                [trade.order_id for trade in trades_to_update if trade.account_id == self.config["mt5_account_id"]], new_sl)
+            done = set(outcome['done'])
             for trade in trades_to_update:
                 if trade.account_id == self.config["mt5_account_id"]:
-                    new_sl = parsed_text['stop_loss'] if parsed_text['stop_loss'] is not None and \
-                                                             parsed_text[
-                                                                 'stop_loss'] != 0 else None
-                    updated_sl = self.mt5_handler.update_trade_break_even(trade.order_id, new_sl)
+                    updated_sl = outcome['levels'][int(trade.order_id)] if int(trade.order_id) in done else None
                     if updated_sl:
+                        if self.risk_engine is not None:
+                            self.risk_engine.on_modify(trade.account_id, trade.order_id, updated_sl)
                         trade.stop_loss = updated_sl
                         trade.break_even = updated_sl
+                        trades_updated.append(trade)
                         trade_update = TradeUpdate(
                             trade_id=trade.trade_id,
                             order_id=trade.order_id,
@@ -178,9 +302,8 @@ class TelegramAnalyzer:
                 else:
                     continue
             if trades_updated:
-                for trade in trades_updated:
-                    self.db_handler.update_trade(trade)
-            self.db_handler.insert_trade_update(trade_update_results)
+                self.writer.update_trades(trades_updated)
+            self.writer.insert_trade_update(trade_update_results)
         except Exception as e:
             logger.error(f"❌ Error updating trade to break even: {e}")
 
@@ -188,11 +311,19 @@ class TelegramAnalyzer:
         logger.info(f'❎ New trade signal to close the position: {parsed_text}')
         try:
             trades_closed, trade_updates_result = [], []
+            positions = self.mt5_handler.get_positions_snapshot()
+            # One snapshot and one tick per symbol for the whole signal, the requests are sent back-to-back
+            closed = set(self.mt5_handler.close_positions(
+                [trade.order_id for trade in trades_to_close if trade.account_id == self.config["mt5_account_id"]], positions)['done'])
             for trade in trades_to_close:
                 if trade.account_id == self.config["mt5_account_id"]:
-                    response_close = self.mt5_handler.close_trade(trade.order_id)
-                    if response_close:
+                    if int(trade.order_id) in closed:
+                        if self.risk_engine is not None:
+                            # The profit of the snapshot taken just before the close stands for the realized PnL
+                            position = positions.get(int(trade.order_id))
+                            self.risk_engine.on_close(trade.account_id, trade.order_id, position.profit if position is not None else None)
                         trade.status = 'close'
+                        trades_closed.append(trade)
                         trade_update = TradeUpdate(
                             trade_id=trade.trade_id,
                             order_id=trade.order_id,
@@ -204,39 +335,57 @@ class TelegramAnalyzer:
                 else:
                     continue
             if trades_closed:
-                for trade in trades_closed:
-                    self.db_handler.update_trade(trade)
-            self.db_handler.insert_trade_update(trade_updates_result)
+                self.writer.update_trades(trades_closed)
+            self.writer.insert_trade_update(trade_updates_result)
         except Exception as e:
             logger.error(f"❌ Error processing trade close signal: {e}")
 
-    def update_signal_trade(self, existing_trades, parsed_text, db_message_id, text):
+    def update_signal_trade(self, existing_trades, parsed_text, db_message_id, text, previous_parsed_text=None):
         try:
             trades_updated, trade_update_results = [],[]
-            trades = create_trade_entries(parsed_text, db_message_id, self.config)
+            trades = create_trade_entries(parsed_text, db_message_id, self.config, ladder=self.ladder is not None)
+            previous_trades = create_trade_entries(previous_parsed_text, db_message_id, self.config, ladder=self.ladder is not None) if previous_parsed_text else []
             subset_trades_to_update = [item for item in existing_trades if item.account_id == self.config["mt5_account_id"]]
+            positions = self.mt5_handler.get_positions_snapshot()
+            modifications = []
             for i in range(0, len(subset_trades_to_update), 1):
                 trade = subset_trades_to_update[i]
                 if trade.account_id == self.config["mt5_account_id"]:
                     new_sl = trades[i]['SL'] if 'SL' in trades[i] and trades[i]['SL'] != 0 else None
                     new_tp = trades[i]['TP'] if 'TP' in trades[i] and trades[i]['TP'] != 0 else None
-                    self.mt5_handler.update_trade(trade.order_id, new_sl, new_tp)
-                    trade.stop_loss = new_sl
-                    trade.take_profit = new_tp
-                    trade_update = TradeUpdate(
-                        trade_id=trade.trade_id,
-                        order_id=trade.order_id,
-                        account_id=trade.account_id,
-                        update_action="UPDATE",
-                        update_body=text
-                    )
-                    trade_update_results.append(trade_update)
-                    trades_updated.append(trade)
+                    if self.ladder is not None and trades[i].get('ladder'):
+                        self.ladder.set_levels(trade.account_id, trade.order_id, trades[i]['ladder'])
+                    # Only the levels that changed since the stored version of the signal are sent to MT5
+                    modified = diff_trade_levels(trade, new_sl, new_tp, previous_trades[i] if i < len(previous_trades) else None)
+                    if not modified:
+                        continue
+                    new_sl = new_sl if 'stop_loss' in modified else None
+                    new_tp = new_tp if 'take_profit' in modified else None
+                    modifications.append((trade, new_sl, new_tp))
                 else:
                     continue
+            done = set()
+            if modifications:
+                done = set(self.mt5_handler.modify_positions([(trade.order_id, new_sl, new_tp) for trade, new_sl, new_tp in modifications], positions)['done'])
+            for trade, new_sl, new_tp in modifications:
+                # The levels rejected by MT5 are not stored
+                if int(trade.order_id) not in done:
+                    continue
+                if self.risk_engine is not None:
+                    self.risk_engine.on_modify(trade.account_id, trade.order_id, new_sl)
+                trade.stop_loss = new_sl if new_sl is not None else trade.stop_loss
+                trade.take_profit = new_tp if new_tp is not None else trade.take_profit
+                trade_update = TradeUpdate(
+                    trade_id=trade.trade_id,
+                    order_id=trade.order_id,
+                    account_id=trade.account_id,
+                    update_action="UPDATE",
+                    update_body=text
+                )
+                trade_update_results.append(trade_update)
+                trades_updated.append(trade)
             if trades_updated:
-                for trade in trades_updated:
-                    self.db_handler.update_trade(trade)
-            self.db_handler.insert_trade_update(trade_update_results)
+                self.writer.update_trades(trades_updated)
+            self.writer.insert_trade_update(trade_update_results)
         except Exception as e:
             logger.error(f"❌ Error updating signal trade: {e}")
\ No newline at end of file
@@ -0,0 +1,184 @@
+import json
+import logging
+import math
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from business.riskEngine import RiskEngine
+
+logger = logging.getLogger(__name__)
+
+
+class _Ladder:
+    """Take profits of a position still to be reached, and the volume closed at each of them."""
+    __slots__ = ('symbol', 'direction', 'levels', 'rung_volume', 'hit')
+
+    def __init__(self, symbol: str, direction: str, levels: List[float], rung_volume: float, hit: int = 0) -> None:
+        self.symbol = symbol
+        self.direction = direction
+        self.levels = levels
+        self.rung_volume = rung_volume
+        # Levels already reached and closed
+        self.hit = hit
+
+    def reached(self, price: float) -> int:
+        count = 0
+        for level in self.levels[self.hit:]:
+            if (price >= level) if self.direction == 'buy' else (price <= level):
+                count += 1
+            else:
+                break
+        return count
+
+
+class TpLadder:
+    def __init__(self, path: Optional[str] = None, risk_engine: Optional[RiskEngine] = None) -> None:
+        """
+        Initialize the take profit ladder of the positions opened once per signal.
+
+        In ladder mode a signal with several take profits opens one position per account, with the last
+        take profit set on the broker. The ladder closes an equal part of its volume at each of the other
+        take profits when poll() sees the price reach them, so a signal costs one order_send to open and
+        a break even is one modification instead of one per take profit.
+
+        Args:
+            path (Optional[str]): The JSON file the ladders are persisted to, so a restart keeps watching
+                the open positions; None to keep them in memory.
+            risk_engine (Optional[RiskEngine]): The pre-trade checks whose exposure the partial closes reduce.
+        """
+        self.path = path
+        self.risk_engine = risk_engine
+        self.partial_closes = 0
+        self._lock = threading.Lock()
+        self._ladders: Dict[Tuple[int, int], _Ladder] = self._read()
+
+    def add(self, mt_handler: Any, ticket: int, symbol: str, direction: str, volume: float, levels: List[float]) -> None:
+        """
+        Watch a position, called once it is filled.
+
+        Args:
+            mt_handler (Any): The handler of the account, logged in, see MetatraderHandler.
+            ticket (int): The ticket of the position.
+            symbol (str): The broker symbol.
+            direction (str): The order direction, e.g. 'buy' or 'sell limit'.
+            volume (float): The volume of the position.
+            levels (List[float]): The take profits to close a part at, nearest first; the last take profit
+                of the signal is not among them, it is set on the position.
+        """
+        if not levels:
+            return
+        symbol_info = mt_handler.get_symbol_info(symbol)
+        step = symbol_info.volume_step if symbol_info is not None else 0.01
+        volume_min = symbol_info.volume_min if symbol_info is not None else step
+        rung_volume = round(math.floor(volume / (len(levels) + 1) / step + 1e-9) * step, 8)
+        if rung_volume < volume_min:
+            logger.warning(f"⚠️ Position {ticket} of {volume} {symbol} is too small to be split in {len(levels) + 1}, "
+                           f"it runs to its take profit")
+            return
+        direction = 'buy' if 'buy' in direction.lower() else 'sell'
+        self._ladders[(mt_handler.account, int(ticket))] = _Ladder(symbol, direction, [float(level) for level in levels], rung_volume)
+        self.save()
+
+    def set_levels(self, account_id: int, ticket: int, levels: List[float]) -> None:
+        """Replace the take profits of a watched position after an edit of its signal, the reached ones stay closed."""
+        ladder = self._ladders.get((account_id, int(ticket)))
+        if ladder is not None and levels:
+            ladder.levels = [float(level) for level in levels]
+            self.save()
+
+    def watches(self, account_id: int) -> bool:
+        """Whether some positions of an account are watched."""
+        return any(account == account_id for account, _ in list(self._ladders))
+
+    def poll(self, mt_handler: Any) -> int:
+        """
+        Close the parts of the positions of an account whose take profits are reached, called on the broker thread.
+
+        Args:
+            mt_handler (Any): The handler of the account, logged in, see MetatraderHandler.
+
+        Returns:
+            int: The number of partial closes sent and done.
+        """
+        account = mt_handler.account
+        ladders = {ticket: ladder for (account_id, ticket), ladder in list(self._ladders.items()) if account_id == account}
+        if not ladders:
+            return 0
+        positions = mt_handler.get_positions_snapshot(strict=True)
+        if positions is None:
+            # Without a snapshot every position would look closed, the ladders wait for the next poll
+            return 0
+        prices, volumes, reached = {}, {}, {}
+        changed = False
+        closed = 0
+        for ticket, ladder in ladders.items():
+            position = positions.get(ticket)
+            if position is None:
+                # Closed by its stop loss, its last take profit, a close signal or by hand
+                del self._ladders[(account, ticket)]
+                changed = True
+                continue
+            # A buy is closed at the bid, a sell at the ask
+            key = (ladder.symbol, ladder.direction)
+            if key not in prices:
+                prices[key] = mt_handler.get_price(ladder.symbol, 'sell' if ladder.direction == 'buy' else 'buy')
+            if prices[key] is None:
+                continue
+            count = ladder.reached(prices[key])
+            if count:
+                reached[ticket] = count
+                volumes[ticket] = min(round(ladder.rung_volume * count, 8), position.volume)
+        if volumes:
+            outcome = mt_handler.close_positions(list(volumes), positions, volumes)
+            for ticket in outcome['done']:
+                ladder = ladders[ticket]
+                ladder.hit += reached[ticket]
+                logger.info(f"✅ {volumes[ticket]} lots of position {ticket} closed at take profit {ladder.hit}/{len(ladder.levels) + 1}")
+                if self.risk_engine is not None:
+                    self.risk_engine.on_reduce(account, ticket, volumes[ticket])
+                if ladder.hit >= len(ladder.levels):
+                    # The rest of the volume runs to the take profit set on the position
+                    del self._ladders[(account, ticket)]
+            closed = len(outcome['done'])
+            self.partial_closes += closed
+            changed = changed or bool(closed)
+        if changed:
+            self.save()
+        return closed
+
+    def metrics(self) -> Dict[str, int]:
+        """Return the number of watched positions and of partial closes done."""
+        return {'watched': len(self._ladders), 'partial_closes': self.partial_closes}
+
+    def save(self) -> None:
+        """Write the ladders to their file, replaced atomically."""
+        if self.path is None:
+            return
+        with self._lock:
+            data = [
+                {'account': account, 'ticket': ticket, 'symbol': ladder.symbol, 'direction': ladder.direction,
+                 'levels': ladder.levels, 'rung_volume': ladder.rung_volume, 'hit': ladder.hit}
+                for (account, ticket), ladder in list(self._ladders.items())
+            ]
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.path)
+
+    def _read(self) -> Dict[Tuple[int, int], _Ladder]:
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ TP ladders {self.path} could not be read, starting empty: {e}")
+            return {}
+        return {
+            (int(item['account']), int(item['ticket'])): _Ladder(item['symbol'], item['direction'], item['levels'],
+                                                                  item['rung_volume'], item['hit'])
+            for item in data
+        }
@@ -1,43 +1,34 @@
-class Account:
-    def __init__(self,
-                 mt5_account_id: int,
-                 mt5_server: str,
-                 mt5_broker: str,
-                 mt5_balance: float,
-                 mt5_password: str,
-                 environment: str,
-                 tg_id: str,
-                 tg_phone: str,
-                 tg_session: str,
-                 tg_channels: str,
-                 tg_hash: str,
-                 symbol_config: list = None):
-        self.mt5_account_id = mt5_account_id
-        self.mt5_server = mt5_server
-        self.mt5_broker = mt5_broker
-        self.mt5_balance = mt5_balance
-        self.mt5_password = mt5_password
-        self.environment = environment
-        self.tg_id = tg_id
-        self.tg_phone = tg_phone
-        self.tg_session = tg_session
-        self.tg_channels =  [int(channel) for channel in tg_channels.split(",")]
-        self.tg_hash = tg_hash
-        self.symbol_config = symbol_config
-    def to_dict(self):
-        return {
-            'mt5_account_id': self.mt5_account_id,
-            'mt5_server': self.mt5_server,
-            'mt5_broker': self.mt5_broker,
-            'mt5_balance': self.mt5_balance,
-            'mt5_password': self.mt5_password,
-            'environment': self.environment,
-            'tg_id': self.tg_id,
-            'tg_phone': self.tg_phone,
-            'tg_session': self.tg_session,
-            'tg_channels': self.tg_channels,
-            'tg_hash': self.tg_hash,
-            'symbol_config': self.symbol_config,
-            "dst_channel_gold": -1002404066652,
-            "dst_channel_index": -1002535578509
-        }
\ No newline at end of file
+from dataclasses import dataclass
+from typing import ClassVar, Tuple
+from data.record import Record
+
+
+@dataclass(slots=True)
+class Account(Record):
+    mt5_account_id: int
+    mt5_server: str
+    mt5_broker: str
+    mt5_balance: float
+    mt5_password: str
+    environment: str
+    tg_id: str
+    tg_phone: str
+    tg_session: str
+    tg_channels: list
+    tg_hash: str
+    symbol_config: list = None
+
+    TABLE: ClassVar[str] = 'account'
+    # symbol_config is not stored on the account table, it is aggregated from broker_symbol_config.
+    COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'mt5_account_id', 'mt5_server', 'mt5_broker', 'mt5_balance', 'mt5_password', 'environment',
+        'tg_id', 'tg_phone', 'tg_channels', 'tg_session', 'tg_hash'
+    )
+    UPDATE_COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'mt5_account_id', 'mt5_server', 'mt5_broker', 'mt5_balance', 'mt5_password', 'environment',
+        'tg_id', 'tg_phone', 'tg_session', 'tg_channels', 'tg_hash', 'symbol_config'
+    )
+
+    def __post_init__(self):
+        if isinstance(self.tg_channels, str):
+            self.tg_channels = [int(channel) for channel in self.tg_channels.split(",")]
@@ -0,0 +1,153 @@
+import logging
+import os
+import tempfile
+import threading
+from datetime import date
+from typing import List, Optional
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from data.dbHandler import dbHandler, PARTITIONED_TABLES
+
+logger = logging.getLogger(__name__)
+
+# Parquet schema of the archived partitions, the columns are exported in this order.
+ARCHIVE_SCHEMAS = {
+    'tg_message': pa.schema([
+        ('msg_id', pa.int32()),
+        ('tg_msg_id', pa.int64()),
+        ('tg_chat_id', pa.string()),
+        ('tg_src_chat_name', pa.string()),
+        ('tg_dst_chat_id', pa.string()),
+        ('tg_dst_msg_id', pa.int64()),
+        ('msg_body', pa.string()),
+        ('msg_timestamp', pa.timestamp('us')),
+        ('msg_status', pa.string()),
+    ]),
+    'tradeupdate': pa.schema([
+        ('trade_update_id', pa.int32()),
+        ('trade_id', pa.int32()),
+        ('order_id', pa.int64()),
+        ('account_id', pa.int64()),
+        ('update_action', pa.string()),
+        ('update_body', pa.string()),
+        ('created_at', pa.timestamp('us')),
+    ]),
+}
+
+
+class HistoryArchiver:
+    def __init__(self, db_handler: dbHandler, archive_dir: str, retention_months: int = 3,
+                 interval: float = 24 * 3600.0, compression: str = 'zstd') -> None:
+        """
+        Initialize the archiver of the message and trade update history.
+
+        The partitions of the months older than the retention are exported to
+        '<archive_dir>/<table>/<partition>.parquet', then dropped from the database.
+
+        Args:
+            db_handler (dbHandler): The database handler.
+            archive_dir (str): The directory the Parquet files are written to.
+            retention_months (int): Number of past months kept in the database, on top of the current one.
+            interval (float): Seconds between two runs of the background job.
+            compression (str): Parquet compression codec.
+        """
+        self.db_handler = db_handler
+        self.archive_dir = archive_dir
+        self.retention_months = retention_months
+        self.interval = interval
+        self.compression = compression
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Start the background job, it runs right away and then every interval."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="history-archiver", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background job."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def run_once(self, today: Optional[date] = None) -> List[str]:
+        """
+        Create the upcoming partitions, then archive and drop the expired ones.
+
+        Args:
+            today (Optional[date]): The reference day, defaults to the current one.
+
+        Returns:
+            List[str]: The paths of the Parquet files written.
+        """
+        self.db_handler.ensure_partitions()
+        cutoff = self.retention_cutoff(today or date.today())
+        archived = []
+        for table in PARTITIONED_TABLES:
+            for partition, month in self.db_handler.get_partitions(table):
+                if month < cutoff:
+                    archived.append(self.archive_partition(table, partition))
+                    self.db_handler.drop_partition(table, partition)
+        return archived
+
+    def retention_cutoff(self, today: date) -> date:
+        """Return the first month kept in the database, the partitions of earlier months are archived."""
+        months = today.year * 12 + today.month - 1 - self.retention_months
+        return date(months // 12, months % 12 + 1, 1)
+
+    def archive_partition(self, table: str, partition: str) -> str:
+        """
+        Export a partition to a compressed Parquet file.
+
+        The rows are streamed with COPY ... TO STDOUT to a temporary CSV spool file, then converted
+        batch by batch, so memory use does not depend on the size of the partition.
+
+        Args:
+            table (str): The partitioned table.
+            partition (str): The partition to export.
+
+        Returns:
+            str: The path of the Parquet file.
+
+        Raises:
+            ValueError: If the file does not contain every row of the partition.
+        """
+        schema = ARCHIVE_SCHEMAS[table]
+        directory = os.path.join(self.archive_dir, table)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{partition}.parquet")
+        tmp_path = f"{path}.tmp"
+
+        written = 0
+        with tempfile.TemporaryFile(dir=directory) as spool:
+            exported = self.db_handler.copy_partition(partition, schema.names, spool)
+            spool.seek(0)
+            reader = pa_csv.open_csv(
+                spool,
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=schema, strings_can_be_null=True, quoted_strings_can_be_null=False
+                ),
+            )
+            with pq.ParquetWriter(tmp_path, schema, compression=self.compression) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    written += batch.num_rows
+
+        if written != exported:
+            os.remove(tmp_path)
+            raise ValueError(f"Archive of {partition} has {written} rows, expected {exported}")
+        os.replace(tmp_path, path)
+        logger.info(f"✅ Partition {partition} archived to {path} ({written} rows)")
+        return path
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Error archiving the history partitions: {e}")
+            self._stop.wait(self.interval)
@@ -0,0 +1,145 @@
+import logging
+import select
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+from data.dbHandler import dbHandler
+from data.channelRoute import ChannelRoute
+from data.account import Account
+from data.configCache import ConfigCache
+from utility.utility_tg import build_symbol_index, normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CHANNEL = 'account_config'
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Read-only view of the account configuration at a given version."""
+    version: int
+    # Account ID -> account configuration, as returned by Account.to_dict().
+    accounts: Mapping[int, Mapping[str, Any]]
+    # Account ID -> instrument alias (see build_symbol_index) -> broker symbol configuration.
+    symbols: Mapping[int, Mapping[str, Mapping[str, Any]]]
+    # Source chat ID -> routing of the channel.
+    routes: Mapping[int, ChannelRoute]
+
+
+class ConfigService:
+    def __init__(self, db_handler: dbHandler, env: str, poll_interval: float = 30.0, cache: Optional[ConfigCache] = None) -> None:
+        """
+        Initialize the configuration service and load the first snapshot.
+
+        Args:
+            db_handler (dbHandler): The database handler used to load the configuration.
+            env (str): The environment of the accounts to load.
+            poll_interval (float): Seconds between two version checks when no notification arrives.
+            cache (Optional[ConfigCache]): Keeps the last loaded configuration, used when the database is down at startup.
+        """
+        self.db_handler = db_handler
+        self.env = env
+        self.poll_interval = poll_interval
+        self.cache = cache
+        try:
+            self._snapshot = self._load()
+        except Exception as e:
+            accounts = self.cache.get('account', Account) if self.cache is not None else None
+            if accounts is None:
+                raise e
+            logger.warning(f"⚠️ Database not available, using the cached configuration: {e}")
+            # No stored version matches, the configuration is reloaded once the database is reachable
+            self._snapshot = self._build(-1, accounts, self.cache.get('channel_route', ChannelRoute) or [])
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """The current configuration snapshot, replaced as a whole on every refresh."""
+        return self._snapshot
+
+    def get_account_config(self, account_id: int) -> Optional[Mapping[str, Any]]:
+        """Return the configuration of an account, or None if it is not configured."""
+        return self._snapshot.accounts.get(int(account_id))
+
+    def get_symbol_config(self, account_id: int, instrument: str) -> Optional[Mapping[str, Any]]:
+        """Return the broker symbol configuration of an instrument, or of any of its aliases, for an account."""
+        return self._snapshot.symbols.get(int(account_id), {}).get(normalize_symbol(instrument))
+
+    def get_channel_route(self, chat_id: int) -> Optional[ChannelRoute]:
+        """Return the routing of a source channel, or None if the channel is not routed."""
+        return self._snapshot.routes.get(chat_id)
+
+    def refresh(self) -> ConfigSnapshot:
+        """Reload the configuration from the database and swap the snapshot."""
+        self._snapshot = self._load()
+        logger.info(f"✅ Account configuration reloaded, version {self._snapshot.version}")
+        return self._snapshot
+
+    def start(self) -> None:
+        """Start the background thread that refreshes the snapshot on configuration changes."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            target = self._listen if self.db_handler.SUPPORTS_NOTIFY else self._poll
+            self._thread = threading.Thread(target=target, name="config-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval)
+
+    def _load(self) -> ConfigSnapshot:
+        version = self.db_handler.get_config_version()
+        accounts = self.db_handler.get_software_accounts_config_based_on_env(self.env) or []
+        routes = self.db_handler.get_channel_routes()
+        if self.cache is not None:
+            self.cache.store('account', accounts)
+            self.cache.store('channel_route', routes)
+        return self._build(version, accounts, routes)
+
+    @staticmethod
+    def _build(version: int, accounts: list, routes: list) -> ConfigSnapshot:
+        configs, symbols = {}, {}
+        for account in accounts:
+            account_id = int(account.mt5_account_id)
+            symbols[account_id] = MappingProxyType(build_symbol_index({
+                item['instrument']: MappingProxyType(item) for item in account.symbol_config or []
+            }))
+            configs[account_id] = MappingProxyType({**account.to_dict(), 'symbol_index': symbols[account_id]})
+        return ConfigSnapshot(version=version, accounts=MappingProxyType(configs), symbols=MappingProxyType(symbols),
+                              routes=MappingProxyType({route.chat_id: route for route in routes}))
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if self.db_handler.get_config_version() != self._snapshot.version:
+                    self.refresh()
+            except Exception as e:
+                logger.error(f"❌ Error checking for configuration changes: {e}")
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self.db_handler.listen(CONFIG_CHANNEL)
+                # Changes made while the listener was down are caught by the version check.
+                if self.db_handler.get_config_version() != self._snapshot.version:
+                    self.refresh()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        if self.db_handler.get_config_version() != self._snapshot.version:
+                            self.refresh()
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self.refresh()
+            except Exception as e:
+                logger.error(f"❌ Error listening for configuration changes: {e}, retrying in 5 seconds...")
+                self._stop.wait(5)
+            finally:
+                if conn is not None:
+                    conn.close()
@@ -1,13 +1,81 @@
+import json
 import logging
+import os
+from datetime import date
 import psycopg2
+import psycopg2.extensions
 from data.trade import Trade
 from data.tg_message import Message
 from data.tradeUpdate import TradeUpdate
 from data.account import Account
+from data.channelRoute import ChannelRoute
 
 logger = logging.getLogger(__name__)
 
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+
+# Lookups on the signal hot path, checked by dbHandler.check_hot_query_plans().
+HOT_QUERIES = {
+    'get_message_by_id': ("SELECT msg_id FROM tg_message WHERE tg_msg_id = %s AND tg_chat_id = %s;", (0, '0')),
+    'get_trades_by_id': ("SELECT trade_id FROM trade WHERE msg_id = %s;", (0,)),
+    'get_all_trades': ("SELECT trade_id FROM trade WHERE status = 'open' and account_id = %s;", (0,)),
+    'get_open_trades_of_latest_signal': (
+        "SELECT max(msg_id) FROM trade WHERE status = 'open' AND tg_src_chat_id = %s;", ('0',)
+    ),
+}
+INDEX_SCAN_NODES = ('Index Scan', 'Index Only Scan', 'Bitmap Index Scan')
+
+# Tables partitioned by month (see migrations/*_partition_history.sql), mapped to their partition key.
+PARTITIONED_TABLES = {'tg_message': 'msg_timestamp', 'tradeupdate': 'created_at'}
+
+# Accounts with their broker symbol configuration aggregated in symbol_config.
+ACCOUNT_CONFIG_QUERY = """
+        SELECT
+            a.mt5_account_id,
+            a.mt5_server,
+            a.mt5_broker,
+            a.mt5_balance,
+            a.mt5_password,
+            a.environment,
+            a.tg_id,
+            a.tg_phone,
+            a.tg_channels,
+            a.tg_session,
+            a.tg_hash,
+        COALESCE(
+            json_agg(
+                json_build_object(
+                    'instrument', bsc.instrument,
+                    'symbol', bsc.symbol,
+                    'n_trades', bsc.n_trades,
+                    'lot_size', bsc.lot_size
+                )
+            ) FILTER (WHERE bc.id IS NOT NULL), '[]'
+        ) AS symbol_config
+        FROM
+            account a
+        LEFT JOIN broker_config bc ON a.mt5_account_id = bc.account_id
+        LEFT JOIN broker_symbol_config bsc ON bc.id = bsc.broker_config_id
+        WHERE
+            {condition}
+        GROUP BY
+            a.mt5_account_id,
+            a.mt5_server,
+            a.mt5_broker,
+            a.mt5_balance,
+            a.mt5_password,
+            a.environment,
+            a.tg_id,
+            a.tg_phone,
+            a.tg_channels,
+            a.tg_session,
+            a.tg_hash;
+"""
+
 class dbHandler:
+    # Configuration changes are pushed with NOTIFY, see listen().
+    SUPPORTS_NOTIFY = True
+
     def __init__(self, config):
         """
         Initialize the dbHandler with the given configuration.
@@ -44,6 +112,66 @@ class dbHandler:
             logger.error(f"❌ Error connecting to database: {e}")
             return None
 
+    def is_available(self):
+        """
+        Check whether the database accepts connections.
+
+        Returns:
+            bool: True if a connection could be established, False otherwise.
+        """
+        conn = self._connect()
+        if conn is None:
+            return False
+        conn.close()
+        return True
+
+    @staticmethod
+    def _column_names(cursor):
+        """
+        Return the column names of the last query executed on the cursor.
+
+        Args:
+            cursor: The cursor used to run the query.
+
+        Returns:
+            list: The column names, in the order of the fetched rows.
+        """
+        return [column[0] for column in cursor.description]
+
+    def verify_schema(self, models=(Message, Trade, TradeUpdate, Account, ChannelRoute)):
+        """
+        Check that every column mapped by the models exists in the database.
+
+        Args:
+            models (tuple): The model classes to verify.
+
+        Raises:
+            ValueError: If a table is missing one of the columns declared by its model.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        select_query = """SELECT table_name, column_name FROM information_schema.columns WHERE table_name = ANY(%s);"""
+        try:
+            cursor.execute(select_query, ([model.TABLE for model in models],))
+            table_columns = {}
+            for table_name, column_name in cursor.fetchall():
+                table_columns.setdefault(table_name, set()).add(column_name)
+
+            missing = {
+                model.TABLE: sorted(set(model.COLUMNS) - table_columns.get(model.TABLE, set()))
+                for model in models
+            }
+            missing = {table: columns for table, columns in missing.items() if columns}
+            if missing:
+                raise ValueError(f"Schema drift detected, missing columns: {missing}")
+            logger.info("✅ Database schema matches the models.")
+        except Exception as e:
+            logger.error(f"❌ Error verifying database schema: {e}")
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
     def create_tables(self, create_table_sqls):
         """
         Create tables in the database using the provided SQL statements.
@@ -57,8 +185,7 @@ class dbHandler:
         conn = self._connect()
         cursor = conn.cursor()
         try:
-            for create_table_sql in create_table_sqls.split('---'):
-                cursor.execute(create_table_sql)
+            self._execute_script(cursor, create_table_sqls)
             conn.commit()
             logger.info("✅ Tables created successfully!")
         except Exception as e:
@@ -67,6 +194,115 @@ class dbHandler:
             raise e
         finally:
             conn.close()
+
+    @staticmethod
+    def _execute_script(cursor, sqls):
+        """
+        Execute a script made of SQL statements separated by '---'.
+
+        Args:
+            cursor: The cursor used to run the statements.
+            sqls (str): The SQL statements, separated by '---'.
+        """
+        for sql in sqls.split('---'):
+            if sql.strip():
+                cursor.execute(sql)
+
+    def migrate(self, migrations_dir=MIGRATIONS_DIR):
+        """
+        Apply the pending schema migrations.
+
+        Migrations are the files named '<version>_<name>.sql' in the migrations directory, applied in
+        version order. Each one runs in its own transaction and is recorded in the schema_version table,
+        so it is applied only once.
+
+        Args:
+            migrations_dir (str): The directory containing the migration files.
+
+        Returns:
+            list: The versions applied by this call.
+
+        Raises:
+            Exception: If a migration fails, after rolling it back.
+        """
+        migrations = sorted(
+            (int(file_name.split('_', 1)[0]), file_name)
+            for file_name in os.listdir(migrations_dir) if file_name.endswith('.sql')
+        )
+        conn = self._connect()
+        cursor = conn.cursor()
+        applied = []
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT,
+                    applied_at TIMESTAMP DEFAULT now()
+                );
+            """)
+            conn.commit()
+            cursor.execute("""SELECT version FROM schema_version;""")
+            current_versions = {record[0] for record in cursor.fetchall()}
+
+            for version, file_name in migrations:
+                if version in current_versions:
+                    continue
+                with open(os.path.join(migrations_dir, file_name), 'r') as file:
+                    self._execute_script(cursor, file.read())
+                cursor.execute("""INSERT INTO schema_version (version, name) VALUES (%s, %s);""", (version, file_name))
+                conn.commit()
+                applied.append(version)
+                logger.info(f"✅ Migration {file_name} applied successfully!")
+            return applied
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Error applying migrations: {e}")
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
+    def check_hot_query_plans(self, queries=HOT_QUERIES):
+        """
+        Check with EXPLAIN that the hot path lookups can be answered with an index scan.
+
+        Sequential scans are disabled for the check, so a query still planned as a Seq Scan has no
+        usable index, whatever the current size of the table.
+
+        Args:
+            queries (dict): Query name mapped to the (query, params) pair to explain.
+
+        Returns:
+            dict: Query name mapped to the plan node types of the queries not using an index.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        missing_index = {}
+        try:
+            cursor.execute("""SET LOCAL enable_seqscan = off;""")
+            for name, (query, params) in queries.items():
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+                plan = cursor.fetchone()[0]
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+                node_types = self._plan_node_types(plan[0]['Plan'])
+                if not any(node_type in INDEX_SCAN_NODES for node_type in node_types):
+                    missing_index[name] = node_types
+                    logger.warning(f"⚠️ Query {name} does not use an index: {node_types}")
+            if not missing_index:
+                logger.info("✅ All hot queries use an index scan.")
+            return missing_index
+        finally:
+            conn.rollback()
+            cursor.close()
+            conn.close()
+
+    @classmethod
+    def _plan_node_types(cls, plan):
+        """Return the node types of an EXPLAIN plan tree, depth first."""
+        node_types = [plan['Node Type']]
+        for child in plan.get('Plans', []):
+            node_types.extend(cls._plan_node_types(child))
+        return node_types
 # ======================================================================================================================
 # MESSAGE
 # ======================================================================================================================
@@ -106,6 +342,7 @@ class dbHandler:
 
             # Fetch the ID of the newly inserted record
             new_record_id = cursor.fetchone()[0]
+            message.mark_clean()
             logger.info(f"✅ Record added to 'tg_message' successfully with ID: {new_record_id}")
             return new_record_id  # Return the ID of the new record
 
@@ -118,13 +355,15 @@ class dbHandler:
             cursor.close()  # Close the cursor
             conn.close()  # Close the connection
 
-    def get_message_by_id(self, tg_msg_id, tg_chat_id):
+    def get_message_by_id(self, tg_msg_id, tg_chat_id, columns=None):
         """
         Retrieve a message by its Telegram ID and chat ID.
 
         Args:
             tg_msg_id (int): The Telegram ID of the message.
             tg_chat_id (int): The chat ID associated with the message.
+            columns (tuple, optional): Columns to fetch, defaults to all the Message columns.
+                Use Message.KEY_COLUMNS when only the message reference is needed.
 
         Returns:
             Message: An instance of the Message class if found, otherwise None.
@@ -135,7 +374,7 @@ class dbHandler:
         conn = self._connect()  # Establish a connection to the database
         cursor = conn.cursor()  # Create a cursor object to interact with the database
 
-        select_query = """SELECT * FROM tg_message WHERE tg_msg_id = %s AND tg_chat_id = %s;"""
+        select_query = f"""SELECT {Message.select_list(columns)} FROM tg_message WHERE tg_msg_id = %s AND tg_chat_id = %s;"""
         try:
             # Execute the SELECT query with the provided telegram_id and chat_id
             cursor.execute(select_query, (int(tg_msg_id), str(tg_chat_id),))
@@ -144,17 +383,7 @@ class dbHandler:
             if record:
                 # If a record is found, log the success and create a Message instance
                 logger.info(f"✅ Message found with ID: {tg_chat_id} from chat: {tg_chat_id}")
-                message = Message(
-                    msg_id=record[0],
-                    tg_msg_id=record[1],
-                    tg_chat_id=record[2],
-                    tg_src_chat_name=record[3],
-                    tg_dst_chat_id=record[4],
-                    tg_dst_msg_id=record[5],
-                    msg_body=record[6],
-                    msg_timestamp=record[7],
-                    msg_status=record[8]
-                )
+                message = Message.from_record(record, self._column_names(cursor))
                 return message
             else:
                 # If no record is found, log a warning and return None
@@ -169,19 +398,23 @@ class dbHandler:
             cursor.close()
             conn.close()
 
-    def update_message(self, update_data):
+    def update_message(self, update_data, columns=None):
         """
-        Update the columns of a message dynamically based on the provided update data.
+        Update the modified columns of a message, nothing is sent to the database if none changed.
 
         Args:
             update_data (Message): An instance of the Message class containing updated data.
+            columns (list, optional): Columns to write, defaults to the ones changed since the message was loaded.
 
         Raises:
             Exception: If there is an error during the update operation.
         """
+        message_dict = update_data.changes() if columns is None else {column: getattr(update_data, column) for column in columns}
+        if not message_dict:
+            logger.info(f"☑️ Message with ID {update_data.tg_msg_id} unchanged. No update made.")
+            return
         conn = self._connect()  # Establish connection
         cursor = conn.cursor()
-        message_dict = update_data.to_dict()
         # Dynamically create the SET clause and values tuple
         set_clause = ', '.join([f"{key} = %s" for key in message_dict.keys()])
         values = tuple(message_dict.values()) + (update_data.tg_msg_id, str(update_data.tg_chat_id),)
@@ -198,6 +431,7 @@ class dbHandler:
             conn.commit()
 
             # Check if the update was successful (rows affected)
+            update_data.mark_clean()
             if cursor.rowcount > 0:
                 logger.info(f"✅ Message with ID {update_data.tg_msg_id} updated successfully.")
             else:
@@ -274,8 +508,8 @@ class dbHandler:
         cursor = conn.cursor()
 
         insert_query = """
-            INSERT INTO trade (msg_id, order_id, account_id, symbol, direction, entry_price, stop_loss, take_profit, break_even, volume, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING trade_id;
+            INSERT INTO trade (msg_id, order_id, account_id, symbol, direction, entry_price, stop_loss, take_profit, break_even, volume, status, tg_src_chat_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING trade_id;
         """
         try:
             # Execute the insert query with the instance's data
@@ -290,11 +524,13 @@ class dbHandler:
                 trade.take_profit,
                 trade.break_even,
                 trade.volume,
-                trade.status))
+                trade.status,
+                trade.tg_src_chat_id))
             conn.commit()
 
             # Fetch the ID of the newly inserted record
             new_record_id = cursor.fetchone()[0]
+            trade.mark_clean()
             logger.info(f"✅ Record added to 'trade' successfully with ID: {new_record_id}")
             return new_record_id  # Return the ID of the new record
 
@@ -323,14 +559,15 @@ class dbHandler:
         conn = self._connect()
         cursor = conn.cursor()
         response = []
-        select_query = """SELECT * FROM trade WHERE msg_id = %s;"""
+        select_query = f"""SELECT {Trade.select_list()} FROM trade WHERE msg_id = %s;"""
         try:
             cursor.execute(select_query, (msg_id,))
             records = cursor.fetchall()
             if records:
                 logger.info(f"✅ Trade found with ID: {msg_id}")
+                columns = self._column_names(cursor)
                 for record in records:
-                    trade = Trade(trade_id=record[0], msg_id=record[1], order_id=record[2], account_id=record[3], symbol=record[4], direction=record[5], entry_price=record[6], stop_loss=record[7], take_profit=record[8], break_even=record[9], volume=record[10], status=record[11])
+                    trade = Trade.from_record(record, columns)
                     response.append(trade)
                 return response
             else:
@@ -359,27 +596,15 @@ class dbHandler:
         conn = self._connect()
         cursor = conn.cursor()
         response = {}
-        select_query = """SELECT * FROM trade WHERE status = 'open' and account_id = %s;"""
+        select_query = f"""SELECT {Trade.select_list()} FROM trade WHERE status = 'open' and account_id = %s;"""
         try:
             cursor.execute(select_query, (account_id,))
             records = cursor.fetchall()
             if records:
                 logger.info(f"✅ Trade found")
+                columns = self._column_names(cursor)
                 for record in records:
-                    trade = Trade(
-                        trade_id=record[0],
-                        msg_id=record[1],
-                        order_id=record[2],
-                        account_id=record[3],
-                        symbol=record[4],
-                        direction=record[5],
-                        entry_price=record[6],
-                        stop_loss=record[7],
-                        take_profit=record[8],
-                        break_even=record[9],
-                        volume=record[10],
-                        status=record[11]
-                    )
+                    trade = Trade.from_record(record, columns)
                     if trade.msg_id in response:
                         response[trade.msg_id].append(trade)
                     else:
@@ -396,19 +621,23 @@ class dbHandler:
             cursor.close()  # Close the cursor
             conn.close()  # Close the connection
 
-    def update_trade(self, update_data):
+    def update_trade(self, update_data, columns=None):
         """
-        Update the columns of a trade dynamically based on the provided update data.
+        Update the modified columns of a trade, nothing is sent to the database if none changed.
 
         Args:
             update_data (Trade): An instance of the Trade class containing updated data.
+            columns (list, optional): Columns to write, defaults to the ones changed since the trade was loaded.
 
         Raises:
             Exception: If there is an error during the update operation.
         """
+        trade_dict = update_data.changes() if columns is None else {column: getattr(update_data, column) for column in columns}
+        if not trade_dict:
+            logger.info(f"☑️ Trade with ID {update_data.msg_id} unchanged. No update made.")
+            return
         conn = self._connect()  # Establish connection
         cursor = conn.cursor()
-        trade_dict = update_data.to_dict()
         # Dynamically create the SET clause and values tuple
         set_clause = ', '.join([f"{key} = %s" for key in trade_dict.keys()])
         values = tuple(trade_dict.values()) + (update_data.trade_id, update_data.msg_id, int(update_data.order_id))  # Add message_id as the last value for WHERE clause
@@ -425,6 +654,7 @@ class dbHandler:
             conn.commit()
 
             # Check if the update was successful (rows affected)
+            update_data.mark_clean()
             if cursor.rowcount > 0:
                 logger.info(f"✅ Trade with ID {update_data.msg_id} updated successfully.")
             else:
@@ -439,12 +669,62 @@ class dbHandler:
             cursor.close()  # Close the cursor
             conn.close()  # Close the connection
 
+    def update_trades(self, trades, columns=None):
+        """
+        Update the modified columns of several trades with a single statement.
+
+        The new values are sent as one JSON array expanded with jsonb_populate_recordset, so they are
+        typed by the trade table itself.
+
+        Args:
+            trades (list): The Trade instances to update, unchanged ones are skipped.
+            columns (list, optional): Columns to write, defaults to every column changed on any of the trades.
+
+        Returns:
+            int: The number of rows updated.
+
+        Raises:
+            Exception: If there is an error during the update operation.
+        """
+        if columns is None:
+            changed = [trade.changes() for trade in trades]
+            trades = [trade for trade, changes in zip(trades, changed) if changes]
+            columns = [column for column in Trade.UPDATE_COLUMNS if any(column in changes for changes in changed)]
+        if not trades or not columns:
+            logger.info("☑️ No trade changed. No update made.")
+            return 0
+        conn = self._connect()
+        cursor = conn.cursor()
+        key_columns = ('trade_id', 'msg_id', 'order_id')
+        rows = [{column: getattr(trade, column) for column in (*key_columns, *columns)} for trade in trades]
+        set_clause = ', '.join([f"{column} = v.{column}" for column in columns])
+        update_query = f"""
+            UPDATE trade t
+            SET {set_clause}
+            FROM jsonb_populate_recordset(NULL::trade, %s::jsonb) v
+            WHERE t.trade_id = v.trade_id and t.msg_id = v.msg_id and t.order_id = v.order_id;
+        """
+        try:
+            cursor.execute(update_query, (json.dumps(rows),))
+            conn.commit()
+            for trade in trades:
+                trade.mark_clean()
+            logger.info(f"✅ {cursor.rowcount} trades updated successfully.")
+            return cursor.rowcount
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Error updating trades: {e}")
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
     def get_open_trades_based_on_src_tg_chat(self, tg_src_chat_name):
         conn = self._connect()
         cursor = conn.cursor()
 
-        query = """
-                select * from trade t join tg_message tm on t.msg_id = tm.msg_id where t.status = 'open' and tm.tg_src_chat_name = %s;
+        query = f"""
+                select {Trade.select_list(alias='t')} from trade t join tg_message tm on t.msg_id = tm.msg_id where t.status = 'open' and tm.tg_src_chat_name = %s;
                 """
         response = []
         try:
@@ -453,10 +733,9 @@ class dbHandler:
 
             if records:
                 logger.info(f"✅ Trade found with ID: {tg_src_chat_name}")
+                columns = self._column_names(cursor)
                 for record in records:
-                    trade = Trade(trade_id=record[0], msg_id=record[1], order_id=record[2], account_id=record[3],
-                                  symbol=record[4], direction=record[5], entry_price=record[6], stop_loss=record[7],
-                                  take_profit=record[8], break_even=record[9], volume=record[10], status=record[11])
+                    trade = Trade.from_record(record, columns)
                     response.append(trade)
                 return response
             else:
@@ -470,6 +749,55 @@ class dbHandler:
         finally:
             cursor.close()
             conn.close()
+
+    def get_open_trades_of_latest_signal(self, tg_src_chat_id):
+        """
+        Get the open trades of the most recent signal posted by a source channel.
+
+        Used to resolve BE/close messages sent without a reply: only the latest signal of the channel
+        is touched. Both lookups are served by the partial index on open trades by tg_src_chat_id.
+
+        Args:
+            tg_src_chat_id (str): The Telegram chat ID of the source channel.
+
+        Returns:
+            list: A list of Trade instances of the latest open signal, or None if no trades are found.
+
+        Raises:
+            Exception: If there is an error during the query.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        query = f"""
+                SELECT {Trade.select_list()} FROM trade
+                WHERE status = 'open' AND tg_src_chat_id = %s AND msg_id = (
+                    SELECT max(msg_id) FROM trade WHERE status = 'open' AND tg_src_chat_id = %s
+                );
+                """
+        response = []
+        try:
+            cursor.execute(query, (str(tg_src_chat_id), str(tg_src_chat_id),))
+            records = cursor.fetchall()
+
+            if records:
+                logger.info(f"✅ Trade found for the latest signal of chat: {tg_src_chat_id}")
+                columns = self._column_names(cursor)
+                for record in records:
+                    trade = Trade.from_record(record, columns)
+                    response.append(trade)
+                return response
+            else:
+                logger.warning(f"❌ No open trade found for chat: {tg_src_chat_id}")
+                return None
+
+        except Exception as e:
+            logger.error(f"❌ Error fetching the open trades of the latest signal: {e}")
+            raise e
+
+        finally:
+            cursor.close()
+            conn.close()
 # ======================================================================================================================
 # TRADE UPDATE
 # ======================================================================================================================
@@ -539,48 +867,7 @@ class dbHandler:
         """
         conn = self._connect()
         cursor = conn.cursor()
-        select_query = """
-        SELECT
-            a.mt5_account_id,
-            a.mt5_server,
-            a.mt5_broker,
-            a.mt5_balance,
-            a.mt5_password,
-            a.environment,
-            a.tg_id,
-            a.tg_phone,
-            a.tg_channels,
-            a.tg_session,
-            a.tg_hash,
-        COALESCE(
-            json_agg(
-                json_build_object(
-                    'instrument', bsc.instrument,
-                    'symbol', bsc.symbol,
-                    'n_trades', bsc.n_trades,
-                    'lot_size', bsc.lot_size
-                )
-            ) FILTER (WHERE bc.id IS NOT NULL), '[]'
-        ) AS symbol_configurations
-        FROM
-            account a
-        LEFT JOIN broker_config bc ON a.mt5_account_id = bc.account_id
-        LEFT JOIN broker_symbol_config bsc ON bc.id = bsc.broker_config_id
-        WHERE
-            a.mt5_account_id = %s
-        GROUP BY
-            a.mt5_account_id,
-            a.mt5_server,
-            a.mt5_broker,
-            a.mt5_balance,
-            a.mt5_password,
-            a.environment,
-            a.tg_id,
-            a.tg_phone,
-            a.tg_channels,
-            a.tg_session,
-            a.tg_hash;
-        """
+        select_query = ACCOUNT_CONFIG_QUERY.format(condition="a.mt5_account_id = %s")
         try:
             # Execute the SELECT query with the provided account_id
             cursor.execute(select_query, (account_id,))
@@ -589,7 +876,7 @@ class dbHandler:
             if record:
                 # If a record is found, log the success and create an Account instance
                 logger.info(f"✅ Account found with ID: {account_id}")
-                account = Account(mt5_account_id=record[0], mt5_server=record[1], mt5_broker=record[2], mt5_balance=record[3], mt5_password=record[4],environment=record[5], tg_id=record[6], tg_phone=record[7], tg_channels=record[8], tg_session=record[9], tg_hash=record[10], symbol_config=record[11])
+                account = Account.from_record(record, self._column_names(cursor))
                 return account
             else:
                 # If no record is found, log a warning and return None
@@ -617,14 +904,15 @@ class dbHandler:
         cursor = conn.cursor()
 
         response = []
-        select_query = """select * from account where account.environment = %s;"""
+        select_query = f"""select {Account.select_list()} from account where account.environment = %s;"""
         try:
             cursor.execute(select_query, (env,))
             records = cursor.fetchall()
             if records:
                 logger.info(f"✅ Account found with environment: {env}")
+                columns = self._column_names(cursor)
                 for record in records:
-                    account = Account(mt5_account_id=record[0], mt5_server=record[1], mt5_broker=record[2], mt5_balance=record[3], mt5_password=record[4],environment=record[5], tg_id=record[6], tg_phone=record[7], tg_channels=record[8], tg_session=record[9], tg_hash=record[10])
+                    account = Account.from_record(record, columns)
                     response.append(account)
                 return response
             else:
@@ -637,4 +925,247 @@ class dbHandler:
 
         finally:
             cursor.close()  # Close the cursor
-            conn.close()  # Close the connection
\ No newline at end of file
+            conn.close()  # Close the connection
+
+    def get_software_accounts_config_based_on_env(self, env):
+        """
+        Retrieve all the software accounts of an environment with their symbol configuration.
+
+        Args:
+            env (str): Environment value to get the account list.
+
+        Returns:
+            list: A list of Account instances with symbol_config set, or None if no account is found.
+
+        Raises:
+            Exception: If there is an error during the database query.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        response = []
+        select_query = ACCOUNT_CONFIG_QUERY.format(condition="a.environment = %s")
+        try:
+            cursor.execute(select_query, (env,))
+            records = cursor.fetchall()
+            if records:
+                logger.info(f"✅ Account configuration found with environment: {env}")
+                columns = self._column_names(cursor)
+                for record in records:
+                    account = Account.from_record(record, columns)
+                    response.append(account)
+                return response
+            else:
+                logger.warning(f"❌ Account configuration not found with env: {env}")
+                return None
+        except Exception as e:
+            conn.rollback()  # Rollback in case of error
+            logger.error(f"❌ Error getting account configuration with env {env}: {e}")
+            raise e
+
+        finally:
+            cursor.close()  # Close the cursor
+            conn.close()  # Close the connection
+
+    def get_config_version(self):
+        """
+        Get the current version of the account configuration, bumped by every configuration change.
+
+        Returns:
+            int: The configuration version, 0 if it was never bumped.
+
+        Raises:
+            Exception: If there is an error during the database query.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        select_query = """SELECT version FROM config_version WHERE id = 1;"""
+        try:
+            cursor.execute(select_query)
+            record = cursor.fetchone()
+            return record[0] if record else 0
+        except Exception as e:
+            logger.error(f"❌ Error getting the configuration version: {e}")
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
+    def listen(self, channel):
+        """
+        Open a dedicated connection subscribed to a NOTIFY channel.
+
+        Args:
+            channel (str): The name of the channel to LISTEN on.
+
+        Returns:
+            connection: An autocommit connection; notifications are read with poll() and notifies.
+
+        Raises:
+            Exception: If the connection or the LISTEN statement fails.
+        """
+        conn = self._connect()
+        if conn is None:
+            raise ConnectionError(f"Cannot listen on channel {channel}, database not available.")
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+        cursor.execute(f"LISTEN {channel};")
+        cursor.close()
+        logger.info(f"✅ Listening on channel: {channel}")
+        return conn
+
+# ======================================================================================================================
+# CHANNEL ROUTE
+# ======================================================================================================================
+    def get_channel_routes(self):
+        """
+        Retrieve the routing table of the source channels.
+
+        Returns:
+            list: A list of ChannelRoute instances, empty if no channel is routed.
+
+        Raises:
+            Exception: If there is an error during the database query.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        select_query = f"""SELECT {ChannelRoute.select_list()} FROM channel_route;"""
+        try:
+            cursor.execute(select_query)
+            records = cursor.fetchall()
+            columns = self._column_names(cursor)
+            return [ChannelRoute.from_record(record, columns) for record in records]
+        except Exception as e:
+            logger.error(f"❌ Error getting the channel routes: {e}")
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
+# ======================================================================================================================
+# HISTORY PARTITIONS
+# ======================================================================================================================
+    def ensure_partitions(self, months_ahead=2):
+        """
+        Create the monthly partitions of the history tables up to a few months ahead.
+
+        Args:
+            months_ahead (int): Number of months after the current one to create.
+
+        Returns:
+            int: The number of partitions created.
+
+        Raises:
+            Exception: If there is an error while creating the partitions.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        select_query = """SELECT create_monthly_partitions(%s, now()::date, (now() + %s * INTERVAL '1 month')::date);"""
+        try:
+            created = 0
+            for table in PARTITIONED_TABLES:
+                cursor.execute(select_query, (table, months_ahead))
+                created += cursor.fetchone()[0]
+            conn.commit()
+            if created:
+                logger.info(f"✅ {created} history partitions created.")
+            return created
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Error creating history partitions: {e}")
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_partitions(self, table):
+        """
+        List the monthly partitions of a history table.
+
+        Args:
+            table (str): The partitioned table, one of PARTITIONED_TABLES.
+
+        Returns:
+            list: (partition name, first day of the month) pairs, oldest first. The default partition is not listed.
+
+        Raises:
+            Exception: If there is an error during the query.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        select_query = """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass AND c.relname ~ '_p[0-9]{4}_[0-9]{2}$'
+            ORDER BY c.relname;
+        """
+        try:
+            cursor.execute(select_query, (table,))
+            partitions = []
+            for (partition,) in cursor.fetchall():
+                year, month = partition.rsplit('_p', 1)[1].split('_')
+                partitions.append((partition, date(int(year), int(month), 1)))
+            return partitions
+        except Exception as e:
+            logger.error(f"❌ Error listing the partitions of {table}: {e}")
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
+    def copy_partition(self, partition, columns, file):
+        """
+        Stream the rows of a partition as CSV, with a header, with COPY ... TO STDOUT.
+
+        Args:
+            partition (str): The partition to export.
+            columns (list): The columns to export, in order.
+            file: A binary file-like object the CSV is written to.
+
+        Returns:
+            int: The number of rows in the partition, counted in the same snapshot as the export.
+
+        Raises:
+            Exception: If there is an error during the export.
+        """
+        conn = self._connect()
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        cursor = conn.cursor()
+        copy_query = f"""COPY (SELECT {', '.join(columns)} FROM {partition}) TO STDOUT WITH (FORMAT csv, HEADER true);"""
+        try:
+            cursor.execute(f"""SELECT count(*) FROM {partition};""")
+            rows = cursor.fetchone()[0]
+            cursor.copy_expert(copy_query, file)
+            return rows
+        except Exception as e:
+            logger.error(f"❌ Error exporting partition {partition}: {e}")
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
+
+    def drop_partition(self, table, partition):
+        """
+        Detach a partition from its history table and drop it.
+
+        Args:
+            table (str): The partitioned table.
+            partition (str): The partition to drop.
+
+        Raises:
+            Exception: If there is an error while dropping the partition.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""ALTER TABLE {table} DETACH PARTITION {partition};""")
+            cursor.execute(f"""DROP TABLE {partition};""")
+            conn.commit()
+            logger.info(f"✅ Partition {partition} dropped from {table}.")
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ Error dropping partition {partition}: {e}")
+            raise e
+        finally:
+            cursor.close()
+            conn.close()
@@ -0,0 +1,367 @@
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+from data.dbHandler import dbHandler
+from data.tg_message import Message
+from data.trade import Trade
+from data.tradeUpdate import TradeUpdate
+
+logger = logging.getLogger(__name__)
+
+# Marker written at the start of a compacted journal, it only carries the last sequence number.
+COMPACTED = 'compacted'
+
+
+class SignalJournal:
+    """
+    Local append-only journal of every database write made while handling signals.
+
+    Writes are appended as JSON lines and flushed to the OS immediately, fsync is batched: it runs
+    every fsync_batch entries or at most fsync_interval seconds after the first unsynced entry.
+    The journal exposes the same write methods as dbHandler, so the handlers record messages, opened
+    trades and trade updates locally without waiting on Postgres; JournalReplayer then applies them
+    to the database in order.
+
+    Rows that do not exist in the database yet are referenced by a negative key, -seq of the entry
+    that created them, which the replayer swaps for the real ID.
+    """
+
+    def __init__(self, path: str, fsync_interval: float = 0.05, fsync_batch: int = 64) -> None:
+        """
+        Open (or create) the journal file.
+
+        Args:
+            path (str): Path of the journal file.
+            fsync_interval (float): Maximum delay in seconds before an appended entry is fsynced.
+            fsync_batch (int): Number of unsynced entries that triggers an immediate fsync.
+        """
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._seq = self._last_seq()
+        self._file = open(path, 'ab')
+        self._unsynced = 0
+        self._closed = threading.Event()
+        self._dirty = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="journal-fsync", daemon=True)
+        self._flusher.start()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # dbHandler write interface
+    # ------------------------------------------------------------------------------------------------------------------
+    def insert_message(self, message: Message) -> int:
+        """Journal a new message and return its temporary (negative) msg_id."""
+        seq = self.append('insert_message', asdict(message))
+        message.mark_clean()
+        return -seq
+
+    def insert_trade(self, trade: Trade) -> int:
+        """Journal an opened trade and return its temporary (negative) trade_id."""
+        seq = self.append('insert_trade', asdict(trade))
+        trade.mark_clean()
+        return -seq
+
+    def update_trade(self, trade: Trade) -> None:
+        """Journal the modified columns of a trade, nothing is journaled if none changed."""
+        changes = trade.changes()
+        if changes:
+            self.append('update_trade', {'record': asdict(trade), 'columns': list(changes)})
+            trade.mark_clean()
+
+    def update_trades(self, trades: List[Trade]) -> None:
+        """Journal the modified columns of several trades as a single batched update."""
+        changed = [trade.changes() for trade in trades]
+        trades = [trade for trade, changes in zip(trades, changed) if changes]
+        if trades:
+            columns = [column for column in Trade.UPDATE_COLUMNS if any(column in changes for changes in changed)]
+            self.append('update_trades', {'records': [asdict(trade) for trade in trades], 'columns': columns})
+            for trade in trades:
+                trade.mark_clean()
+
+    def update_message(self, message: Message) -> None:
+        """Journal the modified columns of a message, nothing is journaled if none changed."""
+        changes = message.changes()
+        if changes:
+            self.append('update_message', {'record': asdict(message), 'columns': list(changes)})
+            message.mark_clean()
+
+    def insert_trade_update(self, trade_update) -> None:
+        """Journal one TradeUpdate or a list of them."""
+        trade_updates = trade_update if isinstance(trade_update, list) else [trade_update]
+        if trade_updates:
+            self.append('insert_trade_update', [asdict(tu) for tu in trade_updates])
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Journal file
+    # ------------------------------------------------------------------------------------------------------------------
+    def append(self, op: str, data: Any) -> int:
+        """
+        Append an entry to the journal.
+
+        Args:
+            op (str): The database operation to replay.
+            data (Any): The JSON serializable payload of the operation.
+
+        Returns:
+            int: The sequence number of the entry.
+        """
+        with self._lock:
+            self._seq += 1
+            self._write({'seq': self._seq, 'op': op, 'data': data})
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch:
+                self._fsync()
+            else:
+                self._dirty.set()
+            return self._seq
+
+    def read_from(self, offset: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Read the complete entries written after the given offset.
+
+        Args:
+            offset (int): Byte offset to start reading from.
+
+        Returns:
+            List[Tuple[int, Dict[str, Any]]]: The entries, each with the offset following it.
+        """
+        size = os.path.getsize(self.path)
+        if size <= offset:
+            return []
+        entries = []
+        with open(self.path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as journal:
+            position = offset
+            while position < size:
+                end = journal.find(b'\n', position, size)
+                if end == -1:
+                    break  # Entry still being written
+                entries.append((end + 1, json.loads(journal[position:end])))
+                position = end + 1
+        return entries
+
+    def compact(self, offset: int) -> Optional[int]:
+        """
+        Empty the journal if every entry up to its end has been replayed.
+
+        Args:
+            offset (int): Offset up to which the entries have been replayed.
+
+        Returns:
+            Optional[int]: The new replay offset if the journal was compacted, None otherwise.
+        """
+        with self._lock:
+            self._file.flush()
+            if os.path.getsize(self.path) != offset:
+                return None
+            self._file.truncate(0)
+            self._write({'seq': self._seq, 'op': COMPACTED, 'data': None})
+            self._fsync()
+            return os.path.getsize(self.path)
+
+    def size(self) -> int:
+        """Return the size in bytes of the journal file."""
+        return os.path.getsize(self.path)
+
+    def close(self) -> None:
+        """Fsync the pending entries and close the journal."""
+        self._closed.set()
+        self._dirty.set()
+        self._flusher.join(timeout=1)
+        with self._lock:
+            self._fsync()
+            self._file.close()
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._file.write((json.dumps(entry, default=str) + '\n').encode('utf-8'))
+        self._file.flush()
+
+    def _fsync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._dirty.clear()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._dirty.wait()
+            time.sleep(self.fsync_interval)
+            with self._lock:
+                if self._unsynced and not self._file.closed:
+                    self._fsync()
+
+    def _last_seq(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        last_seq = 0
+        with open(self.path, 'rb') as file:
+            for line in file:
+                try:
+                    last_seq = json.loads(line)['seq']
+                except (ValueError, KeyError):
+                    logger.warning(f"⚠️ Skipping truncated journal entry in {self.path}")
+        return last_seq
+
+
+class JournalReplayer:
+    def __init__(self, journal: SignalJournal, db_handler: dbHandler, checkpoint_path: Optional[str] = None,
+                 retry_delay: float = 5.0, max_attempts: int = 5, compact_size: int = 1024 * 1024,
+                 max_ids: int = 10000) -> None:
+        """
+        Initialize the replayer that applies the journal to the database.
+
+        Args:
+            journal (SignalJournal): The journal to replay.
+            db_handler (dbHandler): The database handler to write to.
+            checkpoint_path (Optional[str]): Where the replay position is saved, defaults to '<journal>.checkpoint'.
+            retry_delay (float): Seconds to wait before retrying when the database is not available.
+            max_attempts (int): Failures of an entry, with the database available, before it is moved
+                to the '<journal>.failed' file.
+            compact_size (int): Journal size in bytes above which it is emptied once fully replayed.
+            max_ids (int): Number of temporary IDs kept to resolve references between entries.
+        """
+        self.journal = journal
+        self.db_handler = db_handler
+        self.checkpoint_path = checkpoint_path or f"{journal.path}.checkpoint"
+        self.failed_path = f"{journal.path}.failed"
+        self.retry_delay = retry_delay
+        self.max_attempts = max_attempts
+        self.compact_size = compact_size
+        self.max_ids = max_ids
+        self.offset, self.ids = self._load_checkpoint()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Start replaying the journal in a background thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="journal-replayer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background replay."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.retry_delay)
+
+    def replay_pending(self) -> int:
+        """
+        Apply to the database every journal entry not replayed yet.
+
+        Returns:
+            int: The number of entries applied.
+
+        Raises:
+            Exception: If an entry cannot be applied, the replay position stays on that entry.
+        """
+        if self.offset > self.journal.size():
+            # The journal was compacted after the last checkpoint, everything in it was replayed.
+            self.offset = 0
+        applied = 0
+        for next_offset, entry in self.journal.read_from(self.offset):
+            if entry['op'] != COMPACTED:
+                self._apply_with_retry(entry)
+                applied += 1
+            self.offset = next_offset
+            self._save_checkpoint()
+
+        if self.offset >= self.compact_size:
+            new_offset = self.journal.compact(self.offset)
+            if new_offset is not None:
+                self.offset = new_offset
+                self._save_checkpoint()
+        return applied
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if not self.replay_pending():
+                    self._stop.wait(0.05)
+            except Exception as e:
+                logger.error(f"❌ Error replaying the journal: {e}, retrying in {self.retry_delay} seconds...")
+                self._stop.wait(self.retry_delay)
+
+    def _apply_with_retry(self, entry: Dict[str, Any]) -> None:
+        attempts = 0
+        while True:
+            try:
+                self._apply(entry)
+                return
+            except Exception as e:
+                if not self.db_handler.is_available():
+                    logger.warning(f"⚠️ Database not available, journal entry {entry['seq']} kept for replay: {e}")
+                    if self._stop.wait(self.retry_delay):
+                        raise
+                    continue
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    logger.error(f"❌ Journal entry {entry['seq']} failed {attempts} times, moved to {self.failed_path}: {e}")
+                    with open(self.failed_path, 'a', encoding='utf-8') as failed:
+                        failed.write(json.dumps(entry, default=str) + '\n')
+                    return
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        op, data = entry['op'], entry['data']
+        if op == 'insert_message':
+            self._remember(entry['seq'], self.db_handler.insert_message(Message(**data)))
+        elif op == 'insert_trade':
+            trade = Trade(**data)
+            trade.msg_id = self._resolve(trade.msg_id)
+            self._remember(entry['seq'], self.db_handler.insert_trade(trade))
+        elif op == 'update_trade':
+            self.db_handler.update_trade(self._resolve_trade(data['record']), data['columns'])
+        elif op == 'update_trades':
+            trades = [self._resolve_trade(record) for record in data['records']]
+            self.db_handler.update_trades(trades, data['columns'])
+        elif op == 'update_message':
+            message = Message(**data['record'])
+            message.msg_id = self._resolve(message.msg_id)
+            self.db_handler.update_message(message, data['columns'])
+        elif op == 'insert_trade_update':
+            trade_updates = [TradeUpdate(**item) for item in data]
+            for trade_update in trade_updates:
+                trade_update.trade_id = self._resolve(trade_update.trade_id)
+            self.db_handler.insert_trade_update(trade_updates)
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+    def _resolve_trade(self, record: Dict[str, Any]) -> Trade:
+        trade = Trade(**record)
+        trade.msg_id = self._resolve(trade.msg_id)
+        trade.trade_id = self._resolve(trade.trade_id)
+        return trade
+
+    def _remember(self, seq: int, record_id: int) -> None:
+        self.ids[-seq] = record_id
+        while len(self.ids) > self.max_ids:
+            self.ids.pop(next(iter(self.ids)))
+
+    def _resolve(self, record_id: Optional[int]) -> Optional[int]:
+        if record_id is not None and record_id < 0:
+            if record_id not in self.ids:
+                raise KeyError(f"Temporary ID {record_id} not replayed")
+            return self.ids[record_id]
+        return record_id
+
+    def _load_checkpoint(self) -> Tuple[int, Dict[int, int]]:
+        if not os.path.exists(self.checkpoint_path):
+            return 0, {}
+        with open(self.checkpoint_path, 'r', encoding='utf-8') as checkpoint:
+            data = json.load(checkpoint)
+        return data['offset'], {int(key): value for key, value in data['ids'].items()}
+
+    def _save_checkpoint(self) -> None:
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as checkpoint:
+            json.dump({'offset': self.offset, 'ids': self.ids}, checkpoint)
+            checkpoint.flush()
+            os.fsync(checkpoint.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
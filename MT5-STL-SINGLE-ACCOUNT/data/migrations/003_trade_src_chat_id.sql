@@ -0,0 +1,10 @@
+-- Source channel of the signal, denormalized from tg_message so that blanket BE/close messages
+-- resolve their trades without joining on the channel name.
+ALTER TABLE trade ADD COLUMN IF NOT EXISTS tg_src_chat_id TEXT;
+---
+UPDATE trade t
+SET tg_src_chat_id = tm.tg_chat_id
+FROM tg_message tm
+WHERE t.msg_id = tm.msg_id AND t.tg_src_chat_id IS NULL;
+---
+CREATE INDEX IF NOT EXISTS idx_trade_open_src_chat_id_msg_id ON trade (tg_src_chat_id, msg_id DESC) WHERE status = 'open';
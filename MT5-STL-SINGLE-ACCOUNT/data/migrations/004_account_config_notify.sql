@@ -0,0 +1,32 @@
+-- Version of the account configuration, bumped together with a NOTIFY on every change of
+-- account, broker_config or broker_symbol_config so running instances reload it live.
+CREATE TABLE IF NOT EXISTS config_version (
+    id INTEGER PRIMARY KEY DEFAULT 1,
+    version BIGINT NOT NULL DEFAULT 0,
+    CHECK (id = 1)
+);
+---
+INSERT INTO config_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+---
+CREATE OR REPLACE FUNCTION notify_account_config() RETURNS trigger AS $$
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+    PERFORM pg_notify('account_config', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+---
+DROP TRIGGER IF EXISTS account_config_changed ON account;
+---
+CREATE TRIGGER account_config_changed AFTER INSERT OR UPDATE OR DELETE ON account
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_account_config();
+---
+DROP TRIGGER IF EXISTS account_config_changed ON broker_config;
+---
+CREATE TRIGGER account_config_changed AFTER INSERT OR UPDATE OR DELETE ON broker_config
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_account_config();
+---
+DROP TRIGGER IF EXISTS account_config_changed ON broker_symbol_config;
+---
+CREATE TRIGGER account_config_changed AFTER INSERT OR UPDATE OR DELETE ON broker_symbol_config
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_account_config();
@@ -0,0 +1,106 @@
+-- Monthly range partitioning of the message and trade update history, so old months can be
+-- archived and dropped (see HistoryArchiver) and the hot partitions and their indexes stay small.
+-- The primary keys must include the partition key, so trade.msg_id can no longer reference tg_message.
+ALTER TABLE trade DROP CONSTRAINT IF EXISTS trade_msg_id_fkey;
+---
+-- Create the missing monthly partitions '<parent>_pYYYY_MM' of a table between two months.
+CREATE OR REPLACE FUNCTION create_monthly_partitions(parent TEXT, from_month DATE, to_month DATE) RETURNS INTEGER AS $$
+DECLARE
+    month DATE := date_trunc('month', from_month);
+    partition TEXT;
+    created INTEGER := 0;
+BEGIN
+    WHILE month <= to_month LOOP
+        partition := format('%s_p%s', parent, to_char(month, 'YYYY_MM'));
+        IF to_regclass(partition) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                           partition, parent, month, (month + INTERVAL '1 month')::date);
+            created := created + 1;
+        END IF;
+        month := (month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+---
+ALTER TABLE tg_message RENAME TO tg_message_unpartitioned;
+---
+ALTER TABLE tg_message_unpartitioned RENAME CONSTRAINT tg_message_pkey TO tg_message_unpartitioned_pkey;
+---
+ALTER SEQUENCE tg_message_msg_id_seq OWNED BY NONE;
+---
+CREATE TABLE tg_message (
+    msg_id INTEGER NOT NULL DEFAULT nextval('tg_message_msg_id_seq'),
+    tg_msg_id INTEGER,
+    tg_chat_id TEXT,
+    tg_src_chat_name TEXT,
+    tg_dst_chat_id TEXT,
+    tg_dst_msg_id INTEGER,
+    msg_body TEXT,
+    msg_timestamp TIMESTAMP NOT NULL DEFAULT now(),
+    msg_status TEXT,
+    PRIMARY KEY (msg_id, msg_timestamp)
+) PARTITION BY RANGE (msg_timestamp);
+---
+ALTER SEQUENCE tg_message_msg_id_seq OWNED BY tg_message.msg_id;
+---
+CREATE TABLE tg_message_default PARTITION OF tg_message DEFAULT;
+---
+SELECT create_monthly_partitions(
+    'tg_message',
+    COALESCE((SELECT min(msg_timestamp) FROM tg_message_unpartitioned), now())::date,
+    (now() + INTERVAL '2 months')::date
+);
+---
+INSERT INTO tg_message (msg_id, tg_msg_id, tg_chat_id, tg_src_chat_name, tg_dst_chat_id, tg_dst_msg_id, msg_body, msg_timestamp, msg_status)
+SELECT msg_id, tg_msg_id, tg_chat_id, tg_src_chat_name, tg_dst_chat_id, tg_dst_msg_id, msg_body, COALESCE(msg_timestamp, now()), msg_status
+FROM tg_message_unpartitioned;
+---
+DROP TABLE tg_message_unpartitioned;
+---
+CREATE INDEX IF NOT EXISTS idx_tg_message_tg_msg_id_tg_chat_id ON tg_message (tg_msg_id, tg_chat_id);
+---
+-- tradeupdate had no timestamp: created_at is backfilled with the time of the signal message.
+ALTER TABLE tradeupdate RENAME TO tradeupdate_unpartitioned;
+---
+ALTER TABLE tradeupdate_unpartitioned RENAME CONSTRAINT tradeupdate_pkey TO tradeupdate_unpartitioned_pkey;
+---
+ALTER SEQUENCE tradeupdate_trade_update_id_seq OWNED BY NONE;
+---
+CREATE TABLE tradeupdate (
+    trade_update_id INTEGER NOT NULL DEFAULT nextval('tradeupdate_trade_update_id_seq'),
+    trade_id INTEGER,
+    order_id INTEGER,
+    account_id INTEGER,
+    update_action TEXT,
+    update_body TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (trade_update_id, created_at),
+    FOREIGN KEY (trade_id) REFERENCES trade(trade_id)
+) PARTITION BY RANGE (created_at);
+---
+ALTER SEQUENCE tradeupdate_trade_update_id_seq OWNED BY tradeupdate.trade_update_id;
+---
+CREATE TABLE tradeupdate_default PARTITION OF tradeupdate DEFAULT;
+---
+CREATE TEMPORARY TABLE tradeupdate_backfill AS
+SELECT tu.*, COALESCE(tm.msg_timestamp, now()) AS created_at
+FROM tradeupdate_unpartitioned tu
+LEFT JOIN trade t ON t.trade_id = tu.trade_id
+LEFT JOIN tg_message tm ON tm.msg_id = t.msg_id;
+---
+SELECT create_monthly_partitions(
+    'tradeupdate',
+    COALESCE((SELECT min(created_at) FROM tradeupdate_backfill), now())::date,
+    (now() + INTERVAL '2 months')::date
+);
+---
+INSERT INTO tradeupdate (trade_update_id, trade_id, order_id, account_id, update_action, update_body, created_at)
+SELECT trade_update_id, trade_id, order_id, account_id, update_action, update_body, created_at
+FROM tradeupdate_backfill;
+---
+DROP TABLE tradeupdate_backfill;
+---
+DROP TABLE tradeupdate_unpartitioned;
+---
+CREATE INDEX IF NOT EXISTS idx_tradeupdate_trade_id ON tradeupdate (trade_id);
@@ -0,0 +1,30 @@
+-- Routing of the source channels by chat ID: forward destination, parser profile, accounts trading
+-- the signals (comma separated, NULL for every account) and priority in the signal queue.
+CREATE TABLE IF NOT EXISTS channel_route (
+    chat_id BIGINT PRIMARY KEY,
+    name TEXT,
+    dst_chat_id BIGINT NOT NULL,
+    parser_profile TEXT NOT NULL DEFAULT 'default',
+    accounts TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    enabled BOOLEAN NOT NULL DEFAULT TRUE
+);
+---
+-- The gold channel was only known by its title, its chat ID is found from the messages stored with
+-- that title and routed to the gold destination; the other channels of the accounts to the index one.
+-- A gold channel without stored messages must be routed to -1002404066652 by hand.
+INSERT INTO channel_route (chat_id, dst_chat_id)
+SELECT DISTINCT trim(channel)::BIGINT,
+       CASE WHEN EXISTS (
+           SELECT 1 FROM tg_message
+           WHERE tg_message.tg_chat_id::TEXT = trim(channel)
+             AND tg_message.tg_src_chat_name = 'Pips Exchange (FX & Gold VIP)'
+       ) THEN -1002404066652 ELSE -1002535578509 END
+FROM account, unnest(string_to_array(tg_channels, ',')) AS channel
+WHERE trim(channel) <> ''
+ON CONFLICT (chat_id) DO NOTHING;
+---
+DROP TRIGGER IF EXISTS account_config_changed ON channel_route;
+---
+CREATE TRIGGER account_config_changed AFTER INSERT OR UPDATE OR DELETE ON channel_route
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_account_config();
@@ -0,0 +1,11 @@
+-- The seeded routes have no name, the stored source name would be the chat ID: name them after the
+-- title of the latest message stored from the channel.
+UPDATE channel_route SET name = (
+    SELECT tg_src_chat_name FROM tg_message
+    WHERE tg_message.tg_chat_id = channel_route.chat_id::TEXT
+      AND tg_src_chat_name IS NOT NULL
+      AND tg_src_chat_name <> channel_route.chat_id::TEXT
+    ORDER BY msg_timestamp DESC
+    LIMIT 1
+)
+WHERE name IS NULL;
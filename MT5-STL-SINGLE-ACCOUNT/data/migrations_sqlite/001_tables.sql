@@ -0,0 +1,133 @@
+-- SQLite schema of the embedded storage backend, equivalent to the Postgres migrations 001 to 004.
+CREATE TABLE IF NOT EXISTS tg_message (
+    msg_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tg_msg_id INTEGER,
+    tg_chat_id TEXT,
+    tg_src_chat_name TEXT,
+    tg_dst_chat_id TEXT,
+    tg_dst_msg_id INTEGER,
+    msg_body TEXT,
+    msg_timestamp TEXT,
+    msg_status TEXT
+);
+---
+CREATE TABLE IF NOT EXISTS trade (
+    trade_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    msg_id INTEGER,
+    order_id INTEGER,
+    account_id INTEGER,
+    symbol TEXT,
+    direction TEXT,
+    entry_price REAL,
+    stop_loss REAL,
+    take_profit REAL,
+    break_even REAL,
+    volume REAL,
+    status TEXT DEFAULT 'open',
+    tg_src_chat_id TEXT,
+    FOREIGN KEY (msg_id) REFERENCES tg_message(msg_id)
+);
+---
+CREATE TABLE IF NOT EXISTS tradeupdate (
+    trade_update_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trade_id INTEGER,
+    order_id INTEGER,
+    account_id INTEGER,
+    update_action TEXT,
+    update_body TEXT,
+    FOREIGN KEY (trade_id) REFERENCES trade(trade_id)
+);
+---
+CREATE TABLE IF NOT EXISTS account (
+    mt5_account_id INTEGER PRIMARY KEY,
+    mt5_server TEXT,
+    mt5_broker TEXT,
+    mt5_balance REAL,
+    mt5_password TEXT,
+    environment TEXT,
+    tg_id TEXT,
+    tg_phone TEXT,
+    tg_channels TEXT,
+    tg_session TEXT,
+    tg_hash TEXT
+);
+---
+CREATE TABLE IF NOT EXISTS broker_config (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account_id INTEGER,
+    broker_name TEXT,
+    FOREIGN KEY (account_id) REFERENCES account(mt5_account_id)
+);
+---
+CREATE TABLE IF NOT EXISTS broker_symbol_config (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    broker_config_id INTEGER,
+    instrument TEXT,
+    symbol TEXT,
+    n_trades INTEGER,
+    lot_size REAL,
+    FOREIGN KEY (broker_config_id) REFERENCES broker_config(id)
+);
+---
+CREATE INDEX IF NOT EXISTS idx_trade_msg_id ON trade (msg_id);
+---
+CREATE INDEX IF NOT EXISTS idx_trade_open_account_id ON trade (account_id) WHERE status = 'open';
+---
+CREATE INDEX IF NOT EXISTS idx_tg_message_tg_msg_id_tg_chat_id ON tg_message (tg_msg_id, tg_chat_id);
+---
+CREATE INDEX IF NOT EXISTS idx_tradeupdate_trade_id ON tradeupdate (trade_id);
+---
+CREATE INDEX IF NOT EXISTS idx_trade_open_src_chat_id_msg_id ON trade (tg_src_chat_id, msg_id DESC) WHERE status = 'open';
+---
+CREATE TABLE IF NOT EXISTS config_version (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version INTEGER NOT NULL DEFAULT 0
+);
+---
+INSERT OR IGNORE INTO config_version (id, version) VALUES (1, 0);
+---
+-- SQLite has no NOTIFY: the configuration version is bumped by row triggers and polled by ConfigService.
+CREATE TRIGGER IF NOT EXISTS account_insert_config_changed AFTER INSERT ON account
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS account_update_config_changed AFTER UPDATE ON account
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS account_delete_config_changed AFTER DELETE ON account
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS broker_config_insert_config_changed AFTER INSERT ON broker_config
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS broker_config_update_config_changed AFTER UPDATE ON broker_config
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS broker_config_delete_config_changed AFTER DELETE ON broker_config
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS broker_symbol_config_insert_config_changed AFTER INSERT ON broker_symbol_config
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS broker_symbol_config_update_config_changed AFTER UPDATE ON broker_symbol_config
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS broker_symbol_config_delete_config_changed AFTER DELETE ON broker_symbol_config
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
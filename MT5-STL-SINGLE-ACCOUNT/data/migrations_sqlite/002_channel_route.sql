@@ -0,0 +1,26 @@
+-- Routing of the source channels by chat ID: forward destination, parser profile, accounts trading
+-- the signals (comma separated, NULL for every account) and priority in the signal queue.
+CREATE TABLE IF NOT EXISTS channel_route (
+    chat_id INTEGER PRIMARY KEY,
+    name TEXT,
+    dst_chat_id INTEGER NOT NULL,
+    parser_profile TEXT NOT NULL DEFAULT 'default',
+    accounts TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    enabled INTEGER NOT NULL DEFAULT 1
+);
+---
+CREATE TRIGGER IF NOT EXISTS channel_route_insert_config_changed AFTER INSERT ON channel_route
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS channel_route_update_config_changed AFTER UPDATE ON channel_route
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
+---
+CREATE TRIGGER IF NOT EXISTS channel_route_delete_config_changed AFTER DELETE ON channel_route
+BEGIN
+    UPDATE config_version SET version = version + 1 WHERE id = 1;
+END;
@@ -0,0 +1,722 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from data.trade import Trade
+from data.tg_message import Message
+from data.tradeUpdate import TradeUpdate
+from data.account import Account
+from data.channelRoute import ChannelRoute
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations_sqlite')
+
+# Lookups on the signal hot path, checked by sqliteHandler.check_hot_query_plans().
+HOT_QUERIES = {
+    'get_message_by_id': ("SELECT msg_id FROM tg_message WHERE tg_msg_id = ? AND tg_chat_id = ?;", (0, '0')),
+    'get_trades_by_id': ("SELECT trade_id FROM trade WHERE msg_id = ?;", (0,)),
+    'get_all_trades': ("SELECT trade_id FROM trade WHERE status = 'open' and account_id = ?;", (0,)),
+    'get_open_trades_of_latest_signal': (
+        "SELECT max(msg_id) FROM trade WHERE status = 'open' AND tg_src_chat_id = ?;", ('0',)
+    ),
+}
+
+# Accounts with their broker symbol configuration aggregated in symbol_config, as a JSON array.
+ACCOUNT_CONFIG_QUERY = """
+        SELECT
+            a.mt5_account_id,
+            a.mt5_server,
+            a.mt5_broker,
+            a.mt5_balance,
+            a.mt5_password,
+            a.environment,
+            a.tg_id,
+            a.tg_phone,
+            a.tg_channels,
+            a.tg_session,
+            a.tg_hash,
+            (
+                SELECT json_group_array(json_object(
+                    'instrument', bsc.instrument,
+                    'symbol', bsc.symbol,
+                    'n_trades', bsc.n_trades,
+                    'lot_size', bsc.lot_size
+                ))
+                FROM broker_config bc
+                JOIN broker_symbol_config bsc ON bc.id = bsc.broker_config_id
+                WHERE bc.account_id = a.mt5_account_id
+            ) AS symbol_config
+        FROM
+            account a
+        WHERE
+            {condition};
+"""
+
+
+class sqliteHandler:
+    """
+    Embedded SQLite storage, with the same repository interface as dbHandler.
+
+    Meant for single account deployments: the database is a local file opened once in WAL mode,
+    so a signal is persisted with an in-process transaction instead of a network round trip and a
+    new Postgres connection. The connection is shared by the threads of the application and
+    serialized by a lock; statements are constant strings with '?' parameters, prepared once and
+    reused from the connection statement cache.
+    """
+    # SQLite has no LISTEN/NOTIFY, ConfigService polls get_config_version() instead.
+    SUPPORTS_NOTIFY = False
+
+    def __init__(self, config):
+        """
+        Initialize the sqliteHandler with the given configuration.
+
+        Args:
+            config (dict): A dictionary containing the database configuration, the file is config["SQLITE"]["PATH"].
+        """
+        self.config = config
+        self.path = config["SQLITE"]['PATH']
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+
+    def _connect(self):
+        """
+        Open the SQLite database in WAL mode and return the connection.
+
+        Returns:
+            connection: A connection object to the SQLite database.
+        """
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode = WAL;")
+        # With WAL, NORMAL only syncs at checkpoints: a commit survives a crash of the process.
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute("PRAGMA foreign_keys = ON;")
+        conn.execute("PRAGMA busy_timeout = 5000;")
+        logger.info(f"✅ Connected to the SQLite database {self.path} successfully!")
+        return conn
+
+    def close(self):
+        """Close the connection to the database."""
+        with self._lock:
+            self._conn.close()
+
+    def is_available(self):
+        """
+        Check whether the database accepts connections.
+
+        Returns:
+            bool: Always True, the database is a local file.
+        """
+        return True
+
+    @staticmethod
+    def _column_names(cursor):
+        """
+        Return the column names of the last query executed on the cursor.
+
+        Args:
+            cursor: The cursor used to run the query.
+
+        Returns:
+            list: The column names, in the order of the fetched rows.
+        """
+        return [column[0] for column in cursor.description]
+
+    @staticmethod
+    def _timestamp(value):
+        """Return a timestamp as the ISO 8601 text stored by SQLite."""
+        return value.isoformat(sep=' ') if hasattr(value, 'isoformat') else value
+
+    def verify_schema(self, models=(Message, Trade, TradeUpdate, Account, ChannelRoute)):
+        """
+        Check that every column mapped by the models exists in the database.
+
+        Args:
+            models (tuple): The model classes to verify.
+
+        Raises:
+            ValueError: If a table is missing one of the columns declared by its model.
+        """
+        with self._lock:
+            missing = {}
+            for model in models:
+                table_columns = {record[1] for record in self._conn.execute(f"PRAGMA table_info({model.TABLE});")}
+                columns = sorted(set(model.COLUMNS) - table_columns)
+                if columns:
+                    missing[model.TABLE] = columns
+            if missing:
+                logger.error(f"❌ Error verifying database schema: missing columns {missing}")
+                raise ValueError(f"Schema drift detected, missing columns: {missing}")
+            logger.info("✅ Database schema matches the models.")
+
+    @staticmethod
+    def _execute_script(cursor, sqls):
+        """
+        Execute the SQL statements of a script one by one.
+
+        Args:
+            cursor: The cursor used to run the statements.
+            sqls (str): The SQL statements, separated by '---'.
+        """
+        for sql in sqls.split('---'):
+            if sql.strip():
+                cursor.execute(sql)
+
+    def migrate(self, migrations_dir=MIGRATIONS_DIR):
+        """
+        Apply the pending schema migrations.
+
+        Migrations are the files named '<version>_<name>.sql' in the migrations directory, applied in
+        version order. Each one runs in its own transaction and is recorded in the schema_version table,
+        so it is applied only once.
+
+        Args:
+            migrations_dir (str): The directory containing the migration files.
+
+        Returns:
+            list: The versions applied by this call.
+
+        Raises:
+            Exception: If a migration fails, after rolling it back.
+        """
+        migrations = sorted(
+            (int(file_name.split('_', 1)[0]), file_name)
+            for file_name in os.listdir(migrations_dir) if file_name.endswith('.sql')
+        )
+        applied = []
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        name TEXT,
+                        applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+                self._conn.commit()
+                cursor.execute("""SELECT version FROM schema_version;""")
+                current_versions = {record[0] for record in cursor.fetchall()}
+
+                for version, file_name in migrations:
+                    if version in current_versions:
+                        continue
+                    with open(os.path.join(migrations_dir, file_name), 'r') as file:
+                        self._execute_script(cursor, file.read())
+                    cursor.execute("""INSERT INTO schema_version (version, name) VALUES (?, ?);""", (version, file_name))
+                    self._conn.commit()
+                    applied.append(version)
+                    logger.info(f"✅ Migration {file_name} applied successfully!")
+                return applied
+            except Exception as e:
+                self._conn.rollback()
+                logger.error(f"❌ Error applying migrations: {e}")
+                raise e
+            finally:
+                cursor.close()
+
+    def check_hot_query_plans(self, queries=HOT_QUERIES):
+        """
+        Check with EXPLAIN QUERY PLAN that the hot path lookups can be answered with an index.
+
+        Args:
+            queries (dict): Query name mapped to the (query, params) pair to explain.
+
+        Returns:
+            dict: Query name mapped to the plan steps of the queries not using an index.
+        """
+        missing_index = {}
+        with self._lock:
+            for name, (query, params) in queries.items():
+                steps = [record[3] for record in self._conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+                if not any('USING' in step for step in steps):
+                    missing_index[name] = steps
+                    logger.warning(f"⚠️ Query {name} does not use an index: {steps}")
+        if not missing_index:
+            logger.info("✅ All hot queries use an index scan.")
+        return missing_index
+# ======================================================================================================================
+# MESSAGE
+# ======================================================================================================================
+    def insert_message(self, message):
+        """
+        Save the Message instance to the database.
+
+        Args:
+            message (Message): An instance of the Message class to be saved.
+
+        Returns:
+            int: The ID of the newly inserted message.
+
+        Raises:
+            Exception: If there is an error during the insert operation.
+        """
+        insert_query = """
+            INSERT INTO tg_message (tg_msg_id, tg_chat_id, tg_src_chat_name, tg_dst_chat_id, tg_dst_msg_id, msg_body, msg_timestamp, msg_status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+        """
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(insert_query, (
+                    message.tg_msg_id,
+                    message.tg_chat_id,
+                    message.tg_src_chat_name,
+                    message.tg_dst_chat_id,
+                    message.tg_dst_msg_id,
+                    message.msg_body,
+                    self._timestamp(message.msg_timestamp),
+                    message.msg_status
+                ))
+            new_record_id = cursor.lastrowid
+            message.mark_clean()
+            logger.info(f"✅ Record added to 'tg_message' successfully with ID: {new_record_id}")
+            return new_record_id
+        except Exception as e:
+            logger.error(f"❌ Error adding record to 'messages': {e}")
+            raise e
+
+    def get_message_by_id(self, tg_msg_id, tg_chat_id, columns=None):
+        """
+        Retrieve a message by its Telegram ID and chat ID.
+
+        Args:
+            tg_msg_id (int): The Telegram ID of the message.
+            tg_chat_id (int): The chat ID associated with the message.
+            columns (tuple, optional): Columns to fetch, defaults to all the Message columns.
+                Use Message.KEY_COLUMNS when only the message reference is needed.
+
+        Returns:
+            Message: An instance of the Message class if found, otherwise None.
+
+        Raises:
+            Exception: If there is an error during the database query.
+        """
+        select_query = f"""SELECT {Message.select_list(columns)} FROM tg_message WHERE tg_msg_id = ? AND tg_chat_id = ?;"""
+        try:
+            with self._lock:
+                cursor = self._conn.execute(select_query, (int(tg_msg_id), str(tg_chat_id),))
+                record = cursor.fetchone()
+            if record:
+                logger.info(f"✅ Message found with ID: {tg_msg_id} from chat: {tg_chat_id}")
+                return Message.from_record(record, self._column_names(cursor))
+            else:
+                logger.warning(f"❌ Message not found with ID: {tg_msg_id}")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Error selecting message with ID {tg_msg_id}: {e}")
+            raise e
+
+    def update_message(self, update_data, columns=None):
+        """
+        Update the modified columns of a message, nothing is written if none changed.
+
+        Args:
+            update_data (Message): An instance of the Message class containing updated data.
+            columns (list, optional): Columns to write, defaults to the ones changed since the message was loaded.
+
+        Raises:
+            Exception: If there is an error during the update operation.
+        """
+        message_dict = update_data.changes() if columns is None else {column: getattr(update_data, column) for column in columns}
+        if not message_dict:
+            logger.info(f"☑️ Message with ID {update_data.tg_msg_id} unchanged. No update made.")
+            return
+        if 'msg_timestamp' in message_dict:
+            message_dict['msg_timestamp'] = self._timestamp(message_dict['msg_timestamp'])
+        set_clause = ', '.join([f"{key} = ?" for key in message_dict.keys()])
+        values = tuple(message_dict.values()) + (update_data.tg_msg_id, str(update_data.tg_chat_id),)
+        update_query = f"""UPDATE tg_message SET {set_clause} WHERE tg_msg_id = ? and tg_chat_id = ?;"""
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(update_query, values)
+            update_data.mark_clean()
+            if cursor.rowcount > 0:
+                logger.info(f"✅ Message with ID {update_data.tg_msg_id} updated successfully.")
+            else:
+                logger.warning(f"⚠️ No message found with ID {update_data.tg_msg_id}. No update made.")
+        except Exception as e:
+            logger.error(f"❌ Error updating message with ID {update_data.tg_msg_id}: {e}")
+            raise e
+# ======================================================================================================================
+# TRADE
+# ======================================================================================================================
+    def insert_trade(self, trade):
+        """
+        Save the Trade instance to the database.
+
+        Args:
+            trade (Trade): An instance of the Trade class to be saved.
+
+        Returns:
+            int: The ID of the newly inserted trade.
+
+        Raises:
+            Exception: If there is an error during the insert operation.
+        """
+        insert_query = """
+            INSERT INTO trade (msg_id, order_id, account_id, symbol, direction, entry_price, stop_loss, take_profit, break_even, volume, status, tg_src_chat_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
+        """
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(insert_query, (
+                    trade.msg_id,
+                    trade.order_id,
+                    trade.account_id,
+                    trade.symbol,
+                    trade.direction,
+                    trade.entry_price,
+                    trade.stop_loss,
+                    trade.take_profit,
+                    trade.break_even,
+                    trade.volume,
+                    trade.status,
+                    trade.tg_src_chat_id))
+            new_record_id = cursor.lastrowid
+            trade.mark_clean()
+            logger.info(f"✅ Record added to 'trade' successfully with ID: {new_record_id}")
+            return new_record_id
+        except Exception as e:
+            logger.error(f"❌ Error adding record to 'trade': {e}")
+            raise e
+
+    def _select_trades(self, select_query, params):
+        """Run a trade query and return the rows mapped to Trade instances."""
+        with self._lock:
+            cursor = self._conn.execute(select_query, params)
+            records = cursor.fetchall()
+        columns = self._column_names(cursor)
+        return [Trade.from_record(record, columns) for record in records]
+
+    def get_trades_by_id(self, msg_id):
+        """
+        Get trades by their message ID.
+
+        Args:
+            message_id (int): The message ID to filter trades.
+
+        Returns:
+            list: A list of Trade instances associated with the given message ID, or None if no trades are found.
+
+        Raises:
+            Exception: If there is an error during the query.
+        """
+        select_query = f"""SELECT {Trade.select_list()} FROM trade WHERE msg_id = ?;"""
+        try:
+            trades = self._select_trades(select_query, (msg_id,))
+            if trades:
+                logger.info(f"✅ Trade found with ID: {msg_id}")
+                return trades
+            else:
+                logger.warning(f"❌ Trade not found with ID: {msg_id}")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Error selecting trade with ID {msg_id}: {e}")
+            raise e
+
+    def get_all_trades(self, account_id):
+        """
+        Get all trades with status 'open'.
+
+        Returns:
+            dict: A dictionary where each key is a msg_id and the value is a list of Trade instances with that msg_id,
+                  or None if no trades are found.
+
+        Raises:
+            Exception: If there is an error during the query.
+        """
+        select_query = f"""SELECT {Trade.select_list()} FROM trade WHERE status = 'open' and account_id = ?;"""
+        try:
+            response = {}
+            for trade in self._select_trades(select_query, (account_id,)):
+                response.setdefault(trade.msg_id, []).append(trade)
+            return response or None
+        except Exception as e:
+            logger.error(f"❌ Error selecting trade: {e}")
+            raise e
+
+    def update_trade(self, update_data, columns=None):
+        """
+        Update the modified columns of a trade, nothing is written if none changed.
+
+        Args:
+            update_data (Trade): An instance of the Trade class containing updated data.
+            columns (list, optional): Columns to write, defaults to the ones changed since the trade was loaded.
+
+        Raises:
+            Exception: If there is an error during the update operation.
+        """
+        trade_dict = update_data.changes() if columns is None else {column: getattr(update_data, column) for column in columns}
+        if not trade_dict:
+            logger.info(f"☑️ Trade with ID {update_data.msg_id} unchanged. No update made.")
+            return
+        set_clause = ', '.join([f"{key} = ?" for key in trade_dict.keys()])
+        values = tuple(trade_dict.values()) + (update_data.trade_id, update_data.msg_id, int(update_data.order_id))
+        update_query = f"""UPDATE trade SET {set_clause} WHERE trade_id = ? and msg_id = ? and order_id = ?;"""
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(update_query, values)
+            update_data.mark_clean()
+            if cursor.rowcount > 0:
+                logger.info(f"✅ Trade with ID {update_data.msg_id} updated successfully.")
+            else:
+                logger.warning(f"⚠️ No trade found with ID {update_data.msg_id}. No update made.")
+        except Exception as e:
+            logger.error(f"❌ Error updating trades with ID {update_data.msg_id}: {e}")
+            raise e
+
+    def update_trades(self, trades, columns=None):
+        """
+        Update the modified columns of several trades with one prepared statement, in one transaction.
+
+        Args:
+            trades (list): The Trade instances to update, unchanged ones are skipped.
+            columns (list, optional): Columns to write, defaults to every column changed on any of the trades.
+
+        Returns:
+            int: The number of rows updated.
+
+        Raises:
+            Exception: If there is an error during the update operation.
+        """
+        if columns is None:
+            changed = [trade.changes() for trade in trades]
+            trades = [trade for trade, changes in zip(trades, changed) if changes]
+            columns = [column for column in Trade.UPDATE_COLUMNS if any(column in changes for changes in changed)]
+        if not trades or not columns:
+            logger.info("☑️ No trade changed. No update made.")
+            return 0
+        set_clause = ', '.join([f"{column} = ?" for column in columns])
+        update_query = f"""UPDATE trade SET {set_clause} WHERE trade_id = ? and msg_id = ? and order_id = ?;"""
+        values = [
+            tuple(getattr(trade, column) for column in columns) + (trade.trade_id, trade.msg_id, int(trade.order_id))
+            for trade in trades
+        ]
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.executemany(update_query, values)
+            for trade in trades:
+                trade.mark_clean()
+            logger.info(f"✅ {cursor.rowcount} trades updated successfully.")
+            return cursor.rowcount
+        except Exception as e:
+            logger.error(f"❌ Error updating trades: {e}")
+            raise e
+
+    def get_open_trades_based_on_src_tg_chat(self, tg_src_chat_name):
+        query = f"""
+                select {Trade.select_list(alias='t')} from trade t join tg_message tm on t.msg_id = tm.msg_id where t.status = 'open' and tm.tg_src_chat_name = ?;
+                """
+        try:
+            trades = self._select_trades(query, (tg_src_chat_name,))
+            if trades:
+                logger.info(f"✅ Trade found with ID: {tg_src_chat_name}")
+                return trades
+            else:
+                logger.warning(f"❌ Trade not found with ID: {tg_src_chat_name}")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Error fetching latest message with trades: {e}")
+            raise e
+
+    def get_open_trades_of_latest_signal(self, tg_src_chat_id):
+        """
+        Get the open trades of the most recent signal posted by a source channel.
+
+        Args:
+            tg_src_chat_id (str): The Telegram chat ID of the source channel.
+
+        Returns:
+            list: A list of Trade instances of the latest open signal, or None if no trades are found.
+
+        Raises:
+            Exception: If there is an error during the query.
+        """
+        query = f"""
+                SELECT {Trade.select_list()} FROM trade
+                WHERE status = 'open' AND tg_src_chat_id = ? AND msg_id = (
+                    SELECT max(msg_id) FROM trade WHERE status = 'open' AND tg_src_chat_id = ?
+                );
+                """
+        try:
+            trades = self._select_trades(query, (str(tg_src_chat_id), str(tg_src_chat_id),))
+            if trades:
+                logger.info(f"✅ Trade found for the latest signal of chat: {tg_src_chat_id}")
+                return trades
+            else:
+                logger.warning(f"❌ No open trade found for chat: {tg_src_chat_id}")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Error fetching the open trades of the latest signal: {e}")
+            raise e
+# ======================================================================================================================
+# TRADE UPDATE
+# ======================================================================================================================
+    def insert_trade_update(self, trade_update):
+        """
+        Save the TradeUpdate instance, or a list of them in one transaction, to the database.
+
+        Args:
+            trade_update (TradeUpdate | list): The TradeUpdate instance(s) to be saved.
+
+        Returns:
+            int | list: The ID(s) of the newly inserted trade update(s).
+
+        Raises:
+            Exception: If there is an error during the insert operation.
+        """
+        insert_query = """
+            INSERT INTO tradeupdate (trade_id, order_id, account_id, update_action, update_body)
+            VALUES (?, ?, ?, ?, ?);
+        """
+        trade_updates = trade_update if isinstance(trade_update, list) else [trade_update]
+        try:
+            records = []
+            with self._lock, self._conn:
+                for tu in trade_updates:
+                    cursor = self._conn.execute(insert_query, (tu.trade_id, tu.order_id, tu.account_id, tu.update_action, tu.update_body))
+                    records.append(cursor.lastrowid)
+            if isinstance(trade_update, list):
+                logger.info(f"✅ Records added to 'tradeupdate' successfully with IDs: {records}")
+                return records
+            return records[0]
+        except Exception as e:
+            logger.error(f"❌ Error adding record to 'tradeupdate': {e}")
+            raise e
+# ======================================================================================================================
+# ACCOUNT
+# ======================================================================================================================
+    def _select_account_configs(self, condition, params):
+        """Run the account configuration query and return the rows mapped to Account instances."""
+        with self._lock:
+            cursor = self._conn.execute(ACCOUNT_CONFIG_QUERY.format(condition=condition), params)
+            records = cursor.fetchall()
+        columns = self._column_names(cursor)
+        accounts = []
+        for record in records:
+            account = Account.from_record(record, columns)
+            account.symbol_config = json.loads(account.symbol_config or '[]')
+            accounts.append(account)
+        return accounts
+
+    def get_software_account_based_on_id(self, account_id):
+        """
+        Retrieve a software account by its ID.
+
+        Args:
+            account_id (int): The ID of the account to retrieve.
+
+        Returns:
+            Account: An instance of the Account class if found, otherwise None.
+
+        Raises:
+            Exception: If there is an error during the database query.
+        """
+        try:
+            accounts = self._select_account_configs("a.mt5_account_id = ?", (account_id,))
+            if accounts:
+                logger.info(f"✅ Account found with ID: {account_id}")
+                return accounts[0]
+            else:
+                logger.warning(f"❌ Account not found with ID: {account_id}")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Error getting account with id {account_id}: {e}")
+            raise e
+
+    def get_software_accounts_based_on_env(self, env):
+        """
+        Retrieve all the software accounts of an environment.
+
+        Args:
+            env (str): Environment value to get the account list
+
+        Returns:
+            list: A list of Account instances, or None if no account is found.
+
+        Raises:
+            Exception: If there is an error during the database query.
+        """
+        select_query = f"""select {Account.select_list()} from account where account.environment = ?;"""
+        try:
+            with self._lock:
+                cursor = self._conn.execute(select_query, (env,))
+                records = cursor.fetchall()
+            if records:
+                logger.info(f"✅ Account found with environment: {env}")
+                columns = self._column_names(cursor)
+                return [Account.from_record(record, columns) for record in records]
+            else:
+                logger.warning(f"❌ Account not found with env: {env}")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Error getting account with env {env}: {e}")
+            raise e
+
+    def get_software_accounts_config_based_on_env(self, env):
+        """
+        Retrieve all the software accounts of an environment with their symbol configuration.
+
+        Args:
+            env (str): Environment value to get the account list.
+
+        Returns:
+            list: A list of Account instances with symbol_config set, or None if no account is found.
+
+        Raises:
+            Exception: If there is an error during the database query.
+        """
+        try:
+            accounts = self._select_account_configs("a.environment = ?", (env,))
+            if accounts:
+                logger.info(f"✅ Account configuration found with environment: {env}")
+                return accounts
+            else:
+                logger.warning(f"❌ Account configuration not found with env: {env}")
+                return None
+        except Exception as e:
+            logger.error(f"❌ Error getting account configuration with env {env}: {e}")
+            raise e
+
+    def get_channel_routes(self):
+        """
+        Retrieve the routing table of the source channels.
+
+        Returns:
+            list: A list of ChannelRoute instances, empty if no channel is routed.
+
+        Raises:
+            Exception: If there is an error during the database query.
+        """
+        select_query = f"""SELECT {ChannelRoute.select_list()} FROM channel_route;"""
+        try:
+            with self._lock:
+                cursor = self._conn.execute(select_query)
+                records = cursor.fetchall()
+            columns = self._column_names(cursor)
+            return [ChannelRoute.from_record(record, columns) for record in records]
+        except Exception as e:
+            logger.error(f"❌ Error getting the channel routes: {e}")
+            raise e
+
+    def get_config_version(self):
+        """
+        Get the current version of the account configuration, bumped by every configuration change.
+
+        Returns:
+            int: The configuration version, 0 if it was never bumped.
+
+        Raises:
+            Exception: If there is an error during the database query.
+        """
+        try:
+            with self._lock:
+                record = self._conn.execute("""SELECT version FROM config_version WHERE id = 1;""").fetchone()
+            return record[0] if record else 0
+        except Exception as e:
+            logger.error(f"❌ Error getting the configuration version: {e}")
+            raise e
@@ -0,0 +1,212 @@
+import json
+import logging
+import select
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from data.dbHandler import dbHandler
+from data.trade import Trade
+from data.tradeUpdate import TradeUpdate
+
+logger = logging.getLogger(__name__)
+
+TRADE_CHANNEL = 'trade_changes'
+
+# Events passed to the subscribers, with the Trade (or TradeUpdate) they concern.
+TRADE_OPENED = 'open'
+TRADE_CLOSED = 'close'
+TRADE_BREAK_EVEN = 'be'
+TRADE_UPDATED = 'update'
+TRADE_UPDATE_ADDED = 'trade_update'
+
+
+class TradeFeed:
+    def __init__(self, db_handler: dbHandler, account_ids: Iterable[int], poll_interval: float = 2.0) -> None:
+        """
+        Initialize the change feed of the trades and load the open trades of the accounts.
+
+        The view is kept current by the 'trade_changes' notifications sent by the database triggers,
+        and reloaded as a whole whenever the listener (re)connects, so changes missed while it was down
+        are not lost. Backends without NOTIFY support are reloaded every poll interval instead.
+
+        Args:
+            db_handler (dbHandler): The database handler.
+            account_ids (Iterable[int]): The accounts whose open trades are tracked.
+            poll_interval (float): Seconds between two reloads when the backend does not support NOTIFY.
+        """
+        self.db_handler = db_handler
+        self.account_ids = {int(account_id) for account_id in account_ids}
+        self.poll_interval = poll_interval
+        # Trade ID -> column values of the open trade, as stored in the database.
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._subscribers: List[Callable[[str, Any], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        try:
+            self.reload()
+        except Exception as e:
+            # The listener thread loads the view once the database is reachable
+            logger.warning(f"⚠️ Open trades not loaded at startup: {e}")
+
+    def subscribe(self, callback: Callable[[str, Any], None]) -> None:
+        """
+        Register a callback called with (event, record) on every change of the tracked trades.
+
+        The callbacks run on the feed thread and must not block.
+
+        Args:
+            callback (Callable[[str, Any], None]): Called with one of the TRADE_* events and the Trade
+                (or TradeUpdate for TRADE_UPDATE_ADDED) it concerns.
+        """
+        self._subscribers.append(callback)
+
+    def get_open_trades(self, account_id: int) -> Optional[Dict[int, List[Trade]]]:
+        """
+        Get the open trades of an account from the in-memory view.
+
+        Args:
+            account_id (int): The MT5 account ID.
+
+        Returns:
+            dict: Same shape as dbHandler.get_all_trades, msg_id -> list of Trade instances, or None if the
+                  account has no open trade. The instances are new copies, safe to modify and write back.
+        """
+        with self._lock:
+            rows = [row for row in self._rows.values() if row['account_id'] == int(account_id)]
+        response = {}
+        for row in rows:
+            trade = Trade.from_record(row.values(), row.keys())
+            response.setdefault(trade.msg_id, []).append(trade)
+        return response or None
+
+    def reload(self) -> None:
+        """Reload the open trades of the tracked accounts from the database and notify the differences."""
+        rows = {}
+        for account_id in self.account_ids:
+            for trades in (self.db_handler.get_all_trades(account_id) or {}).values():
+                for trade in trades:
+                    rows[trade.trade_id] = {column: getattr(trade, column) for column in Trade.COLUMNS}
+        with self._lock:
+            previous, self._rows = self._rows, rows
+        for trade_id in previous.keys() - rows.keys():
+            self._publish(TRADE_CLOSED, previous[trade_id])
+        for trade_id, row in rows.items():
+            event = self._event(previous.get(trade_id), row)
+            if event is not None:
+                self._publish(event, row)
+
+    def apply(self, payload: str) -> None:
+        """
+        Apply a 'trade_changes' notification to the view.
+
+        Args:
+            payload (str): The JSON payload sent by notify_trade_change().
+        """
+        change = json.loads(payload)
+        row = change['row']
+        if int(row['account_id']) not in self.account_ids:
+            return
+        if change['table'] == TradeUpdate.TABLE:
+            values = {column: row.get(column) for column in TradeUpdate.COLUMNS}
+            self._notify(TRADE_UPDATE_ADDED, TradeUpdate.from_record(values.values(), values.keys()))
+            return
+
+        row = {column: row.get(column) for column in Trade.COLUMNS}
+        with self._lock:
+            previous = self._rows.get(row['trade_id'])
+            if change['op'] == 'DELETE' or row['status'] != 'open':
+                self._rows.pop(row['trade_id'], None)
+            else:
+                self._rows[row['trade_id']] = row
+        if change['op'] == 'DELETE':
+            event = TRADE_CLOSED if previous is not None else None
+        else:
+            event = self._event(previous, row)
+        if event is not None:
+            self._publish(event, row)
+
+    def apply_trades(self, trades: Iterable[Trade]) -> None:
+        """
+        Apply the trades changed by this process to the view, without waiting for their notification.
+
+        The writes of the process may go through the journal, so the notification of a trade just closed
+        or put in break even can come much later, or not at all while the database is down.
+
+        Args:
+            trades (Iterable[Trade]): The trades as written, the ones not yet stored (without trade_id) are skipped.
+        """
+        for trade in trades:
+            if trade.trade_id is None or int(trade.account_id) not in self.account_ids:
+                continue
+            row = {column: getattr(trade, column) for column in Trade.COLUMNS}
+            with self._lock:
+                previous = self._rows.get(row['trade_id'])
+                if row['status'] != 'open':
+                    self._rows.pop(row['trade_id'], None)
+                else:
+                    self._rows[row['trade_id']] = row
+            event = self._event(previous, row)
+            if event is not None:
+                self._publish(event, row)
+
+    def start(self) -> None:
+        """Start the background thread that keeps the view current."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            target = self._listen if self.db_handler.SUPPORTS_NOTIFY else self._poll
+            self._thread = threading.Thread(target=target, name="trade-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    @staticmethod
+    def _event(previous: Optional[Dict[str, Any]], row: Dict[str, Any]) -> Optional[str]:
+        if row['status'] != 'open':
+            return TRADE_CLOSED if previous is not None else None
+        if previous is None:
+            return TRADE_OPENED
+        if row['break_even'] != previous['break_even']:
+            return TRADE_BREAK_EVEN
+        return TRADE_UPDATED if row != previous else None
+
+    def _publish(self, event: str, row: Dict[str, Any]) -> None:
+        if self._subscribers:
+            self._notify(event, Trade.from_record(row.values(), row.keys()))
+
+    def _notify(self, event: str, record: Any) -> None:
+        for callback in self._subscribers:
+            try:
+                callback(event, record)
+            except Exception as e:
+                logger.error(f"❌ Error in trade feed subscriber: {e}")
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"❌ Error reloading the open trades: {e}")
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self.db_handler.listen(TRADE_CHANNEL)
+                # Changes made while the listener was down are caught by the reload.
+                self.reload()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.apply(conn.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(f"❌ Error listening for trade changes: {e}, retrying in 5 seconds...")
+                self._stop.wait(5)
+            finally:
+                if conn is not None:
+                    conn.close()
@@ -1,10 +1,23 @@
 import logging
 from data.dbHandler import dbHandler
+from data.sqliteHandler import sqliteHandler
+from data.configService import ConfigService
+from data.configCache import ConfigCache
+from data.journal import SignalJournal, JournalReplayer
+from data.archiver import HistoryArchiver
+from data.tradeFeed import TradeFeed
 import asyncio
-import threading
 from utility.config import read_env_file
 from business.tgHandler import TelegramAnalyzer
+from business.entityCache import EntityCache
 from business.mt5Handler import MetatraderHandler
+from business.brokerWorker import BrokerWorker
+from business.supervisor import TaskSupervisor
+from business.riskEngine import RiskEngine
+from business.positionSizer import PositionSizer
+from business.drawdownMonitor import DrawdownMonitor, rules_for_broker
+from business.tpLadder import TpLadder
+from datetime import datetime, timezone
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SmartTradeAnalyzer")
@@ -18,57 +31,126 @@ console_handler.setFormatter(formatter)
 logger.addHandler(console_handler)
 
 env_dict = read_env_file('utility/config.env')
-db = dbHandler(env_dict)
+db = sqliteHandler(env_dict) if env_dict['STORAGE_BACKEND'] == 'sqlite' else dbHandler(env_dict)
+
+def prepare_database() -> bool:
+    """Apply the pending migrations and check the schema, False if the database is not reachable."""
+    if not db.is_available():
+        logger.warning("⚠️ Database not available, starting on the cached configuration, writes wait in the journal")
+        return False
+    db.migrate()
+    db.verify_schema()
+    db.check_hot_query_plans()
+    return True
+
+prepare_database()
+journal = SignalJournal(env_dict['JOURNAL_PATH'])
+journal_replayer = JournalReplayer(journal, db)
 
 async def main():
-    account_config = db.get_software_account_based_on_id(env_dict['MT5_ACTIVE_ACCOUNT'])
-    mt_handler = MetatraderHandler(account=account_config.mt5_account_id, password=account_config.mt5_password, server=account_config.mt5_server)
-    tg_analyzer = TelegramAnalyzer(config=account_config.to_dict(), db_handler=db, mt5_handler=mt_handler)
+    config_service = ConfigService(db, env_dict['ENV'].lower(), cache=ConfigCache(env_dict['CONFIG_CACHE_PATH']))
+    config_service.start()
+    journal_replayer.start()
+    archiver = None
+    if env_dict['STORAGE_BACKEND'] == 'postgres':
+        archiver = HistoryArchiver(db, env_dict['ARCHIVE_DIR'], env_dict['RETENTION_MONTHS'])
+        archiver.start()
+    account_config = config_service.get_account_config(env_dict['MT5_ACTIVE_ACCOUNT'])
+    trade_feed = TradeFeed(db, [account_config['mt5_account_id']])
+    trade_feed.start()
+    broker = BrokerWorker()
+    mt_handler = MetatraderHandler(account=account_config['mt5_account_id'], password=account_config['mt5_password'], server=account_config['mt5_server'])
+    risk_engine = RiskEngine(default_limits=env_dict['RISK_LIMITS'])
+    ladder = TpLadder(env_dict['TP_LADDER_PATH'], risk_engine) if env_dict['TP_MODE'] == 'ladder' else None
+    tg_analyzer = TelegramAnalyzer(config=account_config, db_handler=db, mt5_handler=mt_handler, config_service=config_service, journal=journal,
+                                   entity_cache=EntityCache(env_dict['ENTITY_CACHE_PATH']),
+                                   edit_window=env_dict['EDIT_DEBOUNCE_SECONDS'], broker=broker,
+                                   risk_engine=risk_engine, sizer=PositionSizer(risk_percent=env_dict['RISK_PER_TRADE_PERCENT']), ladder=ladder,
+                                   default_dst_chat_id=env_dict['DEFAULT_DST_CHANNEL'])
 
-    async def run_analyzer():
-        while True:
-            try:
-                await tg_analyzer.start()
-            except (ConnectionError, asyncio.TimeoutError, OSError) as e:
-                logger.warning(f"❌ Connection error: {e}, restarting in 5 seconds...")
-                await asyncio.sleep(5)
+    def seed_risk_engine():
+        positions = mt_handler.get_positions_snapshot(strict=True)
+        if positions is None:
+            # An empty exposure would let every order through, the account is rejected until seeded again
+            risk_engine.seed_failed(account_config['mt5_account_id'])
+            return
+        midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        risk_engine.seed(account_config['mt5_account_id'], positions,
+                         mt_handler.get_realized_profit(midnight), mt_handler.get_symbol_value)
+
+    def reconcile_open_trades():
+        if risk_engine.needs_seed(account_config['mt5_account_id']):
+            seed_risk_engine()
+        open_trades_db = trade_feed.get_open_trades(account_config['mt5_account_id'])
+        if open_trades_db:
+            open_trades_mt5 = mt_handler.get_positions_snapshot(strict=True)
+            if open_trades_mt5 is None:
+                # Without a snapshot every trade would look closed, the next pass checks them again
+                return
+            trades_to_update = []
+            for msg_id, trades in open_trades_db.items():
+                order_ids = [trade.order_id for trade in trades]
+                if not all(order_id in open_trades_mt5 for order_id in order_ids):
+                    logger.info(f"Not all order_ids for message {msg_id} are in MT5 positions.")
+                    for trade in trades:
+                        if trade.order_id not in open_trades_mt5:
+                            trade.status = 'close'
+                            if risk_engine.tracks(trade.account_id, trade.order_id):
+                                # Closed on the terminal (SL, TP or by hand), the PnL comes from the deals history
+                                risk_engine.on_close(trade.account_id, trade.order_id, mt_handler.get_closed_profit(trade.order_id))
+                        else:
+                            new_sl = mt_handler.update_trade_break_even(trade.order_id, None, open_trades_mt5)
+                            risk_engine.on_modify(trade.account_id, trade.order_id, new_sl)
+                            trade.stop_loss = new_sl
+                            trade.break_even = new_sl
+                        trades_to_update.append(trade)
+            journal.update_trades(trades_to_update)
+            # The view does not wait for the notification of the journaled writes
+            trade_feed.apply_trades(trades_to_update)
 
     async def check_metatrader():
+        await broker.call(seed_risk_engine)
         while True:
             await asyncio.sleep(2)
-            open_trades_db = db.get_all_trades(account_config.to_dict()['mt5_account_id'])
-            if open_trades_db:
-                open_trades_mt5 = mt_handler.get_all_position()
-                for msg_id, trades in open_trades_db.items():
-                    order_ids = [trade.order_id for trade in trades]
-                    if not all(order_id in open_trades_mt5 for order_id in order_ids):
-                        logger.info(f"Not all order_ids for message {msg_id} are in MT5 positions.")
-                        for trade in trades:
-                            if trade.order_id not in open_trades_mt5:
-                                trade.status = 'close'
-                            else:
-                                new_sl = mt_handler.update_trade_break_even(trade.order_id, None)
-                                trade.stop_loss = new_sl
-                                trade.break_even = new_sl
-                            db.update_trade(trade)
+            await broker.call(reconcile_open_trades)
 
-    #await asyncio.gather(run_analyzer(), check_metatrader())
+    drawdown_rules = rules_for_broker(account_config['mt5_broker'], env_dict['DRAWDOWN'])
+    drawdown_monitor = DrawdownMonitor(risk_engine)
 
+    async def watch_drawdown():
+        while True:
+            await broker.call(drawdown_monitor.poll, mt_handler, drawdown_rules, account_config['mt5_balance'])
+            await asyncio.sleep(env_dict['DRAWDOWN']['INTERVAL'])
 
-    def start_check_metatrader():
-        asyncio.run(check_metatrader())
-
-    def start_run_analyzer():
-        asyncio.run(run_analyzer())
+    async def watch_tp_ladder():
+        # Partial closes at the take profits of the positions opened once per signal
+        while True:
+            await broker.call(ladder.poll, mt_handler)
+            await asyncio.sleep(env_dict['TP_LADDER_INTERVAL'])
 
-    thread_analyzer = threading.Thread(target=start_run_analyzer)
-    thread_metatrader = threading.Thread(target=start_check_metatrader)
-    thread_analyzer.start()
-    thread_metatrader.start()
-    thread_analyzer.join()
-    thread_metatrader.join()
+    def stop_background_threads():
+        workers = [trade_feed, config_service, journal_replayer] + ([archiver] if archiver is not None else [])
+        for worker in workers:
+            worker.stop()
+        journal.close()
 
+    # One event loop runs the Telegram sessions, the signal queue and the reconciler; MT5 calls go to the broker thread
+    supervisor = TaskSupervisor()
+    supervisor.add("analyzer", tg_analyzer.start)
+    supervisor.add("reconciler", check_metatrader)
+    if drawdown_rules is not None:
+        supervisor.add("drawdown", watch_drawdown)
+        supervisor.on_shutdown(lambda: supervisor.cancel("drawdown"))
+    if ladder is not None:
+        supervisor.add("tp-ladder", watch_tp_ladder)
+        supervisor.on_shutdown(lambda: supervisor.cancel("tp-ladder"))
+    # Shutdown drains the signals in flight before the broker finishes its last orders and the journal is closed
+    supervisor.on_shutdown(tg_analyzer.stop)
+    supervisor.on_shutdown(lambda: supervisor.cancel("reconciler"))
+    supervisor.on_shutdown(broker.shutdown)
+    supervisor.on_shutdown(stop_background_threads)
+    await supervisor.run()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Latency of the message lookup with the full projection and with Message.KEY_COLUMNS.
+
+Reply resolution only needs the message reference, so get_message_by_id is called with
+Message.KEY_COLUMNS and msg_body is never read. The benchmark fills tg_message with the given number
+of messages (1M by default) and times random lookups with both projections. Run it from the project
+root, against a scratch database since the benchmark rows are not deleted:
+
+    python tools/bench_projection.py --backend sqlite postgres --messages 1000000
+
+See bench_storage.py for the database settings.
+"""
+import argparse
+import logging
+import random
+import statistics
+import tempfile
+import time
+
+from bench_storage import BENCH_CHAT_ID, open_backend
+from data.tg_message import Message
+from utility.config import read_env_file
+
+# Typical length of a signal message.
+BODY_LENGTH = 600
+
+FILL_QUERIES = {
+    'sqlite': f"""
+        INSERT INTO tg_message (tg_msg_id, tg_chat_id, tg_src_chat_name, tg_dst_chat_id, msg_body, msg_timestamp, msg_status)
+        WITH RECURSIVE n(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+        SELECT i, '{BENCH_CHAT_ID}', 'bench', '{BENCH_CHAT_ID}', printf('%.{BODY_LENGTH}c', 'x'), datetime('now'), 'open' FROM n;
+    """,
+    'postgres': f"""
+        INSERT INTO tg_message (tg_msg_id, tg_chat_id, tg_src_chat_name, tg_dst_chat_id, msg_body, msg_timestamp, msg_status)
+        SELECT i, '{BENCH_CHAT_ID}', 'bench', '{BENCH_CHAT_ID}', repeat('x', {BODY_LENGTH}), now(), 'open'
+        FROM generate_series(%s, %s) AS i;
+    """,
+}
+COUNT_QUERIES = {
+    'sqlite': f"SELECT count(*) FROM tg_message WHERE tg_chat_id = '{BENCH_CHAT_ID}';",
+    'postgres': f"SELECT count(*) FROM tg_message WHERE tg_chat_id = '{BENCH_CHAT_ID}';",
+}
+
+
+def execute(db, backend: str, query: str, params=()):
+    """Run a statement on the backend connection, return the first row."""
+    if backend == 'sqlite':
+        with db._lock:
+            record = db._conn.execute(query, params).fetchone()
+            db._conn.commit()
+        return record
+    conn = db._connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        record = cursor.fetchone() if cursor.description else None
+        conn.commit()
+        return record
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def fill(db, backend: str, messages: int) -> None:
+    """Insert the benchmark messages missing from the table."""
+    stored = execute(db, backend, COUNT_QUERIES[backend])[0]
+    if stored < messages:
+        start = time.perf_counter()
+        execute(db, backend, FILL_QUERIES[backend], (stored + 1, messages))
+        print(f"{backend:<8} {messages - stored} messages inserted in {time.perf_counter() - start:.1f} s")
+
+
+def run(db, messages: int, lookups: int, columns) -> dict:
+    """Time random lookups of the benchmark messages with a projection."""
+    timings = []
+    for _ in range(lookups):
+        tg_msg_id = random.randint(1, messages)
+        start = time.perf_counter()
+        db.get_message_by_id(tg_msg_id, BENCH_CHAT_ID, columns)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        'mean': statistics.fmean(timings),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', nargs='+', choices=('sqlite', 'postgres'), default=['sqlite', 'postgres'])
+    parser.add_argument('--messages', type=int, default=1_000_000)
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--env-file', default='utility/config.env')
+    args = parser.parse_args()
+    # The handlers log every lookup
+    logging.basicConfig(level=logging.WARNING)
+
+    env_dict = read_env_file(args.env_file)
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in args.backend:
+            db = open_backend(backend, env_dict, directory)
+            fill(db, backend, args.messages)
+            # The first lookups warm the cache, the order of the projections does not favour either
+            run(db, args.messages, args.lookups, None)
+            for name, columns in (('all columns', None), ('KEY_COLUMNS', Message.KEY_COLUMNS)):
+                stats = run(db, args.messages, args.lookups, columns)
+                print(f"{backend:<8} {name:<12} messages={args.messages} lookups={args.lookups} "
+                      f"p50={stats['p50']:.3f} ms p99={stats['p99']:.3f} ms mean={stats['mean']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
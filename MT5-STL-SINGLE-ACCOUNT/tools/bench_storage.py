@@ -0,0 +1,100 @@
+"""
+Latency of persisting one signal on each storage backend.
+
+A signal is stored as the application does it: one message, then one trade per take profit, each
+write in its own transaction. Run it from the project root, against a scratch database since the
+benchmark rows are not deleted:
+
+    python tools/bench_storage.py --backend sqlite postgres --signals 2000
+
+SQLite writes to a temporary file. Postgres uses the DB_* settings of the env file, the database
+of the ENVIRONMENT (DB_NAME_DEV outside PROD), migrated first.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# The modules import each other from the project root, e.g. "from data.record import Record"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.trade import Trade
+from data.tg_message import Message
+from utility.config import read_env_file
+
+BENCH_CHAT_ID = '-1000000000000'
+
+
+def open_backend(backend: str, env_dict: dict, directory: str):
+    """Return the storage handler of a backend, migrated."""
+    if backend == 'sqlite':
+        from data.sqliteHandler import sqliteHandler
+        db = sqliteHandler({**env_dict, 'SQLITE': {'PATH': os.path.join(directory, 'bench.db')}})
+    else:
+        from data.dbHandler import dbHandler
+        db = dbHandler(env_dict)
+        if not db.is_available():
+            raise SystemExit(f"Postgres not available at {env_dict['DB']['HOST']}:{env_dict['DB']['PORT']}")
+    db.migrate()
+    return db
+
+
+def store_signal(db, index: int, n_trades: int) -> None:
+    """Persist one signal: its message, then one trade per take profit."""
+    message = Message(
+        tg_msg_id=index, tg_chat_id=BENCH_CHAT_ID, tg_src_chat_name='bench', tg_dst_chat_id=BENCH_CHAT_ID,
+        tg_dst_msg_id=None, msg_body='XAUUSD BUY 2000 SL 1990 TP 2010 TP 2020 TP 2030',
+        msg_timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"), msg_status='open'
+    )
+    msg_id = db.insert_message(message)
+    for tp in range(n_trades):
+        db.insert_trade(Trade(
+            msg_id=msg_id, order_id=index * n_trades + tp, account_id=0, symbol='XAUUSD', direction='BUY',
+            volume=0.01, stop_loss=1990.0, take_profit=2010.0 + 10 * tp, entry_price=2000.0, break_even=0.0,
+            status='open', tg_src_chat_id=BENCH_CHAT_ID
+        ))
+
+
+def run(db, signals: int, n_trades: int, warmup: int) -> dict:
+    """Time the storage of the signals, the warmup ones excluded."""
+    for index in range(warmup):
+        store_signal(db, index, n_trades)
+    timings = []
+    for index in range(warmup, warmup + signals):
+        start = time.perf_counter()
+        store_signal(db, index, n_trades)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p99': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+        'mean': statistics.fmean(timings),
+        'max': timings[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', nargs='+', choices=('sqlite', 'postgres'), default=['sqlite', 'postgres'])
+    parser.add_argument('--signals', type=int, default=2000)
+    parser.add_argument('--trades', type=int, default=3, help="trades per signal, one per take profit")
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--env-file', default='utility/config.env')
+    args = parser.parse_args()
+    # The handlers log every write
+    logging.basicConfig(level=logging.WARNING)
+
+    env_dict = read_env_file(args.env_file)
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in args.backend:
+            stats = run(open_backend(backend, env_dict, directory), args.signals, args.trades, args.warmup)
+            print(f"{backend:<8} signals={args.signals} trades/signal={args.trades} "
+                  f"p50={stats['p50']:.2f} ms p99={stats['p99']:.2f} ms mean={stats['mean']:.2f} ms max={stats['max']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from dotenv import dotenv_values
 from data.account import Account
+from business.riskEngine import RiskLimits
 
 def read_env_file(file_path: str) -> dict:
     """
@@ -20,7 +21,72 @@ def read_env_file(file_path: str) -> dict:
             "USER": env_dict.get("DB_USER"),
             "PASSWORD": env_dict.get("DB_PWD")
         },
+        "SQLITE": {
+            "PATH": env_dict.get("SQLITE_PATH", "data/signals.db")
+        },
+        # 'postgres' or 'sqlite' for the embedded database of single account deployments
+        "STORAGE_BACKEND": env_dict.get("STORAGE_BACKEND", "postgres").lower(),
         "ENV": env_dict.get("ENVIRONMENT", "DEV"),
         "MT5_ACTIVE_ACCOUNT": env_dict.get("MT5_ACTIVE_ACCOUNT"),
+        "JOURNAL_PATH": env_dict.get("JOURNAL_PATH", "journal/signals.journal"),
+        "ENTITY_CACHE_PATH": env_dict.get("ENTITY_CACHE_PATH", "sessions/entities.json"),
+        # Last configuration read from the database, used when it is down at startup
+        "CONFIG_CACHE_PATH": env_dict.get("CONFIG_CACHE_PATH", "sessions/config.json"),
+        "EDIT_DEBOUNCE_SECONDS": float(env_dict.get("EDIT_DEBOUNCE_SECONDS", 2.0)),
+        # Forward destination of the subscribed channels without a channel_route row
+        "DEFAULT_DST_CHANNEL": int(env_dict.get("DEFAULT_DST_CHANNEL", -1002535578509)),
+        "RISK_LIMITS": read_risk_limits(env_dict),
+        # Percent of the equity risked per signal, the configured lot sizes apply when unset
+        "RISK_PER_TRADE_PERCENT": read_optional(env_dict, "RISK_PER_TRADE_PERCENT"),
+        "DRAWDOWN": read_drawdown_settings(env_dict),
+        # 'positions' opens one position per take profit, 'ladder' one position closed in parts at the take profits
+        "TP_MODE": env_dict.get("TP_MODE", "positions").lower(),
+        "TP_LADDER_PATH": env_dict.get("TP_LADDER_PATH", "sessions/tp_ladders.json"),
+        "TP_LADDER_INTERVAL": float(env_dict.get("TP_LADDER_INTERVAL_SECONDS", 0.5)),
+        "ARCHIVE_DIR": env_dict.get("ARCHIVE_DIR", "archive"),
+        "RETENTION_MONTHS": int(env_dict.get("RETENTION_MONTHS", 3)),
     }
-    return customized_dict
\ No newline at end of file
+    return customized_dict
+
+def read_risk_limits(env_dict: dict) -> RiskLimits:
+    """
+    Reads the pre-trade risk limits, an unset or empty key disables its limit.
+
+    Args:
+        env_dict (dict): The raw content of the .env file.
+
+    Returns:
+        RiskLimits: The limits applied to every account.
+    """
+    return RiskLimits(
+        max_daily_loss=read_optional(env_dict, "RISK_MAX_DAILY_LOSS"),
+        max_total_lots=read_optional(env_dict, "RISK_MAX_TOTAL_LOTS"),
+        max_symbol_lots=read_optional(env_dict, "RISK_MAX_SYMBOL_LOTS"),
+        max_open_risk=read_optional(env_dict, "RISK_MAX_OPEN_RISK"),
+        max_positions=read_optional(env_dict, "RISK_MAX_POSITIONS", int)
+    )
+
+def read_drawdown_settings(env_dict: dict) -> dict:
+    """
+    Reads the settings of the drawdown monitor, the unset rules are the ones of the broker (see PROP_FIRM_RULES).
+
+    Args:
+        env_dict (dict): The raw content of the .env file.
+
+    Returns:
+        dict: The drawdown settings.
+    """
+    return {
+        "ENABLED": env_dict.get("DRAWDOWN_MONITOR", "true").lower() == "true",
+        "DAILY_LOSS_PERCENT": read_optional(env_dict, "DRAWDOWN_DAILY_LOSS_PERCENT"),
+        "MAX_DRAWDOWN_PERCENT": read_optional(env_dict, "DRAWDOWN_MAX_PERCENT"),
+        # Share of a limit used at which new orders are blocked, and at which every position is closed
+        "BLOCK_AT": read_optional(env_dict, "DRAWDOWN_BLOCK_AT"),
+        "FLATTEN_AT": read_optional(env_dict, "DRAWDOWN_FLATTEN_AT"),
+        "INTERVAL": float(env_dict.get("DRAWDOWN_INTERVAL_SECONDS", 2.0))
+    }
+
+def read_optional(env_dict: dict, key: str, cast=float):
+    """Reads an optional number, None when the key is unset or empty."""
+    value = env_dict.get(key)
+    return cast(value) if value else None
\ No newline at end of file
@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List
+from data.trade import Trade
+from business.brokerWorker import BrokerWorker
+from business.signalBus import open_bus_connection, read_frame, write_frame
+from business.riskEngine import RiskEngine, RiskLimits
+from business.positionSizer import PositionSizer
+from business.drawdownMonitor import DrawdownMonitor
+from business.tpLadder import TpLadder
+from utility.utility_mt5 import (get_account_handler, open_trades_account, update_trades_account,
+                                 update_trades_be_account, close_trades_account, reconcile_trades_account,
+                                 seed_risk_account, monitor_drawdown_account, watch_tp_ladder_account)
+
+logger = logging.getLogger(__name__)
+
+
+def _trades(records: List[Dict[str, Any]]) -> List[Trade]:
+    return [Trade(**record) for record in records]
+
+
+def _records(items: List[Any]) -> List[Dict[str, Any]]:
+    return [asdict(item) for item in items]
+
+
+class AccountExecutor:
+    def __init__(self, mt5: Dict[str, Any], address: str) -> None:
+        """
+        Initialize the executor of the trade operations of one account.
+
+        The executor runs in its own process, logged in once to the terminal of its account
+        (mt5["TERMINAL_PATH"]), and runs the operations received from the signal bus in arrival order.
+
+        Args:
+            mt5 (Dict[str, Any]): The configuration of the account, an entry of config["MT5"].
+            address (str): The address of the signal bus.
+        """
+        self.mt5 = mt5
+        self.account = mt5["ACCOUNT"]
+        self.address = address
+        self.mt_handler = None
+        self.broker = BrokerWorker(f"mt5-{self.account}")
+        # Exposure of the account, kept in this process where its fills and closes happen
+        self.risk_engine = RiskEngine(default_limits=mt5.get("RISK_LIMITS") or RiskLimits())
+        self.sizer = PositionSizer(risk_percent=mt5.get("RISK_PERCENT"))
+        self.drawdown_monitor = DrawdownMonitor(self.risk_engine)
+        self.ladder = None
+        if mt5.get("TP_MODE") == "ladder":
+            # One file per executor, the processes do not share their ladders
+            root, ext = os.path.splitext(mt5["TP_LADDER_PATH"])
+            self.ladder = TpLadder(f"{root}-{self.account}{ext}", self.risk_engine)
+        self.operations: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            'open': self._open,
+            'update': self._update,
+            'be': self._be,
+            'close': self._close,
+            'reconcile': self._reconcile,
+        }
+
+    async def run(self) -> None:
+        """Log in to the terminal, then serve the bus until it asks for a shutdown."""
+        self.mt_handler = await self.broker.call(get_account_handler, self.mt5)
+        await self.broker.call(seed_risk_account, self.mt_handler, self.mt5, self.risk_engine)
+        watcher = asyncio.create_task(self._watch_drawdown()) if self.mt5.get("DRAWDOWN_RULES") is not None else None
+        ladder_watcher = asyncio.create_task(self._watch_tp_ladder()) if self.ladder is not None else None
+        while True:
+            try:
+                reader, writer = await open_bus_connection(self.address)
+            except (ConnectionError, OSError) as e:
+                logger.warning(f"⚠️ Signal bus not reachable for account {self.account}: {e}, retrying in 1 second...")
+                await asyncio.sleep(1)
+                continue
+            await write_frame(writer, {'type': 'hello', 'account': self.account, 'pid': os.getpid()})
+            if await self._serve(reader, writer):
+                break
+        for task in (watcher, ladder_watcher):
+            if task is not None:
+                task.cancel()
+        await self.broker.shutdown()
+        self.mt_handler.shutdown_mt5()
+
+    async def _watch_drawdown(self) -> None:
+        # Runs on the broker thread between the operations, a breach blocks the next opens of this executor
+        while True:
+            try:
+                await self.broker.call(monitor_drawdown_account, self.mt_handler, self.mt5, self.drawdown_monitor)
+            except Exception as e:
+                logger.error(f"❌ Drawdown check failed on account {self.account}: {e}")
+            await asyncio.sleep(self.mt5.get("DRAWDOWN_INTERVAL", 2.0))
+
+    async def _watch_tp_ladder(self) -> None:
+        # Partial closes at the take profits of the positions opened once per signal, between the operations
+        while True:
+            try:
+                await self.broker.call(watch_tp_ladder_account, self.mt_handler, self.ladder)
+            except Exception as e:
+                logger.error(f"❌ TP ladder check failed on account {self.account}: {e}")
+            await asyncio.sleep(self.mt5.get("TP_LADDER_INTERVAL", 0.5))
+
+    def execute(self, op: str, payload: Dict[str, Any]) -> Any:
+        """Run an operation on the terminal, called on the broker thread."""
+        if not self.mt_handler.initialize_mt5():
+            raise ConnectionError(f"MetaTrader 5 terminal of account {self.account} not available")
+        if self.risk_engine.needs_seed(self.account):
+            seed_risk_account(self.mt_handler, self.mt5, self.risk_engine)
+        return self.operations[op](payload)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        # Operations run one at a time in arrival order; the bus window bounds the local queue.
+        queue: asyncio.Queue = asyncio.Queue()
+        worker = asyncio.create_task(self._work(queue, writer))
+        shutdown = False
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                if frame['type'] == 'shutdown':
+                    shutdown = True
+                    break
+                frame['received_at'] = time.time()
+                queue.put_nowait(frame)
+        except (ConnectionError, OSError, ValueError) as e:
+            logger.error(f"❌ Signal bus connection of account {self.account} failed: {e}")
+        await queue.put(None)
+        await worker
+        writer.close()
+        return shutdown
+
+    async def _work(self, queue: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        while True:
+            frame = await queue.get()
+            if frame is None:
+                return
+            ack = {'type': 'ack', 'seq': frame['seq'], 'received_at': frame['received_at'], 'started_at': time.time()}
+            try:
+                ack['result'] = await self.broker.call(self.execute, frame['op'], frame['payload'])
+            except Exception as e:
+                logger.error(f"❌ Error running {frame['op']} on account {self.account}: {e}")
+                ack['error'] = str(e)
+            ack['done_at'] = time.time()
+            try:
+                await write_frame(writer, ack)
+            except (ConnectionError, OSError) as e:
+                logger.error(f"❌ Acknowledgement of {frame['op']} lost for account {self.account}: {e}")
+
+    def _open(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return _records(open_trades_account(self.mt_handler, self.mt5, payload['parsed_text'], payload['db_message_id'], payload['tg_src_chat_id'], self.risk_engine, self.sizer, self.ladder))
+
+    def _update(self, payload: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        trades, updates = update_trades_account(self.mt_handler, self.mt5, _trades(payload['trades']), payload['parsed_text'], payload['db_message_id'], payload['text'], self.risk_engine, self.ladder, payload.get('previous_parsed_text'))
+        return {'trades': _records(trades), 'updates': _records(updates)}
+
+    def _be(self, payload: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        trades, updates = update_trades_be_account(self.mt_handler, self.mt5, _trades(payload['trades']), payload['parsed_text'], payload['text'], self.risk_engine)
+        return {'trades': _records(trades), 'updates': _records(updates)}
+
+    def _close(self, payload: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        trades, updates = close_trades_account(self.mt_handler, self.mt5, _trades(payload['trades']), payload['text'], self.risk_engine)
+        return {'trades': _records(trades), 'updates': _records(updates)}
+
+    def _reconcile(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        open_trades_db = {msg_id: _trades(records) for msg_id, records in payload['trades'].items()}
+        return _records(reconcile_trades_account(self.mt_handler, open_trades_db, self.risk_engine))
+
+
+def run_executor(mt5: Dict[str, Any], address: str) -> None:
+    """Entry point of an executor process."""
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s - executor-{mt5['ACCOUNT']} - %(name)s - %(levelname)s - %(message)s")
+    asyncio.run(AccountExecutor(mt5, address).run())
+
+
+class ExecutorProcessPool:
+    def __init__(self, accounts: List[Dict[str, Any]], address: str, backoff_max: float = 60.0) -> None:
+        """
+        Initialize the long-lived executor processes, one per account.
+
+        Args:
+            accounts (List[Dict[str, Any]]): The account configurations, config["MT5"].
+            address (str): The address of the signal bus.
+            backoff_max (float): Maximum seconds before restarting an executor that keeps exiting.
+        """
+        self.accounts = accounts
+        self.address = address
+        self.backoff_max = backoff_max
+        # spawn is the only start method on Windows, where the terminals run; it is used everywhere for consistency.
+        self._context = multiprocessing.get_context('spawn')
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._restarts: Dict[int, int] = {}
+        self._failures: Dict[int, int] = {}
+        self._started_at: Dict[int, float] = {}
+        self._next_start: Dict[int, float] = {}
+        self._stopping = False
+
+    def start(self) -> None:
+        """Start the executors that are not running, an executor that exited waits for its restart delay."""
+        now = time.monotonic()
+        for mt5 in self.accounts:
+            account = mt5["ACCOUNT"]
+            process = self._processes.get(account)
+            if process is not None:
+                if process.is_alive():
+                    continue
+                if account not in self._next_start:
+                    # An executor that ran for backoff_max seconds restarts right away, the delay doubles otherwise.
+                    stable = now - self._started_at[account] >= self.backoff_max
+                    self._failures[account] = 0 if stable else self._failures.get(account, 0) + 1
+                    delay = min(2 ** self._failures[account] - 1, self.backoff_max)
+                    self._next_start[account] = now + delay
+                    logger.warning(f"⚠️ Executor of account {account} exited with code {process.exitcode}, restarting in {delay} seconds...")
+                if now < self._next_start[account]:
+                    continue
+                del self._next_start[account]
+                self._restarts[account] = self._restarts.get(account, 0) + 1
+            process = self._context.Process(target=run_executor, args=(mt5, self.address), name=f"executor-{account}", daemon=True)
+            process.start()
+            self._processes[account] = process
+            self._started_at[account] = now
+
+    async def watch(self, interval: float = 1.0) -> None:
+        """Start the executors and restart the ones that exit, until cancelled."""
+        while not self._stopping:
+            self.start()
+            await asyncio.sleep(interval)
+
+    def metrics(self) -> Dict[int, Dict[str, Any]]:
+        """Return, by account, the pid, liveness and restart count of the executor."""
+        return {
+            account: {'pid': process.pid, 'alive': process.is_alive(), 'restarts': self._restarts.get(account, 0)}
+            for account, process in self._processes.items()
+        }
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Wait for the executors to exit after the bus shutdown, terminate the ones still running."""
+        self._stopping = True
+        deadline = time.monotonic() + timeout
+        while any(process.is_alive() for process in self._processes.values()) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for account, process in self._processes.items():
+            if process.is_alive():
+                logger.warning(f"⚠️ Executor of account {account} did not exit, terminating it")
+                process.terminate()
+                process.join(5)
@@ -0,0 +1,88 @@
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class BrokerWorker:
+    def __init__(self, name: str = "mt5-broker") -> None:
+        """
+        Initialize the worker running the MetaTrader 5 calls.
+
+        The MetaTrader5 module holds a single terminal connection for the whole process, so every call
+        runs on one dedicated thread, in submission order, and the blocking terminal round trips never
+        stall the event loop.
+
+        Args:
+            name (str): The name of the worker thread.
+        """
+        self.name = name
+        self.calls = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self.max_wait = 0.0
+        self._pending = 0
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    async def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking function on the broker thread and wait for its result.
+
+        A call already started is completed even if the awaiting task is cancelled, shutdown() waits for it.
+
+        Args:
+            func (Callable[..., Any]): The function calling MetaTrader 5.
+            *args (Any): The positional arguments of the function.
+            **kwargs (Any): The keyword arguments of the function.
+
+        Returns:
+            Any: The value returned by the function.
+
+        Raises:
+            RuntimeError: If the worker is shut down.
+            Exception: Any exception raised by the function.
+        """
+        if self._closed:
+            raise RuntimeError(f"Broker worker {self.name} is shut down")
+        submitted = time.monotonic()
+
+        def run() -> Any:
+            started = time.monotonic()
+            self.max_wait = max(self.max_wait, started - submitted)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.busy_time += time.monotonic() - started
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, run)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._pending -= 1
+            self.calls += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the number of calls, the calls waiting for the thread and the time spent in MT5."""
+        return {
+            'calls': self.calls,
+            'failed': self.failed,
+            'pending': self._pending,
+            'avg_call': self.busy_time / self.calls if self.calls else 0.0,
+            'max_wait': self.max_wait,
+        }
+
+    async def shutdown(self) -> None:
+        """Refuse new calls and wait for the calls already submitted, orders in flight included."""
+        self._closed = True
+        await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+        logger.info(f"✅ Broker worker {self.name} stopped after {self.calls} calls")
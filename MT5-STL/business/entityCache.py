@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+from telethon import TelegramClient
+from telethon.tl import types
+
+logger = logging.getLogger(__name__)
+
+# Input peer types stored in the cache file, by their TL name.
+INPUT_PEER_TYPES = {cls.__name__: cls for cls in (types.InputPeerChannel, types.InputPeerChat, types.InputPeerUser)}
+
+
+class EntityCache:
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Initialize the cache of the input peers of the Telegram chats, keyed by chat ID.
+
+        An input peer holds the access hash Telegram requires to address a chat, so a cached peer
+        never needs a ResolvePeer/GetChannels round trip. The access hash belongs to the Telegram
+        account, the cache is shared by all its sessions.
+
+        Args:
+            path (Optional[str]): The JSON file the cache is persisted to, None to keep it in memory.
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._peers: Dict[int, Any] = self._read()
+
+    async def preload(self, client: TelegramClient, chat_ids: Iterable[int]) -> None:
+        """
+        Resolve the chats missing from the cache, then persist it.
+
+        Args:
+            client (TelegramClient): A connected client of the Telegram account.
+            chat_ids (Iterable[int]): The chat IDs used on the hot path, source and destination channels.
+        """
+        resolved = 0
+        for chat_id in set(chat_ids) - self._peers.keys():
+            try:
+                self._peers[chat_id] = await client.get_input_entity(chat_id)
+                resolved += 1
+            except Exception as e:
+                logger.error(f"❌ Error resolving Telegram chat {chat_id}: {e}")
+        if resolved:
+            self.save()
+        logger.info(f"✅ Entity cache preloaded, {resolved} chats resolved, {len(self._peers)} cached")
+
+    async def get_input_peer(self, client: TelegramClient, chat_id: int) -> Any:
+        """
+        Return the input peer of a chat, resolved with the client on a cache miss.
+
+        Args:
+            client (TelegramClient): A connected client of the Telegram account.
+            chat_id (int): The chat ID.
+
+        Returns:
+            Any: The InputPeer of the chat.
+        """
+        peer = self._peers.get(chat_id)
+        if peer is not None:
+            self.hits += 1
+            return peer
+        self.misses += 1
+        logger.warning(f"⚠️ Telegram chat {chat_id} not in the entity cache, resolving it")
+        peer = self._peers[chat_id] = await client.get_input_entity(chat_id)
+        self.save()
+        return peer
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the size and the hit rate of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._peers),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self) -> None:
+        """Write the cache to its file, replaced atomically."""
+        if self.path is None:
+            return
+        with self._lock:
+            data = {str(chat_id): peer.to_dict() for chat_id, peer in self._peers.items()}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.path)
+
+    def _read(self) -> Dict[int, Any]:
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Entity cache {self.path} could not be read, starting empty: {e}")
+            return {}
+        peers = {}
+        for chat_id, peer in data.items():
+            cls = INPUT_PEER_TYPES.get(peer.pop('_', None))
+            if cls is not None:
+                peers[int(chat_id)] = cls(**peer)
+        return peers
@@ -0,0 +1,99 @@
+import logging
+import math
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PositionSizer:
+    def __init__(self, risk_percent: Optional[float] = None, account_ttl: float = 10.0, symbol_ttl: float = 60.0) -> None:
+        """
+        Initialize the risk based position sizing.
+
+        The lots of a signal are computed so that the positions lose risk_percent of the account equity
+        when the stop loss is hit. The account info and the symbol info of every account are cached for
+        account_ttl and symbol_ttl seconds, so sizing a signal adds no terminal round trip within them but
+        the tick of a market signal, whose price is always read fresh.
+
+        Args:
+            risk_percent (Optional[float]): Percent of the equity risked per signal, None to keep the
+                configured lot sizes unless a symbol sets its own risk_percent.
+            account_ttl (float): Seconds the balance and equity of an account are reused.
+            symbol_ttl (float): Seconds the tick value, tick size and volume limits of a symbol are reused.
+        """
+        self.risk_percent = risk_percent
+        self.account_ttl = account_ttl
+        self.symbol_ttl = symbol_ttl
+        self.hits = 0
+        self.misses = 0
+        # account ID -> (expiry, account info)
+        self._accounts: Dict[int, Tuple[float, Any]] = {}
+        # (account ID, symbol) -> (expiry, symbol info)
+        self._symbols: Dict[Tuple[int, str], Tuple[float, Any]] = {}
+
+    def lots(self, mt_handler: Any, symbol: str, direction: str, entry_price: Optional[float], stop_loss: Optional[float],
+             n_positions: int = 1, risk_percent: Optional[float] = None) -> Optional[float]:
+        """
+        Compute the lots of each position of a signal from its risk.
+
+        Args:
+            mt_handler (Any): The handler of the account, logged in, see MetatraderHandler.
+            symbol (str): The broker symbol.
+            direction (str): The order direction, e.g. 'buy' or 'sell limit'.
+            entry_price (Optional[float]): The entry of the signal, None or 0 for a market order sized from the current price.
+            stop_loss (Optional[float]): The stop loss of the signal.
+            n_positions (int): The positions the risk is split between, one per take profit.
+            risk_percent (Optional[float]): Overrides the default risk percent, e.g. for a symbol.
+
+        Returns:
+            Optional[float]: The lots of each position rounded down to the volume step, None if the
+            signal cannot be sized and the configured lot size applies.
+        """
+        risk_percent = risk_percent if risk_percent is not None else self.risk_percent
+        if not risk_percent or not float(stop_loss or 0):
+            return None
+        account_info = self._cached(self._accounts, mt_handler.account, self.account_ttl, mt_handler.get_account_info)
+        symbol_info = self._cached(self._symbols, (mt_handler.account, symbol), self.symbol_ttl,
+                                   lambda: mt_handler.get_symbol_info(symbol))
+        if account_info is None or symbol_info is None or not symbol_info.trade_tick_size:
+            return None
+        # Market signals carry no entry, the current price stands for it; the cached symbol info holds stale prices
+        price = float(entry_price or 0) or mt_handler.get_price(symbol, direction)
+        if not price:
+            return None
+        distance = abs(price - float(stop_loss))
+        if not distance:
+            return None
+        loss_per_lot = distance / symbol_info.trade_tick_size * symbol_info.trade_tick_value
+        risk = account_info.equity * risk_percent / 100 / max(1, n_positions)
+        step = symbol_info.volume_step or 0.01
+        lots = round(math.floor(risk / loss_per_lot / step + 1e-9) * step, 8)
+        if lots < symbol_info.volume_min:
+            logger.warning(f"⚠️ {risk_percent}% of the equity is below the minimum volume of {symbol} on account {mt_handler.account}, "
+                           f"the configured lot size applies")
+            return None
+        return min(lots, symbol_info.volume_max)
+
+    def invalidate(self, account_id: Optional[int] = None) -> None:
+        """Drop the cached account info, of one account or of all, e.g. after a deposit."""
+        if account_id is None:
+            self._accounts.clear()
+        else:
+            self._accounts.pop(account_id, None)
+
+    def metrics(self) -> Dict[str, int]:
+        """Return the cache hits and misses."""
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _cached(self, cache: Dict[Any, Tuple[float, Any]], key: Any, ttl: float, load) -> Any:
+        now = time.monotonic()
+        entry = cache.get(key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = load()
+        if value is not None:
+            cache[key] = (now + ttl, value)
+        return value
@@ -0,0 +1,272 @@
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RiskLimits:
+    """Pre-trade limits of an account, None disables a limit. Amounts are in the account currency."""
+    # Realized loss of the day plus the risk to SL of the open positions and of the new order.
+    max_daily_loss: Optional[float] = None
+    # Lots open on the account, and on a single symbol.
+    max_total_lots: Optional[float] = None
+    max_symbol_lots: Optional[float] = None
+    # Risk to SL of the open positions and of the new order.
+    max_open_risk: Optional[float] = None
+    max_positions: Optional[int] = None
+
+    @property
+    def needs_risk(self) -> bool:
+        return self.max_daily_loss is not None or self.max_open_risk is not None
+
+
+class _Exposure:
+    """Exposure of an account, maintained incrementally from fills, modifications and closes."""
+    __slots__ = ('positions', 'symbol_lots', 'lots', 'open_risk', 'realized', 'day')
+
+    def __init__(self) -> None:
+        # order_id -> (symbol, direction, volume, entry_price, risk)
+        self.positions: Dict[int, Tuple[str, str, float, float, float]] = {}
+        self.symbol_lots: Dict[str, float] = {}
+        self.lots = 0.0
+        self.open_risk = 0.0
+        self.realized = 0.0
+        self.day = None
+
+
+class RiskEngine:
+    def __init__(self, limits: Optional[Dict[int, RiskLimits]] = None, default_limits: RiskLimits = RiskLimits()) -> None:
+        """
+        Initialize the pre-trade risk engine.
+
+        The engine keeps, for each account, the lots open in total and by symbol, the money at risk
+        to the stop loss of the open positions and the realized PnL of the day. They are updated by
+        on_fill(), on_modify() and on_close(), so check() answers in constant time without asking
+        the terminal for the account or its positions. The state is seeded once at startup with seed().
+
+        The day rolls over at midnight UTC.
+
+        Args:
+            limits (Optional[Dict[int, RiskLimits]]): Account ID -> limits, overriding the default.
+            default_limits (RiskLimits): Limits of the accounts not in limits.
+        """
+        self.limits = limits or {}
+        self.default_limits = default_limits
+        self.accepted = 0
+        self.rejected = 0
+        self._accounts: Dict[int, _Exposure] = {}
+        # account ID -> reason, set by the drawdown monitor while no position may be opened
+        self._blocked: Dict[int, str] = {}
+        # Accounts whose positions could not be read at seed(), their exposure is unknown until seeded
+        self._unseeded: Set[int] = set()
+        # (account ID, symbol) -> money gained or lost per lot for a price move of 1.0
+        self._values: Dict[Tuple[int, str], float] = {}
+        self._lock = threading.Lock()
+
+    def check(self, account_id: int, symbol: str, direction: str, volume: float, entry_price: float,
+              stop_loss: float, load_value: Callable[[str], Optional[float]]) -> Optional[str]:
+        """
+        Check an order against the limits of its account.
+
+        Args:
+            account_id (int): The account the order is sent on.
+            symbol (str): The broker symbol.
+            direction (str): The order direction, e.g. 'buy' or 'sell limit'.
+            volume (float): The lots of the order.
+            entry_price (float): The expected fill price.
+            stop_loss (float): The stop loss of the order, 0 for none.
+            load_value (Callable[[str], Optional[float]]): Returns the value of a price move of 1.0 for one
+                lot of a symbol, called once per symbol and account.
+
+        Returns:
+            Optional[str]: None if the order is accepted, the reason of the rejection otherwise.
+        """
+        limits = self.limits.get(account_id, self.default_limits)
+        with self._lock:
+            exposure = self._exposure(account_id)
+            reason = None
+            if account_id in self._unseeded:
+                reason = "open positions unknown, exposure not seeded"
+            elif account_id in self._blocked:
+                reason = self._blocked[account_id]
+            elif limits.max_positions is not None and len(exposure.positions) + 1 > limits.max_positions:
+                reason = f"{len(exposure.positions)} positions open, limit {limits.max_positions}"
+            elif limits.max_total_lots is not None and exposure.lots + volume > limits.max_total_lots + 1e-9:
+                reason = f"{exposure.lots + volume:.2f} lots on the account, limit {limits.max_total_lots}"
+            elif limits.max_symbol_lots is not None and exposure.symbol_lots.get(symbol, 0.0) + volume > limits.max_symbol_lots + 1e-9:
+                reason = f"{exposure.symbol_lots.get(symbol, 0.0) + volume:.2f} lots on {symbol}, limit {limits.max_symbol_lots}"
+            elif limits.needs_risk:
+                risk = self._risk(account_id, symbol, direction, volume, entry_price, stop_loss, load_value)
+                if risk is None:
+                    reason = f"risk of the order on {symbol} unknown (no stop loss or no price)"
+                elif limits.max_open_risk is not None and exposure.open_risk + risk > limits.max_open_risk:
+                    reason = f"open risk {exposure.open_risk + risk:.2f}, limit {limits.max_open_risk}"
+                elif limits.max_daily_loss is not None and max(0.0, -exposure.realized) + exposure.open_risk + risk > limits.max_daily_loss:
+                    reason = f"daily loss {-exposure.realized:.2f} with open risk {exposure.open_risk + risk:.2f}, limit {limits.max_daily_loss}"
+        if reason is None:
+            self.accepted += 1
+            return None
+        self.rejected += 1
+        logger.warning(f"⚠️ Order {direction} {volume} {symbol} rejected on account {account_id}: {reason}")
+        return reason
+
+    def on_fill(self, account_id: int, order_id: int, symbol: str, direction: str, volume: float, entry_price: float,
+                stop_loss: float, load_value: Optional[Callable[[str], Optional[float]]] = None) -> None:
+        """Add a filled position to the exposure of its account."""
+        with self._lock:
+            exposure = self._exposure(account_id)
+            if order_id in exposure.positions:
+                return
+            risk = self._risk(account_id, symbol, direction, volume, entry_price, stop_loss, load_value) or 0.0
+            exposure.positions[order_id] = (symbol, direction, volume, entry_price, risk)
+            exposure.symbol_lots[symbol] = exposure.symbol_lots.get(symbol, 0.0) + volume
+            exposure.lots += volume
+            exposure.open_risk += risk
+
+    def on_modify(self, account_id: int, order_id: int, stop_loss: Optional[float]) -> None:
+        """Recompute the risk of a position whose stop loss moved, e.g. to break even."""
+        if stop_loss is None:
+            return
+        with self._lock:
+            exposure = self._exposure(account_id)
+            position = exposure.positions.get(order_id)
+            if position is None:
+                return
+            symbol, direction, volume, entry_price, old_risk = position
+            risk = self._risk(account_id, symbol, direction, volume, entry_price, stop_loss, None) or 0.0
+            exposure.positions[order_id] = (symbol, direction, volume, entry_price, risk)
+            exposure.open_risk += risk - old_risk
+
+    def on_reduce(self, account_id: int, order_id: int, volume: float) -> None:
+        """Shrink a position partially closed, e.g. at a take profit of its ladder, its risk in proportion."""
+        with self._lock:
+            exposure = self._exposure(account_id)
+            position = exposure.positions.get(order_id)
+            if position is None:
+                return
+            symbol, direction, old_volume, entry_price, old_risk = position
+            volume = min(volume, old_volume)
+            risk = old_risk * (old_volume - volume) / old_volume if old_volume else 0.0
+            exposure.positions[order_id] = (symbol, direction, old_volume - volume, entry_price, risk)
+            exposure.symbol_lots[symbol] = max(0.0, exposure.symbol_lots.get(symbol, 0.0) - volume)
+            exposure.lots = max(0.0, exposure.lots - volume)
+            exposure.open_risk = max(0.0, exposure.open_risk - (old_risk - risk))
+
+    def on_close(self, account_id: int, order_id: int, profit: Optional[float] = None) -> None:
+        """
+        Remove a closed position from the exposure of its account and book its PnL.
+
+        Args:
+            account_id (int): The account of the position.
+            order_id (int): The ticket of the position.
+            profit (Optional[float]): The realized PnL of the position, None if unknown.
+        """
+        with self._lock:
+            exposure = self._exposure(account_id)
+            position = exposure.positions.pop(order_id, None)
+            # A position is booked once, the reconciler may report a close again until the database catches up.
+            if position is None:
+                return
+            symbol, _, volume, _, risk = position
+            exposure.symbol_lots[symbol] = max(0.0, exposure.symbol_lots.get(symbol, 0.0) - volume)
+            exposure.lots = max(0.0, exposure.lots - volume)
+            exposure.open_risk = max(0.0, exposure.open_risk - risk)
+            if profit is not None:
+                exposure.realized += profit
+
+    def block(self, account_id: int, reason: str) -> None:
+        """Reject every new order of an account until unblock()."""
+        if account_id not in self._blocked:
+            logger.warning(f"⚠️ New orders blocked on account {account_id}: {reason}")
+        self._blocked[account_id] = reason
+
+    def unblock(self, account_id: int) -> None:
+        """Check the orders of an account against its limits again."""
+        if self._blocked.pop(account_id, None) is not None:
+            logger.info(f"✅ New orders allowed again on account {account_id}")
+
+    def seed_failed(self, account_id: int) -> None:
+        """Reject every new order of an account until it is seeded, its positions could not be read."""
+        if account_id not in self._unseeded:
+            logger.warning(f"⚠️ Positions of account {account_id} not available, new orders rejected until the risk engine is seeded")
+        self._unseeded.add(account_id)
+
+    def needs_seed(self, account_id: int) -> bool:
+        """Whether the seed of an account failed and must be retried."""
+        return account_id in self._unseeded
+
+    def tracks(self, account_id: int, order_id: int) -> bool:
+        """Whether a position is part of the exposure of its account."""
+        exposure = self._accounts.get(account_id)
+        return exposure is not None and order_id in exposure.positions
+
+    def seed(self, account_id: int, positions: Dict[int, Any], realized_today: float,
+             load_value: Callable[[str], Optional[float]]) -> None:
+        """
+        Reset the exposure of an account from the terminal, once at startup or again after seed_failed().
+
+        Args:
+            account_id (int): The account.
+            positions (Dict[int, Any]): The open positions, see MetatraderHandler.get_positions_snapshot().
+            realized_today (float): The PnL of the deals closed since midnight UTC.
+            load_value (Callable[[str], Optional[float]]): See check().
+        """
+        with self._lock:
+            self._accounts[account_id] = _Exposure()
+            self._exposure(account_id).realized = realized_today
+            self._unseeded.discard(account_id)
+        for ticket, position in positions.items():
+            direction = 'buy' if position.type == 0 else 'sell'
+            self.on_fill(account_id, int(ticket), position.symbol, direction, position.volume, position.price_open,
+                         position.sl, load_value)
+        logger.info(f"✅ Risk engine seeded for account {account_id}: {self.exposure(account_id)}")
+
+    def exposure(self, account_id: int) -> Dict[str, Any]:
+        """Return the current exposure of an account."""
+        with self._lock:
+            exposure = self._exposure(account_id)
+            return {
+                'positions': len(exposure.positions),
+                'lots': round(exposure.lots, 2),
+                'symbol_lots': {symbol: round(lots, 2) for symbol, lots in exposure.symbol_lots.items() if lots},
+                'open_risk': round(exposure.open_risk, 2),
+                'realized_today': round(exposure.realized, 2),
+            }
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the number of accepted and rejected orders and the exposure of every account."""
+        return {
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'blocked': dict(self._blocked),
+            'accounts': {account_id: self.exposure(account_id) for account_id in list(self._accounts)},
+        }
+
+    def _exposure(self, account_id: int) -> _Exposure:
+        exposure = self._accounts.get(account_id)
+        if exposure is None:
+            exposure = self._accounts[account_id] = _Exposure()
+        today = datetime.now(timezone.utc).date()
+        if exposure.day != today:
+            if exposure.day is not None:
+                exposure.realized = 0.0
+            exposure.day = today
+        return exposure
+
+    def _risk(self, account_id: int, symbol: str, direction: str, volume: float, entry_price: float, stop_loss: float,
+              load_value: Optional[Callable[[str], Optional[float]]]) -> Optional[float]:
+        if not stop_loss or not entry_price:
+            return None
+        value = self._values.get((account_id, symbol))
+        if value is None and load_value is not None:
+            value = load_value(symbol)
+            if value:
+                self._values[(account_id, symbol)] = value
+        if not value:
+            return None
+        distance = entry_price - stop_loss if direction.lower().startswith('buy') else stop_loss - entry_price
+        return max(0.0, distance) * volume * value
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default bus address: a Unix socket where the platform has them, a loopback TCP port otherwise (Windows).
+DEFAULT_BUS_ADDRESS = 'sessions/signal-bus.sock' if hasattr(socket, 'AF_UNIX') else '127.0.0.1:7755'
+
+# Hops of a signal, timed with the wall clock shared by the processes of the host.
+HOPS = ('bus', 'queue', 'execute', 'ack', 'round_trip')
+
+
+def parse_bus_address(address: str) -> Tuple[str, Any]:
+    """
+    Parse a bus address.
+
+    Args:
+        address (str): 'host:port' for a TCP socket, a filesystem path for a Unix socket.
+
+    Returns:
+        Tuple[str, Any]: ('tcp', (host, port)) or ('unix', path).
+    """
+    host, _, port = address.rpartition(':')
+    if host and port.isdigit():
+        return 'tcp', (host, int(port))
+    return 'unix', address
+
+
+async def open_bus_connection(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to the bus at the given address."""
+    kind, target = parse_bus_address(address)
+    if kind == 'tcp':
+        return await asyncio.open_connection(*target)
+    return await asyncio.open_unix_connection(target)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Read a JSON line frame, None when the peer closed the connection."""
+    line = await reader.readline()
+    return json.loads(line) if line else None
+
+
+async def write_frame(writer: asyncio.StreamWriter, frame: Dict[str, Any]) -> None:
+    """Write a JSON line frame, waiting while the socket buffer of the peer is full."""
+    writer.write((json.dumps(frame, default=str) + '\n').encode('utf-8'))
+    await writer.drain()
+
+
+class _ExecutorLink:
+    """Connection of an account executor, with its credit of unacknowledged signals and its counters."""
+
+    def __init__(self, account: int, writer: asyncio.StreamWriter, window: int) -> None:
+        self.account = account
+        self.writer = writer
+        self.credit = asyncio.Semaphore(window)
+        self.pending: Dict[int, Tuple[asyncio.Future, float]] = {}
+        self.published = 0
+        self.acked = 0
+        self.failed = 0
+        self.hop_total = dict.fromkeys(HOPS, 0.0)
+        self.hop_max = dict.fromkeys(HOPS, 0.0)
+
+    def record(self, ack: Dict[str, Any], sent_at: float, acked_at: float) -> None:
+        hops = {
+            'bus': ack['received_at'] - sent_at,
+            'queue': ack['started_at'] - ack['received_at'],
+            'execute': ack['done_at'] - ack['started_at'],
+            'ack': acked_at - ack['done_at'],
+            'round_trip': acked_at - sent_at,
+        }
+        for hop, seconds in hops.items():
+            self.hop_total[hop] += seconds
+            self.hop_max[hop] = max(self.hop_max[hop], seconds)
+
+
+class SignalBus:
+    def __init__(self, address: str = DEFAULT_BUS_ADDRESS, window: int = 8, ack_timeout: float = 30.0,
+                 connect_timeout: float = 10.0) -> None:
+        """
+        Initialize the bus publishing the trade operations of the ingest process to the account executors.
+
+        Every executor connects and announces its account; an operation published for an account is
+        sent to its executor, which acknowledges it with the result once it ran on the terminal. An
+        executor holds at most window unacknowledged operations, publish() waits for a free slot
+        beyond that, so a slow terminal pushes back on the signal queue instead of buffering.
+
+        Args:
+            address (str): 'host:port' to listen on TCP, a filesystem path to listen on a Unix socket.
+            window (int): Unacknowledged operations allowed per executor.
+            ack_timeout (float): Seconds an operation may wait for its acknowledgement.
+            connect_timeout (float): Seconds publish() waits for the executor of an account to connect.
+        """
+        self.address = address
+        self.window = window
+        self.ack_timeout = ack_timeout
+        self.connect_timeout = connect_timeout
+        self._links: Dict[int, _ExecutorLink] = {}
+        self._connected: Dict[int, asyncio.Event] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._seq = 0
+
+    async def serve(self) -> None:
+        """Listen for the executors until cancelled."""
+        kind, target = parse_bus_address(self.address)
+        if kind == 'tcp':
+            self._server = await asyncio.start_server(self._handle_executor, *target)
+        else:
+            directory = os.path.dirname(target)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if os.path.exists(target):
+                os.unlink(target)
+            self._server = await asyncio.start_unix_server(self._handle_executor, target)
+        logger.info(f"✅ Signal bus listening on {self.address}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def publish(self, account: int, op: str, payload: Dict[str, Any]) -> Any:
+        """
+        Send an operation to the executor of an account and wait for its result.
+
+        Args:
+            account (int): The MT5 account the operation runs on.
+            op (str): The executor operation, see AccountExecutor.OPERATIONS.
+            payload (Dict[str, Any]): The JSON serializable arguments of the operation.
+
+        Returns:
+            Any: The result returned by the executor.
+
+        Raises:
+            ConnectionError: If the executor is not connected, or disconnects before acknowledging.
+            asyncio.TimeoutError: If the acknowledgement does not arrive within ack_timeout.
+            RuntimeError: If the operation failed in the executor.
+        """
+        connected = self._connected.setdefault(account, asyncio.Event())
+        try:
+            await asyncio.wait_for(connected.wait(), self.connect_timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"No executor connected for account {account}") from None
+        link = self._links[account]
+        async with link.credit:
+            if self._links.get(account) is not link:
+                raise ConnectionError(f"Executor of account {account} disconnected")
+            self._seq += 1
+            seq = self._seq
+            future = asyncio.get_running_loop().create_future()
+            sent_at = time.time()
+            link.pending[seq] = (future, sent_at)
+            link.published += 1
+            try:
+                await write_frame(link.writer, {'type': 'signal', 'seq': seq, 'op': op, 'payload': payload, 'sent_at': sent_at})
+                ack = await asyncio.wait_for(future, self.ack_timeout)
+            except Exception:
+                link.failed += 1
+                raise
+            finally:
+                link.pending.pop(seq, None)
+        if ack.get('error'):
+            link.failed += 1
+            raise RuntimeError(f"Executor of account {account} failed {op}: {ack['error']}")
+        return ack.get('result')
+
+    def metrics(self) -> Dict[int, Dict[str, Any]]:
+        """Return, by account, the executor connection state, its counters and the average and maximum seconds of every hop."""
+        metrics = {}
+        for account, link in self._links.items():
+            metrics[account] = {
+                'connected': self._connected[account].is_set(),
+                'in_flight': len(link.pending),
+                'published': link.published,
+                'acked': link.acked,
+                'failed': link.failed,
+                'avg': {hop: total / link.acked if link.acked else 0.0 for hop, total in link.hop_total.items()},
+                'max': dict(link.hop_max),
+            }
+        return metrics
+
+    async def stop(self) -> None:
+        """Ask every executor to finish its queued operations and exit, then stop listening."""
+        for link in list(self._links.values()):
+            try:
+                await write_frame(link.writer, {'type': 'shutdown'})
+            except (ConnectionError, OSError):
+                pass
+        if self._server is not None:
+            self._server.close()
+
+    async def _handle_executor(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        hello = await read_frame(reader)
+        if not hello or hello.get('type') != 'hello':
+            writer.close()
+            return
+        account = int(hello['account'])
+        previous = self._links.get(account)
+        link = self._links[account] = _ExecutorLink(account, writer, self.window)
+        if previous is not None:
+            # A restarted executor replaces the old connection, its counters are kept.
+            link.published, link.acked, link.failed = previous.published, previous.acked, previous.failed
+            link.hop_total, link.hop_max = previous.hop_total, previous.hop_max
+        self._connected.setdefault(account, asyncio.Event()).set()
+        logger.info(f"✅ Executor of account {account} connected (pid {hello.get('pid')})")
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                if frame.get('type') == 'ack':
+                    pending = link.pending.get(frame['seq'])
+                    if pending is None:
+                        continue
+                    future, sent_at = pending
+                    link.acked += 1
+                    link.record(frame, sent_at, time.time())
+                    if not future.done():
+                        future.set_result(frame)
+        except (ConnectionError, OSError, ValueError) as e:
+            logger.error(f"❌ Executor link of account {account} failed: {e}")
+        finally:
+            if self._links.get(account) is link:
+                self._connected[account].clear()
+            for future, _ in link.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Executor of account {account} disconnected"))
+            writer.close()
+            logger.warning(f"⚠️ Executor of account {account} disconnected")
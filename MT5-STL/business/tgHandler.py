@@ -1,149 +1,233 @@
 from data.trade import Trade
 from data.tg_message import Message
 from data.tradeUpdate import TradeUpdate
+import asyncio
 import logging
 import re
-from typing import Dict, Any, Optional
-from telethon import TelegramClient, events
-from utility.utility_mt5 import open_trades_multi_account, update_trades_be_multi_account, close_trades_multi_account, update_trades_multi_account
-from utility.utility_tg import prefilter_message, extract_trade_data, create_trade_entries
+from typing import Dict, Any, List, Optional, Set
+from telethon import events
+from data.journal import SignalJournal
+from data.channelRoute import ChannelRoute
+from data.routeTable import RouteTable
+from business.signalQueue import SignalQueue, classify_message
+from business.tgSessionPool import TelegramSessionPool
+from business.entityCache import EntityCache
+from business.forwarder import BatchForwarder
+from business.editDebouncer import EditDebouncer
+from business.brokerWorker import BrokerWorker
+from business.tradeExecutor import LocalTradeExecutor
+from utility.utility_tg import prefilter_message, parse_message, create_trade_entries
 
 logger = logging.getLogger(__name__)
 
 class TelegramAnalyzer:
-    def __init__(self, config: Dict[str, Any],db_handler):
+    def __init__(self, config: Dict[str, Any],db_handler, journal: Optional[SignalJournal] = None, signal_queue: Optional[SignalQueue] = None, route_table: Optional[RouteTable] = None, entity_cache: Optional[EntityCache] = None, edit_window: float = 2.0, broker: Optional[BrokerWorker] = None, executor=None):
         """Initialize the Telegram handler."""
         self.config = config
         self.db_handler = db_handler
-        self.gold_dst_chat_id = -1002404066652
-        self.index_dst_chat_id = -1002535578509
-        # Telegram client setup
-        self.client = TelegramClient(
-            config["TG"]['SESSION'],
+        # Writes go through the journal when given, so handling a signal never waits on the database
+        self.writer = journal if journal is not None else db_handler
+        # The Telegram callbacks only classify the messages, they are processed by priority from this queue
+        self.signal_queue = signal_queue if signal_queue is not None else SignalQueue()
+        # Forward destination, parser and accounts of each source channel, by chat ID
+        self.route_table = route_table if route_table is not None else RouteTable(db_handler)
+        # Routes of the subscribed channels missing from the routing table, by chat ID
+        self._default_routes: Dict[int, ChannelRoute] = {}
+        # Telegram sessions setup, each session handles a shard of the source channels
+        self.sessions = TelegramSessionPool(
+            config["TG"]['SESSIONS'],
             config["TG"]['ID'],
             config["TG"]['HASH'],
-            timeout=10,
-            retry_delay=5,
-            request_retries=10
+            config["TG"]['PHONE'],
+            config["TG"]['CHANNELS'],
+            entity_cache
         )
 
+        # Forwards are submitted from the Telegram callbacks, so a burst of a channel is sent as one batch
+        self.forwarder = BatchForwarder(self.sessions)
+        # Forwarded IDs waiting for their batch, stored off the queue worker so a slow forward never holds a channel
+        self._forward_tasks: Set[asyncio.Task] = set()
+        # Channels edit a signal several times in a row, only the latest edit within the window is processed
+        self.edit_debouncer = EditDebouncer(self.dispatch_edit, edit_window)
+
+        # Every MetaTrader 5 call runs on the broker thread, the event loop only waits for the result
+        self.broker = broker if broker is not None else BrokerWorker()
+        # Runs the trade operations, on the broker thread or on the account executor processes (BusTradeExecutor)
+        self.executor = executor if executor is not None else LocalTradeExecutor(self.broker)
+
         # Register event handlers
-        self.client.on(events.NewMessage(chats=config["TG"]['CHANNELS']))(self.handle_new_message)
-        self.client.on(events.MessageEdited(chats=config["TG"]['CHANNELS']))(self.handle_edited_message)
+        self.sessions.on(events.NewMessage, self.handle_new_message)
+        self.sessions.on(events.MessageEdited, self.handle_edited_message)
 
     async def start(self) -> None:
-        """Start the Telegram client."""
-        await self.client.connect()
-        if not await self.client.is_user_authorized():
-            await self.client.send_code_request(self.config["TG"]['PHONE'])
-            await self.client.sign_in(self.config["TG"]['PHONE'], input("Enter the code: "))
-        logger.info("✅ Telegram client started!")
-        await self.client.run_until_disconnected()
+        """Start the Telegram sessions."""
+        self.signal_queue.start()
+        await self.sessions.run(preload=[route.dst_chat_id for route in self.route_table.routes.values()] + [self.config["TG"]["DST_CHANNEL"]])
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Process the pending edits and the queued signals, send the open forward batches, then disconnect."""
+        await self.edit_debouncer.drain()
+        await self.signal_queue.drain(timeout)
+        await self.forwarder.drain()
+        await asyncio.gather(*self._forward_tasks, return_exceptions=True)
+        await self.signal_queue.stop()
+        await self.sessions.disconnect()
 
     async def get_all_chats(self) -> None:
         """Retrieve and print all chats."""
-        dialogs = await self.client.get_dialogs()
+        dialogs = await self.sessions.sessions[0].client.get_dialogs()
         for dialog in dialogs:
             logger.info(f"Chat Name: {dialog.name}, Chat ID: {dialog.id}")
 
+    def get_route(self, chat_id: int) -> Optional[ChannelRoute]:
+        """Return the routing of an enabled source channel, None if the channel is not routed or disabled."""
+        route = self.route_table.get(chat_id)
+        if route is None and chat_id in self.config["TG"]["CHANNELS"]:
+            # Subscribed channels are routed to the default destination until they get a channel_route row
+            route = self.default_route(chat_id)
+        if route is None or not route.enabled:
+            logger.warning(f"⚠️ No enabled route for chat {chat_id}, message ignored")
+            return None
+        return route
+
+    def default_route(self, chat_id: int) -> ChannelRoute:
+        """Return the routing of a subscribed channel without a channel_route row, logged on its first message."""
+        if chat_id not in self._default_routes:
+            logger.warning(f"⚠️ No route for chat {chat_id}, forwarded to the default destination")
+            self._default_routes[chat_id] = ChannelRoute(chat_id=chat_id, dst_chat_id=self.config["TG"]["DST_CHANNEL"])
+        return self._default_routes[chat_id]
+
+    def get_route_config(self, route: ChannelRoute) -> Dict[str, Any]:
+        """Return the configuration restricted to the accounts trading the signals of a channel."""
+        if route.accounts is None:
+            return self.config
+        return {**self.config, "MT5": [mt5 for mt5 in self.config["MT5"] if route.allows(mt5["ACCOUNT"])]}
+
     async def handle_new_message(self, event: events.NewMessage.Event) -> None:
+        self.sessions.record(event.chat_id)
+        route = self.get_route(event.chat_id)
+        if route is None:
+            return
+        msg_raw_text = event.message.message
+        msg_parsed_text = parse_message(msg_raw_text, route.parser_profile) if prefilter_message(msg_raw_text) else None
+        forwarded = self.forwarder.submit(event.chat_id, route.dst_chat_id, event.message) if msg_parsed_text is not None else None
+        await self.signal_queue.put(event.chat_id, classify_message(msg_parsed_text), self.process_new_message, event, route, msg_parsed_text, forwarded, channel_priority=route.priority)
+
+    async def handle_edited_message(self, event: events.NewMessage.Event) -> None:
+        self.sessions.record(event.chat_id)
+        route = self.get_route(event.chat_id)
+        if route is None:
+            return
+        self.edit_debouncer.submit((event.chat_id, event.message.id), event, route)
+
+    async def dispatch_edit(self, event: events.NewMessage.Event, route: ChannelRoute) -> None:
+        self.forwarder.submit(event.chat_id, route.dst_chat_id, event.message)
+        await self.signal_queue.put(event.chat_id, classify_message(None, edited=True), self.process_edited_message, event, route, channel_priority=route.priority)
+
+    async def process_new_message(self, event: events.NewMessage.Event, route: ChannelRoute, msg_parsed_text: Optional[Dict[str, Any]], forwarded: Optional[asyncio.Future]) -> None:
         msg_raw_text = event.message.message
-        msg_src_chl_name = event.chat.title
+        msg_src_chl_name = route.name or getattr(event.chat, 'title', None) or str(event.chat_id)
         msg_reply_id = event.message.reply_to_msg_id if event.message.is_reply else None
-        msg_dst_id = self.config["TG"]["DST_CHANNEL_GOLD"] if msg_src_chl_name == "Pips Exchange (FX & Gold VIP)" else self.config["TG"]["DST_CHANNEL_INDEX"]
+        msg_dst_id = route.dst_chat_id
 
-        if not prefilter_message(msg_raw_text):
+        if msg_parsed_text is None:
             logger.error(f"❌ Invalid message: {msg_raw_text}")
             return
 
-        forwarded_message = await self.client.forward_messages(msg_dst_id, event.message)
-
         db_message = Message(
             tg_msg_id=event.message.id,
             tg_chat_id=event.chat_id,
             tg_src_chat_name=msg_src_chl_name,
-            tg_dst_msg_id=int(forwarded_message.id),
+            tg_dst_msg_id=None,
             tg_dst_chat_id=msg_dst_id,
             msg_body=msg_raw_text,
             msg_status="new",
             msg_timestamp=event.message.date
         )
 
-        msg_parsed_text = extract_trade_data(msg_raw_text)
         if msg_parsed_text['message_type'] == 'create':
-            self.create_new_signal_trade(msg_parsed_text, db_message)
+            await self.create_new_signal_trade(msg_parsed_text, db_message, self.get_route_config(route))
         elif msg_parsed_text['message_type'] == 'update':
             logger.info(f'📝 New trade signal to put the position in break even: {msg_parsed_text}')
-            if msg_reply_id:
-                replied_message = self.db_handler.get_message_by_id(msg_reply_id, event.chat_id)
-                trades_to_update = self.db_handler.get_trades_by_id(replied_message.msg_id)
-            else:
-                trades_to_update = self.db_handler.get_open_trades_based_on_src_tg_chat(tg_src_chat_name=msg_src_chl_name)
-            trade_update_response = self.update_signal_trade_be(trades_to_update, msg_parsed_text, msg_raw_text)
-            if trade_update_response:
-                self.db_handler.insert_trade_update(trade_update_response)
+            trades_to_update = await asyncio.to_thread(self.get_signal_trades, event.chat_id, msg_reply_id)
+            # The handler stores the trades and their BE updates itself
+            await self.update_signal_trade_be(trades_to_update, msg_parsed_text, msg_raw_text)
         elif msg_parsed_text['message_type']  == 'close':
-            if msg_reply_id:
-                replied_message = self.db_handler.get_message_by_id(msg_reply_id, event.chat_id)
-                trades_to_close = self.db_handler.get_trades_by_id(replied_message.msg_id)
-            else:
-                trades_to_close = self.db_handler.get_open_trades_based_on_src_tg_chat(tg_src_chat_name=msg_src_chl_name)
-            self.close_signal_trade(msg_parsed_text, msg_raw_text, trades_to_close)
-    async def handle_edited_message(self, event: events.NewMessage.Event) -> None:
+            trades_to_close = await asyncio.to_thread(self.get_signal_trades, event.chat_id, msg_reply_id)
+            await self.close_signal_trade(msg_parsed_text, msg_raw_text, trades_to_close)
+        if forwarded is not None:
+            task = asyncio.create_task(self.store_forwarded_id(db_message, forwarded))
+            self._forward_tasks.add(task)
+            task.add_done_callback(self._forward_tasks.discard)
+
+    def get_signal_trades(self, chat_id: int, reply_id: Optional[int]) -> List[Trade]:
+        """Return the trades of the replied signal, or the open trades of the latest signal of the chat without a reply."""
+        if reply_id:
+            replied_message = self.db_handler.get_message_by_id(reply_id, chat_id, Message.KEY_COLUMNS)
+            return self.db_handler.get_trades_by_id(replied_message.msg_id)
+        return self.db_handler.get_open_trades_of_latest_signal(chat_id)
+
+    async def store_forwarded_id(self, message: Message, forwarded: asyncio.Future) -> None:
+        """Record the ID of the forwarded copy on a stored message, once its forward batch is sent."""
+        forwarded_message = await forwarded
+        if forwarded_message is not None and message.msg_id is not None:
+            message.tg_dst_msg_id = int(forwarded_message.id)
+            self.writer.update_message(message)
+
+    async def process_edited_message(self, event: events.NewMessage.Event, route: ChannelRoute) -> None:
         msg_raw_edited_text = event.message.message
-        msg_src_chl_name = event.chat.title
-        msg_dst_id = self.config["TG"]["DST_CHANNEL_GOLD"] if msg_src_chl_name == "Pips Exchange (FX & Gold VIP)" else \
-        self.config["TG"]["DST_CHANNEL_INDEX"]
-
-        forwarded_message = await self.client.forward_messages(msg_dst_id, event.message)
-        existing_message = self.db_handler.get_message_by_id(event.message.id, event.chat_id)
+        existing_message = await asyncio.to_thread(self.db_handler.get_message_by_id, event.message.id, event.chat_id)
+        if existing_message is None:
+            # Not a stored signal, e.g. a message that was not a signal or sent before startup
+            logger.info(f"Edited message {event.message.id} of chat {event.chat_id} not stored, edit ignored")
+            return
 
-        msg_parsed_edited_text = extract_trade_data(msg_raw_edited_text)
+        msg_parsed_edited_text = parse_message(msg_raw_edited_text, route.parser_profile)
         if msg_parsed_edited_text['message_type'] == 'create':
-            existing_trades = self.db_handler.get_trades_by_id(existing_message.msg_id)
-            self.update_signal_trade(existing_trades, msg_parsed_edited_text, existing_message.msg_id, msg_raw_edited_text)
+            # The edit is compared with the stored version of the signal, not with the live levels of its trades
+            msg_parsed_previous_text = parse_message(existing_message.msg_body, route.parser_profile) if existing_message.msg_body else None
+            existing_trades = await asyncio.to_thread(self.db_handler.get_trades_by_id, existing_message.msg_id)
+            await self.update_signal_trade(existing_trades, msg_parsed_edited_text, existing_message.msg_id, msg_raw_edited_text, msg_parsed_previous_text)
             existing_message.msg_status = "updated"
             existing_message.msg_body = msg_raw_edited_text
-            self.db_handler.update_message(existing_message)
+            self.writer.update_message(existing_message)
 
-    def create_new_signal_trade(self, parsed_text, message):
+    async def create_new_signal_trade(self, parsed_text, message, config=None):
         logger.info(f'🆕 New trade signal to open a new position: {parsed_text}')
         try:
-            db_message_id = self.db_handler.insert_message(message)
-            trade_results = open_trades_multi_account(parsed_text, self.config, db_message_id)
+            db_message_id = self.writer.insert_message(message)
+            message.msg_id = db_message_id
+            trade_results = await self.executor.open_trades(parsed_text, config or self.config, db_message_id, message.tg_chat_id)
             if trade_results:
                 for trade in trade_results:
-                    self.db_handler.insert_trade(trade)
+                    trade.trade_id = self.writer.insert_trade(trade)
         except Exception as e:
             logger.error(f"❌ Error processing new trade signal: {e}")
 
-    def update_signal_trade_be(self, trades_to_update, parsed_text, text):
+    async def update_signal_trade_be(self, trades_to_update, parsed_text, text):
         try:
-            trades_updated, trade_update_results = update_trades_be_multi_account(trades_to_update, self.config, parsed_text, text)
+            trades_updated, trade_update_results = await self.executor.update_trades_be(trades_to_update, self.config, parsed_text, text)
             if trades_updated:
-                for trade in trades_updated:
-                    self.db_handler.update_trade(trade)
-            self.db_handler.insert_trade_update(trade_update_results)
+                self.writer.update_trades(trades_updated)
+            self.writer.insert_trade_update(trade_update_results)
         except Exception as e:
             logger.error(f"❌ Error updating trade to break even: {e}")
 
-    def close_signal_trade(self, parsed_text, text, trades_to_close):
+    async def close_signal_trade(self, parsed_text, text, trades_to_close):
         logger.info(f'❎ New trade signal to close the position: {parsed_text}')
         try:
-            trades_closed, trade_update_results = close_trades_multi_account(trades_to_close, self.config, text)
+            trades_closed, trade_update_results = await self.executor.close_trades(trades_to_close, self.config, text)
             if trades_closed:
-                for trade in trades_closed:
-                    self.db_handler.update_trade(trade)
-            self.db_handler.insert_trade_update(trade_update_results)
+                self.writer.update_trades(trades_closed)
+            self.writer.insert_trade_update(trade_update_results)
         except Exception as e:
             logger.error(f"❌ Error processing trade close signal: {e}")
 
-    def update_signal_trade(self, existing_trades, parsed_text, db_message_id, text):
+    async def update_signal_trade(self, existing_trades, parsed_text, db_message_id, text, previous_parsed_text=None):
         try:
-            trades_updated, trade_update_results = update_trades_multi_account(existing_trades, self.config, parsed_text, db_message_id, text)
+            trades_updated, trade_update_results = await self.executor.update_trades(existing_trades, self.config, parsed_text, db_message_id, text, previous_parsed_text)
             if trades_updated:
-                for trade in trades_updated:
-                    self.db_handler.update_trade(trade)
-            self.db_handler.insert_trade_update(trade_update_results)
+                self.writer.update_trades(trades_updated)
+            self.writer.insert_trade_update(trade_update_results)
         except Exception as e:
             logger.error(f"❌ Error updating signal trade: {e}")
\ No newline at end of file
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from telethon import TelegramClient, errors
+from business.entityCache import EntityCache
+
+logger = logging.getLogger(__name__)
+
+
+def assign_channels(channels: Sequence[int], n_sessions: int) -> List[List[int]]:
+    """
+    Split the source channels between the sessions.
+
+    The assignment only depends on the chat ID, so it is the same on every restart and adding a
+    channel does not move the others to another session.
+
+    Args:
+        channels (Sequence[int]): The chat IDs of the source channels.
+        n_sessions (int): The number of sessions.
+
+    Returns:
+        List[List[int]]: The channels owned by each session, in session order.
+    """
+    shards = [[] for _ in range(n_sessions)]
+    for channel in channels:
+        shards[zlib.crc32(str(channel).encode()) % n_sessions].append(channel)
+    return shards
+
+
+class TelegramSession:
+    def __init__(self, name: str, api_id: Any, api_hash: str, channels: List[int]) -> None:
+        """
+        Initialize a Telethon session and the counters of its shard of channels.
+
+        Args:
+            name (str): The session name, also the name of the Telethon session file.
+            api_id (Any): The Telegram API ID.
+            api_hash (str): The Telegram API hash.
+            channels (List[int]): The chat IDs of the channels handled by the session.
+        """
+        self.name = name
+        self.channels = channels
+        self.client = TelegramClient(name, api_id, api_hash, timeout=10, retry_delay=5, request_retries=10)
+        self.started_at = time.monotonic()
+        self.last_message_at = None
+        self.received = 0
+        self.forwarded = 0
+        self.flood_waits = 0
+        self.errors = 0
+        self.restarts = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the health and throughput counters of the session."""
+        uptime = time.monotonic() - self.started_at
+        return {
+            'connected': self.client.is_connected(),
+            'channels': len(self.channels),
+            'received': self.received,
+            'forwarded': self.forwarded,
+            'received_per_minute': self.received * 60 / uptime if uptime else 0.0,
+            'seconds_since_last_message': time.monotonic() - self.last_message_at if self.last_message_at else None,
+            'flood_waits': self.flood_waits,
+            'errors': self.errors,
+            'restarts': self.restarts,
+        }
+
+
+class TelegramSessionPool:
+    def __init__(self, sessions: Sequence[str], api_id: Any, api_hash: str, phone: str, channels: Sequence[int],
+                 entity_cache: Optional[EntityCache] = None) -> None:
+        """
+        Initialize the pool of Telethon sessions sharing the source channels.
+
+        Each session owns a shard of the channels (see assign_channels) and runs its own connection, so a
+        flood wait or a disconnection only stalls the channels of that session. Every session file must be
+        authorized once for the account phone number.
+
+        Args:
+            sessions (Sequence[str]): The session names.
+            api_id (Any): The Telegram API ID.
+            api_hash (str): The Telegram API hash.
+            phone (str): The phone number of the Telegram account, used to authorize new sessions.
+            channels (Sequence[int]): The chat IDs of all the source channels.
+            entity_cache (Optional[EntityCache]): The input peers shared by the sessions, kept in memory by default.
+        """
+        self.phone = phone
+        self.entities = entity_cache if entity_cache is not None else EntityCache()
+        self._preload: List[int] = []
+        shards = assign_channels(channels, len(sessions))
+        self.sessions = [
+            TelegramSession(name, api_id, api_hash, shard) for name, shard in zip(sessions, shards) if shard
+        ]
+        self._by_channel = {channel: session for session in self.sessions for channel in session.channels}
+        for name, shard in zip(sessions, shards):
+            if not shard:
+                logger.warning(f"⚠️ Telegram session {name} has no channel assigned, it is not started")
+
+    def on(self, event_type: Callable[..., Any], handler: Callable[..., Any]) -> None:
+        """
+        Register an event handler on every session, filtered on the channels of the session.
+
+        Args:
+            event_type (Callable[..., Any]): The Telethon event builder, e.g. events.NewMessage.
+            handler (Callable[..., Any]): The coroutine function handling the events.
+        """
+        for session in self.sessions:
+            session.client.on(event_type(chats=session.channels))(handler)
+
+    def session_for(self, chat_id: int) -> TelegramSession:
+        """Return the session owning a channel, the first session for any other chat."""
+        return self._by_channel.get(chat_id, self.sessions[0])
+
+    def record(self, chat_id: int) -> None:
+        """Count a message received from a channel."""
+        session = self.session_for(chat_id)
+        session.received += 1
+        session.last_message_at = time.monotonic()
+
+    async def forward(self, chat_id: int, destination: int, message: Any) -> Any:
+        """
+        Forward a message with the session owning its source channel.
+
+        Args:
+            chat_id (int): The chat ID the message comes from.
+            destination (int): The chat ID the message is forwarded to.
+            message (Any): The Telethon message, or a list of messages of the source chat.
+
+        Returns:
+            Any: The forwarded message, or the list of forwarded messages in the same order.
+
+        Raises:
+            Exception: If the forward fails, including flood waits longer than the Telethon threshold.
+        """
+        session = self.session_for(chat_id)
+        try:
+            peer = await self.entities.get_input_peer(session.client, destination)
+            forwarded = await session.client.forward_messages(peer, message)
+            session.forwarded += len(message) if isinstance(message, list) else 1
+            return forwarded
+        except errors.FloodWaitError as e:
+            session.flood_waits += 1
+            logger.warning(f"⚠️ Flood wait of {e.seconds}s on Telegram session {session.name}")
+            raise
+        except Exception:
+            session.errors += 1
+            raise
+
+    async def get_input_peer(self, chat_id: int) -> Any:
+        """Return the cached input peer of a chat, resolved with the session owning it on a cache miss."""
+        return await self.entities.get_input_peer(self.session_for(chat_id).client, chat_id)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Return the metrics of every session, by session name."""
+        return {session.name: session.metrics() for session in self.sessions}
+
+    async def run(self, preload: Iterable[int] = ()) -> None:
+        """
+        Connect every session and keep them connected, each one is restarted on its own.
+
+        Args:
+            preload (Iterable[int]): Chat IDs resolved into the entity cache on connection, on top of the
+                source channels of each session, e.g. the forward destinations.
+        """
+        self._preload = list(preload)
+        await asyncio.gather(*(self._run_session(session) for session in self.sessions))
+
+    async def disconnect(self) -> None:
+        """Disconnect every session, the entity cache is saved first."""
+        self.entities.save()
+        await asyncio.gather(*(session.client.disconnect() for session in self.sessions), return_exceptions=True)
+
+    async def _run_session(self, session: TelegramSession) -> None:
+        while True:
+            try:
+                await session.client.connect()
+                if not await session.client.is_user_authorized():
+                    await session.client.send_code_request(self.phone)
+                    await session.client.sign_in(self.phone, input(f"Enter the code for session {session.name}: "))
+                await self.entities.preload(session.client, [*session.channels, *self._preload])
+                logger.info(f"✅ Telegram session {session.name} started with {len(session.channels)} channels!")
+                await session.client.run_until_disconnected()
+            except (ConnectionError, asyncio.TimeoutError, OSError) as e:
+                session.errors += 1
+                logger.warning(f"❌ Telegram session {session.name} connection error: {e}, restarting in 5 seconds...")
+            session.restarts += 1
+            await asyncio.sleep(5)
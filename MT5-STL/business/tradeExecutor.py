@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+from data.trade import Trade
+from data.tradeUpdate import TradeUpdate
+from business.brokerWorker import BrokerWorker
+from business.signalBus import SignalBus
+from business.riskEngine import RiskEngine
+from business.positionSizer import PositionSizer
+from business.tpLadder import TpLadder
+from utility.utility_mt5 import (open_trades_multi_account, update_trades_multi_account, update_trades_be_multi_account,
+                                 close_trades_multi_account, verify_open_trades_or_be, seed_risk_multi_account)
+
+logger = logging.getLogger(__name__)
+
+
+class LocalTradeExecutor:
+    def __init__(self, broker: BrokerWorker, risk_engine: Optional[RiskEngine] = None, sizer: Optional[PositionSizer] = None,
+                 ladder: Optional[TpLadder] = None) -> None:
+        """
+        Initialize the executor running the trade operations in this process.
+
+        Each operation logs in to every account of the configuration in turn, on the broker thread.
+
+        Args:
+            broker (BrokerWorker): The worker running the MetaTrader 5 calls.
+            risk_engine (Optional[RiskEngine]): The pre-trade checks of the accounts, None to disable them.
+            sizer (Optional[PositionSizer]): The risk based sizing of the accounts, None for the configured lot sizes.
+            ladder (Optional[TpLadder]): The take profit ladder of the accounts, None to open one position per take profit.
+        """
+        self.broker = broker
+        self.risk_engine = risk_engine
+        self.sizer = sizer
+        self.ladder = ladder
+
+    async def seed(self, config: Dict[str, Any]) -> None:
+        """Load the exposure of the accounts into the risk engine, once at startup."""
+        if self.risk_engine is not None:
+            await self.broker.call(seed_risk_multi_account, config, self.risk_engine)
+
+    async def open_trades(self, parsed_text: Dict[str, Any], config: Dict[str, Any], db_message_id: int,
+                          tg_src_chat_id: Optional[int] = None) -> List[Trade]:
+        return await self.broker.call(open_trades_multi_account, parsed_text, config, db_message_id, tg_src_chat_id, self.risk_engine, self.sizer, self.ladder)
+
+    async def update_trades(self, trades: List[Trade], config: Dict[str, Any], parsed_text: Dict[str, Any],
+                            db_message_id: int, text: str,
+                            previous_parsed_text: Optional[Dict[str, Any]] = None) -> Tuple[List[Trade], List[TradeUpdate]]:
+        return await self.broker.call(update_trades_multi_account, trades, config, parsed_text, db_message_id, text, self.risk_engine, self.ladder, previous_parsed_text)
+
+    async def update_trades_be(self, trades: List[Trade], config: Dict[str, Any], parsed_text: Dict[str, Any],
+                               text: str) -> Tuple[List[Trade], List[TradeUpdate]]:
+        return await self.broker.call(update_trades_be_multi_account, trades, config, parsed_text, text, self.risk_engine)
+
+    async def close_trades(self, trades: List[Trade], config: Dict[str, Any], text: str) -> Tuple[List[Trade], List[TradeUpdate]]:
+        return await self.broker.call(close_trades_multi_account, trades, config, text, self.risk_engine)
+
+    async def reconcile(self, config: Dict[str, Any], db: Any, writer: Any, trade_feed: Any) -> None:
+        await self.broker.call(verify_open_trades_or_be, config, db, writer, trade_feed, self.risk_engine)
+
+
+class BusTradeExecutor:
+    def __init__(self, bus: SignalBus) -> None:
+        """
+        Initialize the executor publishing the trade operations to the account executor processes.
+
+        An operation is published to the executors of all the accounts of the configuration at once, so
+        the accounts trade in parallel. The trades returned by the executors are copied onto the trades
+        of this process, which keep tracking the columns changed since they were stored.
+
+        Args:
+            bus (SignalBus): The signal bus the account executors are connected to.
+        """
+        self.bus = bus
+
+    async def seed(self, config: Dict[str, Any]) -> None:
+        """The executors seed their own risk engine when they log in."""
+
+    async def open_trades(self, parsed_text: Dict[str, Any], config: Dict[str, Any], db_message_id: int,
+                          tg_src_chat_id: Optional[int] = None) -> List[Trade]:
+        payload = {'parsed_text': parsed_text, 'db_message_id': db_message_id, 'tg_src_chat_id': tg_src_chat_id}
+        results = await self._publish_all(config, 'open', lambda mt5: payload)
+        return [Trade(**record) for records in results for record in records]
+
+    async def update_trades(self, trades: List[Trade], config: Dict[str, Any], parsed_text: Dict[str, Any],
+                            db_message_id: int, text: str,
+                            previous_parsed_text: Optional[Dict[str, Any]] = None) -> Tuple[List[Trade], List[TradeUpdate]]:
+        return await self._modify(trades, config, 'update', {'parsed_text': parsed_text, 'db_message_id': db_message_id, 'text': text,
+                                                             'previous_parsed_text': previous_parsed_text})
+
+    async def update_trades_be(self, trades: List[Trade], config: Dict[str, Any], parsed_text: Dict[str, Any],
+                               text: str) -> Tuple[List[Trade], List[TradeUpdate]]:
+        return await self._modify(trades, config, 'be', {'parsed_text': parsed_text, 'text': text})
+
+    async def close_trades(self, trades: List[Trade], config: Dict[str, Any], text: str) -> Tuple[List[Trade], List[TradeUpdate]]:
+        return await self._modify(trades, config, 'close', {'text': text})
+
+    async def reconcile(self, config: Dict[str, Any], db: Any, writer: Any, trade_feed: Any) -> None:
+        open_trades = {}
+        for mt5 in config["MT5"]:
+            # The change feed keeps the open trades in memory, the database is only queried without it
+            if trade_feed:
+                open_trades[mt5["ACCOUNT"]] = trade_feed.get_open_trades(mt5["ACCOUNT"])
+            else:
+                open_trades[mt5["ACCOUNT"]] = await asyncio.to_thread(db.get_all_trades, mt5["ACCOUNT"])
+        config = {**config, "MT5": [mt5 for mt5 in config["MT5"] if open_trades[mt5["ACCOUNT"]]]}
+        if not config["MT5"]:
+            return
+        results = await self._publish_all(config, 'reconcile', lambda mt5: {
+            'trades': {msg_id: [asdict(trade) for trade in trades] for msg_id, trades in open_trades[mt5["ACCOUNT"]].items()}
+        })
+        local = [trade for trades_by_msg in open_trades.values() for trades in trades_by_msg.values() for trade in trades]
+        trades_to_update = self._merge(local, [record for records in results for record in records])
+        # Unchanged trades are skipped, the others are written with one statement
+        (writer or db).update_trades(trades_to_update)
+        if trade_feed:
+            # The view does not wait for the notification of the journaled writes
+            trade_feed.apply_trades(trades_to_update)
+
+    async def _modify(self, trades: List[Trade], config: Dict[str, Any], op: str,
+                      payload: Dict[str, Any]) -> Tuple[List[Trade], List[TradeUpdate]]:
+        # Only the accounts holding some of the trades are involved
+        accounts = {trade.account_id for trade in trades}
+        config = {**config, "MT5": [mt5 for mt5 in config["MT5"] if mt5["ACCOUNT"] in accounts]}
+        results = await self._publish_all(config, op, lambda mt5: {
+            **payload, 'trades': [asdict(trade) for trade in trades if trade.account_id == mt5["ACCOUNT"]]
+        })
+        trades_modified = self._merge(trades, [record for result in results for record in result['trades']])
+        trade_updates = [TradeUpdate(**record) for result in results for record in result['updates']]
+        return trades_modified, trade_updates
+
+    async def _publish_all(self, config: Dict[str, Any], op: str, payload_for) -> List[Any]:
+        accounts = config["MT5"]
+        results = await asyncio.gather(
+            *(self.bus.publish(mt5["ACCOUNT"], op, payload_for(mt5)) for mt5 in accounts), return_exceptions=True
+        )
+        succeeded = []
+        for mt5, result in zip(accounts, results):
+            if isinstance(result, BaseException):
+                logger.error(f"❌ {op} not executed on account {mt5['ACCOUNT']}: {result}")
+            else:
+                succeeded.append(result)
+        return succeeded
+
+    @staticmethod
+    def _merge(trades: List[Trade], records: List[Dict[str, Any]]) -> List[Trade]:
+        by_order = {(trade.account_id, trade.order_id): trade for trade in trades}
+        merged = []
+        for record in records:
+            trade = by_order.get((record['account_id'], record['order_id']))
+            if trade is None:
+                continue
+            for column in Trade.UPDATE_COLUMNS:
+                setattr(trade, column, record[column])
+            merged.append(trade)
+        return merged
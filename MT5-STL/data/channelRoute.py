@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from typing import ClassVar, Tuple
+from data.record import Record
+
+
+@dataclass(slots=True)
+class ChannelRoute(Record):
+    chat_id: int
+    dst_chat_id: int
+    name: str = None
+    parser_profile: str = 'default'
+    # Accounts trading the signals of the channel, None for every account.
+    accounts: list = None
+    priority: int = 0
+    enabled: bool = True
+
+    TABLE: ClassVar[str] = 'channel_route'
+    COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'chat_id', 'name', 'dst_chat_id', 'parser_profile', 'accounts', 'priority', 'enabled'
+    )
+    UPDATE_COLUMNS: ClassVar[Tuple[str, ...]] = (
+        'name', 'dst_chat_id', 'parser_profile', 'accounts', 'priority', 'enabled'
+    )
+
+    def __post_init__(self):
+        if isinstance(self.accounts, str):
+            self.accounts = [int(account) for account in self.accounts.split(",")] if self.accounts else None
+        # SQLite stores booleans as integers
+        self.enabled = bool(self.enabled)
+
+    def allows(self, account_id) -> bool:
+        """Return whether an account trades the signals of the channel."""
+        return self.accounts is None or int(account_id) in self.accounts
@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import fields
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Type
+from data.record import Record
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    # NUMERIC columns are read as Decimal
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class ConfigCache:
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Initialize the cache of the configuration rows last read from the database.
+
+        The accounts and the channel routes are written to the cache every time they are loaded, so the
+        application can start on the last known configuration while the database is down. The writes
+        are not lost meanwhile, they wait in the signal journal.
+
+        Args:
+            path (Optional[str]): The JSON file the cache is persisted to, None to keep it in memory.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = self._read()
+
+    def load(self, key: str, model: Type[Record], loader: Callable[[], Optional[List[Record]]]) -> Optional[List[Record]]:
+        """
+        Load records from the database and cache them, or return the cached ones if the database fails.
+
+        Args:
+            key (str): The name of the cache entry.
+            model (Type[Record]): The model of the records.
+            loader (Callable[[], Optional[List[Record]]]): Reads the records from the database.
+
+        Returns:
+            Optional[List[Record]]: The records, None if the loader found none.
+
+        Raises:
+            Exception: The error of the loader, when nothing is cached under the key.
+        """
+        try:
+            records = loader()
+        except Exception as e:
+            cached = self.get(key, model)
+            if cached is None:
+                raise e
+            logger.warning(f"⚠️ Database not available, using the cached {key} configuration: {e}")
+            return cached
+        if records is not None:
+            self.store(key, records)
+        return records
+
+    def get(self, key: str, model: Type[Record]) -> Optional[List[Record]]:
+        """Return the records cached under a key, None if nothing is cached."""
+        rows = self._entries.get(key)
+        return [model(**row) for row in rows] if rows is not None else None
+
+    def store(self, key: str, records: List[Record]) -> None:
+        """Replace the records cached under a key and persist the cache."""
+        with self._lock:
+            self._entries[key] = [{field.name: getattr(record, field.name) for field in fields(record)} for record in records]
+        self.save()
+
+    def save(self) -> None:
+        """Write the cache to its file, replaced atomically."""
+        if self.path is None:
+            return
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(self._entries, file, default=_json_default)
+            os.replace(tmp_path, self.path)
+
+    def _read(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Configuration cache {self.path} could not be read, starting empty: {e}")
+            return {}
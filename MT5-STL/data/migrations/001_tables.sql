@@ -23,7 +23,7 @@ CREATE TABLE IF NOT EXISTS trade (
     break_even DOUBLE PRECISION,
     volume DOUBLE PRECISION,
     status TEXT DEFAULT 'open',
-    FOREIGN KEY (msg_id) REFERENCES tg_message(msg_id),
+    FOREIGN KEY (msg_id) REFERENCES tg_message(msg_id)
 );
 ---
 CREATE TABLE IF NOT EXISTS tradeUpdate (
@@ -32,7 +32,7 @@ CREATE TABLE IF NOT EXISTS tradeUpdate (
     order_id INTEGER,
     account_id INTEGER,
     update_action TEXT,
-    update_body TEXT
+    update_body TEXT,
     FOREIGN KEY (trade_id) REFERENCES trade(trade_id)
 );
 ---
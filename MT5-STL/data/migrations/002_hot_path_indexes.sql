@@ -0,0 +1,12 @@
+-- get_trades_by_id
+CREATE INDEX IF NOT EXISTS idx_trade_msg_id ON trade (msg_id);
+---
+-- get_all_trades and the reconciliation loop only ever look at open trades of one account
+CREATE INDEX IF NOT EXISTS idx_trade_open_account_id ON trade (account_id) WHERE status = 'open';
+---
+CREATE INDEX IF NOT EXISTS idx_trade_status_account_id ON trade (status, account_id);
+---
+-- get_message_by_id
+CREATE INDEX IF NOT EXISTS idx_tg_message_tg_msg_id_tg_chat_id ON tg_message (tg_msg_id, tg_chat_id);
+---
+CREATE INDEX IF NOT EXISTS idx_tradeupdate_trade_id ON tradeupdate (trade_id);
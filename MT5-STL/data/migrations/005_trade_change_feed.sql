@@ -0,0 +1,28 @@
+-- Change feed of the trades: trade rows and trade updates are published on the 'trade_changes'
+-- channel as compact JSON payloads, consumed by TradeFeed to keep its view of open trades current.
+-- The table name is passed as an argument: TG_TABLE_NAME is the partition name on tradeupdate.
+CREATE OR REPLACE FUNCTION notify_trade_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('trade_changes', jsonb_build_object(
+        'op', TG_OP,
+        'table', TG_ARGV[0],
+        'row', to_jsonb(COALESCE(NEW, OLD)) - 'update_body'
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+---
+DROP TRIGGER IF EXISTS trade_inserted_or_deleted ON trade;
+---
+CREATE TRIGGER trade_inserted_or_deleted AFTER INSERT OR DELETE ON trade
+    FOR EACH ROW EXECUTE FUNCTION notify_trade_change('trade');
+---
+DROP TRIGGER IF EXISTS trade_updated ON trade;
+---
+CREATE TRIGGER trade_updated AFTER UPDATE ON trade
+    FOR EACH ROW WHEN (OLD IS DISTINCT FROM NEW) EXECUTE FUNCTION notify_trade_change('trade');
+---
+DROP TRIGGER IF EXISTS tradeupdate_inserted ON tradeupdate;
+---
+CREATE TRIGGER tradeupdate_inserted AFTER INSERT ON tradeupdate
+    FOR EACH ROW EXECUTE FUNCTION notify_trade_change('tradeupdate');
@@ -0,0 +1,79 @@
+from dataclasses import fields
+from typing import Any, ClassVar, Dict, Optional, Sequence, Tuple
+
+
+class Record:
+    """
+    Base class for the database models.
+
+    Subclasses are slotted dataclasses that declare the table columns they map to, so rows can be
+    turned into instances (and instances back into column/value pairs) without positional indexing.
+    Instances keep the values last read from or written to the database, so updates only send the
+    columns that changed.
+    """
+    # Values of UPDATE_COLUMNS as stored in the database, see mark_clean().
+    __slots__ = ('_clean',)
+
+    # Table backing the model.
+    TABLE: ClassVar[str] = ''
+    # Columns of the table, in the order returned by the model queries.
+    COLUMNS: ClassVar[Tuple[str, ...]] = ()
+    # Columns written back by the dynamic UPDATE statements (primary key excluded).
+    UPDATE_COLUMNS: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def from_record(cls, record: Sequence, columns: Optional[Sequence[str]] = None):
+        """
+        Build an instance from a database row.
+
+        Values are matched to fields by column name, so a query can project only the columns it
+        needs: fields missing from the row are left to None.
+
+        Args:
+            record (Sequence): The row returned by the cursor.
+            columns (Optional[Sequence[str]]): Column names of the row, defaults to COLUMNS.
+
+        Returns:
+            Record: A new instance of the model.
+        """
+        values = dict.fromkeys(field.name for field in fields(cls))
+        values.update(zip(columns or cls.COLUMNS, record))
+        instance = cls(**values)
+        instance.mark_clean()
+        return instance
+
+    @classmethod
+    def select_list(cls, columns: Optional[Sequence[str]] = None, alias: Optional[str] = None) -> str:
+        """
+        Build the projection of a SELECT statement for the model.
+
+        Args:
+            columns (Optional[Sequence[str]]): Columns to project, defaults to COLUMNS.
+            alias (Optional[str]): Table alias used to qualify the columns.
+
+        Returns:
+            str: The comma separated column list.
+        """
+        prefix = f"{alias}." if alias else ""
+        return ", ".join(f"{prefix}{column}" for column in columns or cls.COLUMNS)
+
+    def to_dict(self):
+        return {column: getattr(self, column) for column in self.UPDATE_COLUMNS}
+
+    def mark_clean(self) -> None:
+        """Remember the current values of UPDATE_COLUMNS as the ones stored in the database."""
+        self._clean = tuple(getattr(self, column) for column in self.UPDATE_COLUMNS)
+
+    def changes(self) -> Dict[str, Any]:
+        """
+        Return the UPDATE_COLUMNS modified since the instance was loaded or last saved.
+
+        Returns:
+            Dict[str, Any]: The modified columns with their new value. Every column is reported for an
+                instance that was never loaded from (or saved to) the database.
+        """
+        clean = getattr(self, '_clean', None)
+        current = {column: getattr(self, column) for column in self.UPDATE_COLUMNS}
+        if clean is None:
+            return current
+        return {column: value for (column, value), old in zip(current.items(), clean) if value != old}
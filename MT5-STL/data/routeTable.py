@@ -0,0 +1,100 @@
+import logging
+import select
+import threading
+from types import MappingProxyType
+from typing import Mapping, Optional
+from data.dbHandler import dbHandler
+from data.channelRoute import ChannelRoute
+from data.configCache import ConfigCache
+
+logger = logging.getLogger(__name__)
+
+ROUTE_CHANNEL = 'channel_route'
+
+
+class RouteTable:
+    def __init__(self, db_handler: dbHandler, poll_interval: float = 30.0, cache: Optional[ConfigCache] = None) -> None:
+        """
+        Initialize the routing table of the source channels and load it.
+
+        The table is reloaded on the 'channel_route' notifications sent on every change of the
+        channel_route table, and every poll interval in case a notification was missed.
+
+        Args:
+            db_handler (dbHandler): The database handler used to load the routes.
+            poll_interval (float): Seconds between two reloads when no notification arrives.
+            cache (Optional[ConfigCache]): Keeps the last loaded routes, used when the database is down at startup.
+        """
+        self.db_handler = db_handler
+        self.poll_interval = poll_interval
+        self.cache = cache
+        try:
+            self._routes = self._load_at_startup()
+        except Exception as e:
+            # The listener reloads the routes once the database is reachable
+            logger.error(f"❌ Error loading the channel routes: {e}, subscribed channels use the default route meanwhile")
+            self._routes = MappingProxyType({})
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def routes(self) -> Mapping[int, ChannelRoute]:
+        """The current routes by source chat ID, replaced as a whole on every reload."""
+        return self._routes
+
+    def get(self, chat_id: int) -> Optional[ChannelRoute]:
+        """Return the routing of a source channel, or None if the channel is not routed."""
+        return self._routes.get(chat_id)
+
+    def refresh(self) -> Mapping[int, ChannelRoute]:
+        """Reload the routes from the database and swap the table."""
+        self._routes = self._load()
+        logger.info(f"✅ Channel routes reloaded, {len(self._routes)} channels")
+        return self._routes
+
+    def start(self) -> None:
+        """Start the background thread that reloads the routes on changes."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._listen, name="route-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background reload thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval)
+
+    def _load(self) -> Mapping[int, ChannelRoute]:
+        routes = self.db_handler.get_channel_routes()
+        if self.cache is not None:
+            self.cache.store(ROUTE_CHANNEL, routes)
+        return MappingProxyType({route.chat_id: route for route in routes})
+
+    def _load_at_startup(self) -> Mapping[int, ChannelRoute]:
+        if self.cache is None:
+            return self._load()
+        routes = self.cache.load(ROUTE_CHANNEL, ChannelRoute, self.db_handler.get_channel_routes)
+        return MappingProxyType({route.chat_id: route for route in routes})
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self.db_handler.listen(ROUTE_CHANNEL)
+                # Changes made while the listener was down are caught by this reload.
+                self.refresh()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        self._routes = self._load()
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        conn.notifies.clear()
+                        self.refresh()
+            except Exception as e:
+                logger.error(f"❌ Error listening for channel route changes: {e}, retrying in 5 seconds...")
+                self._stop.wait(5)
+            finally:
+                if conn is not None:
+                    conn.close()
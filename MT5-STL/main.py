@@ -1,11 +1,26 @@
 import logging
 from business.mt5Handler import MetatraderHandler
 from data.dbHandler import dbHandler
+from data.journal import SignalJournal, JournalReplayer
+from data.archiver import HistoryArchiver
+from data.tradeFeed import TradeFeed
+from data.routeTable import RouteTable
+from data.configCache import ConfigCache
+from data.account import Account
 import asyncio
-import threading
 from business.tgHandler import TelegramAnalyzer
+from business.entityCache import EntityCache
+from business.brokerWorker import BrokerWorker
+from business.supervisor import TaskSupervisor
+from business.signalBus import SignalBus
+from business.accountExecutor import ExecutorProcessPool
+from business.tradeExecutor import LocalTradeExecutor, BusTradeExecutor
+from business.riskEngine import RiskEngine
+from business.positionSizer import PositionSizer
+from business.drawdownMonitor import DrawdownMonitor, rules_for_broker
+from business.tpLadder import TpLadder
+from utility.utility_mt5 import monitor_drawdown_multi_account, watch_tp_ladder_multi_account
 from utility.utillty_config import read_env_file, get_sw_configuration_by_account
-from utility.utility_mt5 import verify_open_trades_or_be
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SmartTradeAnalyzer")
 logger.setLevel(logging.INFO)
@@ -17,41 +32,108 @@ formatter = logging.Formatter(
 console_handler.setFormatter(formatter)
 logger.addHandler(console_handler)
 
-env_dict = read_env_file('utility/config.env')
-db = dbHandler(env_dict)
+def prepare_database(db: dbHandler) -> bool:
+    """Apply the pending migrations and check the schema, False if the database is not reachable."""
+    if not db.is_available():
+        logger.warning("⚠️ Database not available, starting on the cached configuration, writes wait in the journal")
+        return False
+    db.migrate()
+    db.verify_schema()
+    db.check_hot_query_plans()
+    return True
 
 async def main():
-    accounts = db.get_software_accounts_based_on_env(env_dict['ENV'].lower())
+    # Set up here rather than at import time, the executor processes are spawned and import this module
+    env_dict = read_env_file('utility/config.env')
+    db = dbHandler(env_dict)
+    prepare_database(db)
+    config_cache = ConfigCache(env_dict['CONFIG_CACHE_PATH'])
+    journal = SignalJournal(env_dict['JOURNAL_PATH'])
+    journal_replayer = JournalReplayer(journal, db)
+
+    accounts = config_cache.load('account', Account, lambda: db.get_software_accounts_based_on_env(env_dict['ENV'].lower()))
     account_config = get_sw_configuration_by_account(accounts)
     account_config.update(env_dict)
-    analyzer = TelegramAnalyzer(config=account_config, db_handler=db)
+    for mt5 in account_config["MT5"]:
+        mt5["TERMINAL_PATH"] = env_dict['MT5_TERMINAL_PATHS'].get(mt5["ACCOUNT"])
+        mt5["RISK_LIMITS"] = env_dict['RISK_LIMITS']
+        mt5["RISK_PERCENT"] = env_dict['RISK_PER_TRADE_PERCENT']
+        mt5["DRAWDOWN_RULES"] = rules_for_broker(mt5["BROKER"], env_dict['DRAWDOWN'])
+        mt5["DRAWDOWN_INTERVAL"] = env_dict['DRAWDOWN']['INTERVAL']
+        mt5["TP_MODE"] = env_dict['TP_MODE']
+        mt5["TP_LADDER_PATH"] = env_dict['TP_LADDER_PATH']
+        mt5["TP_LADDER_INTERVAL"] = env_dict['TP_LADDER_INTERVAL']
+    broker = BrokerWorker()
+    supervisor = TaskSupervisor()
+    if env_dict['EXECUTION_MODE'] == 'process':
+        # One ingest process, this one, and one executor process per account logged in once to its own terminal
+        signal_bus = SignalBus(env_dict['BUS_ADDRESS'], window=env_dict['BUS_WINDOW'])
+        executors = ExecutorProcessPool(account_config["MT5"], env_dict['BUS_ADDRESS'])
+        supervisor.add("signal-bus", signal_bus.serve)
+        supervisor.add("executors", executors.watch)
+        trade_executor = BusTradeExecutor(signal_bus)
+    else:
+        risk_engine = RiskEngine(default_limits=env_dict['RISK_LIMITS'])
+        ladder = TpLadder(env_dict['TP_LADDER_PATH'], risk_engine) if env_dict['TP_MODE'] == 'ladder' else None
+        trade_executor = LocalTradeExecutor(broker, risk_engine, PositionSizer(risk_percent=env_dict['RISK_PER_TRADE_PERCENT']), ladder)
+        drawdown_monitor = DrawdownMonitor(risk_engine)
 
-    async def run_analyzer():
-        while True:
-            try:
-                await analyzer.start()
-            except (ConnectionError, asyncio.TimeoutError, OSError) as e:
-                logger.warning(f"❌ Connection error: {e}, restarting in 5 seconds...")
-                await asyncio.sleep(5)
+        async def watch_drawdown():
+            # The executor processes watch their own account in process mode
+            while True:
+                await broker.call(monitor_drawdown_multi_account, account_config, drawdown_monitor)
+                await asyncio.sleep(env_dict['DRAWDOWN']['INTERVAL'])
+
+        if any(mt5["DRAWDOWN_RULES"] is not None for mt5 in account_config["MT5"]):
+            supervisor.add("drawdown", watch_drawdown)
+            supervisor.on_shutdown(lambda: supervisor.cancel("drawdown"))
+
+        async def watch_tp_ladder():
+            # Partial closes at the take profits of the positions opened once per signal
+            while True:
+                await broker.call(watch_tp_ladder_multi_account, account_config, ladder)
+                await asyncio.sleep(env_dict['TP_LADDER_INTERVAL'])
+
+        if ladder is not None:
+            supervisor.add("tp-ladder", watch_tp_ladder)
+            supervisor.on_shutdown(lambda: supervisor.cancel("tp-ladder"))
+    await trade_executor.seed(account_config)
+    route_table = RouteTable(db, cache=config_cache)
+    route_table.start()
+    analyzer = TelegramAnalyzer(config=account_config, db_handler=db, journal=journal, route_table=route_table,
+                                entity_cache=EntityCache(env_dict['ENTITY_CACHE_PATH']),
+                                edit_window=env_dict['EDIT_DEBOUNCE_SECONDS'], broker=broker,
+                                executor=trade_executor)
+    journal_replayer.start()
+    archiver = HistoryArchiver(db, env_dict['ARCHIVE_DIR'], env_dict['RETENTION_MONTHS'])
+    archiver.start()
+    trade_feed = TradeFeed(db, [mt5["ACCOUNT"] for mt5 in account_config["MT5"]])
+    trade_feed.start()
 
-    async def check_metatrader():
+    async def reconcile_open_trades():
         while True:
-            verify_open_trades_or_be(account_config,db)
-    #await asyncio.gather(run_analyzer(), check_metatrader())
-    #await asyncio.gather(run_analyzer())
-    def start_run_analyzer():
-        asyncio.run(run_analyzer())
+            await trade_executor.reconcile(account_config, db, journal, trade_feed)
+            await asyncio.sleep(2)
 
-    def start_check_metatrader():
-        asyncio.run(check_metatrader())
+    def stop_background_threads():
+        for worker in (trade_feed, route_table, archiver, journal_replayer):
+            worker.stop()
+        journal.close()
 
-    thread_analyzer = threading.Thread(target=start_run_analyzer)
-    thread_metatrader = threading.Thread(target=start_check_metatrader)
-    thread_analyzer.start()
-    thread_metatrader.start()
-    thread_analyzer.join()
-    thread_metatrader.join()
+    # One event loop runs the Telegram sessions, the signal queue and the reconciler; MT5 calls go to the broker thread
+    supervisor.add("analyzer", analyzer.start)
+    supervisor.add("reconciler", reconcile_open_trades)
+    # Shutdown drains the signals in flight before the broker finishes its last orders and the journal is closed
+    supervisor.on_shutdown(analyzer.stop)
+    supervisor.on_shutdown(lambda: supervisor.cancel("reconciler"))
+    supervisor.on_shutdown(broker.shutdown)
+    if env_dict['EXECUTION_MODE'] == 'process':
+        supervisor.on_shutdown(lambda: supervisor.cancel("executors"))
+        supervisor.on_shutdown(signal_bus.stop)
+        supervisor.on_shutdown(executors.stop)
+    supervisor.on_shutdown(stop_background_threads)
+    await supervisor.run()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules import each other from the project root, e.g. "from data.record import Record"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
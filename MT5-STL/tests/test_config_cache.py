@@ -0,0 +1,38 @@
+from decimal import Decimal
+import pytest
+from data.account import Account
+from data.channelRoute import ChannelRoute
+from data.configCache import ConfigCache
+
+
+def _routes():
+    return [ChannelRoute(chat_id=-100123, dst_chat_id=-100456, name='Gold', accounts='1,2', priority=1)]
+
+
+def _database_down():
+    raise AttributeError("'NoneType' object has no attribute 'cursor'")
+
+
+def test_load_falls_back_to_the_cached_records(tmp_path):
+    path = str(tmp_path / 'config.json')
+    assert ConfigCache(path).load('channel_route', ChannelRoute, _routes) == _routes()
+    assert ConfigCache(path).load('channel_route', ChannelRoute, _database_down) == _routes()
+
+
+def test_load_raises_when_nothing_is_cached(tmp_path):
+    with pytest.raises(AttributeError):
+        ConfigCache(str(tmp_path / 'config.json')).load('channel_route', ChannelRoute, _database_down)
+
+
+def test_load_keeps_the_cache_when_no_record_is_found():
+    cache = ConfigCache()
+    cache.load('channel_route', ChannelRoute, _routes)
+    assert cache.load('channel_route', ChannelRoute, lambda: None) is None
+    assert cache.get('channel_route', ChannelRoute) == _routes()
+
+
+def test_numeric_columns_are_cached_as_floats(tmp_path):
+    path = str(tmp_path / 'config.json')
+    account = Account(1, 'server', 'ftmo', Decimal('1000.50'), 'pwd', 'dev', 'id', 'phone', 'session', '-100123', 'hash')
+    ConfigCache(path).store('account', [account])
+    assert ConfigCache(path).get('account', Account)[0].mt5_balance == 1000.5
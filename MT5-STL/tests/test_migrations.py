@@ -0,0 +1,79 @@
+import os
+import re
+import pytest
+from data.account import Account
+from data.channelRoute import ChannelRoute
+from data.trade import Trade
+from data.tg_message import Message
+from data.tradeUpdate import TradeUpdate
+
+MODELS = (Message, Trade, TradeUpdate, Account, ChannelRoute)
+# dbHandler.MIGRATIONS_DIR, not imported so the tests run without psycopg2.
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'migrations')
+
+CREATE_TABLE = re.compile(r"CREATE TABLE (?:IF NOT EXISTS )?(\w+)\s*\(", re.IGNORECASE)
+ADD_COLUMN = re.compile(r"ALTER TABLE (?:IF EXISTS )?(\w+) ADD COLUMN (?:IF NOT EXISTS )?(\w+)", re.IGNORECASE)
+DROP_COLUMN = re.compile(r"ALTER TABLE (?:IF EXISTS )?(\w+) DROP COLUMN (?:IF EXISTS )?(\w+)", re.IGNORECASE)
+RENAME_TABLE = re.compile(r"ALTER TABLE (?:IF EXISTS )?(\w+) RENAME TO (\w+)", re.IGNORECASE)
+DROP_TABLE = re.compile(r"DROP TABLE (?:IF EXISTS )?(\w+)", re.IGNORECASE)
+# Table constraints listed with the columns of a CREATE TABLE.
+CONSTRAINTS = {'primary', 'foreign', 'unique', 'check', 'constraint', 'exclude'}
+
+
+def _column_list(statement, start):
+    """Return the column names of the parenthesized definition opening at start."""
+    depth, item, items = 0, '', []
+    for char in statement[start:]:
+        if char == '(':
+            depth += 1
+            if depth == 1:
+                continue
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                break
+        if char == ',' and depth == 1:
+            items.append(item)
+            item = ''
+        else:
+            item += char
+    items.append(item)
+    names = [item.split()[0].lower() for item in items if item.strip()]
+    return {name for name in names if name not in CONSTRAINTS}
+
+
+def _schema(migrations_dir=MIGRATIONS_DIR):
+    """Replay the CREATE/ALTER/DROP TABLE statements of the migrations, return the columns of each table."""
+    tables = {}
+    files = sorted(file_name for file_name in os.listdir(migrations_dir) if file_name.endswith('.sql'))
+    for file_name in files:
+        with open(os.path.join(migrations_dir, file_name)) as file:
+            script = re.sub(r"--[^\n]*", "", file.read())
+        for statement in script.split(';'):
+            if match := CREATE_TABLE.search(statement):
+                tables[match.group(1).lower()] = _column_list(statement, match.end() - 1)
+            elif match := ADD_COLUMN.search(statement):
+                tables[match.group(1).lower()].add(match.group(2).lower())
+            elif match := DROP_COLUMN.search(statement):
+                tables[match.group(1).lower()].discard(match.group(2).lower())
+            elif match := RENAME_TABLE.search(statement):
+                tables[match.group(2).lower()] = tables.pop(match.group(1).lower())
+            elif match := DROP_TABLE.search(statement):
+                tables.pop(match.group(1).lower(), None)
+    return tables
+
+
+def test_migrations_define_every_table():
+    assert {model.TABLE for model in MODELS} <= set(_schema())
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_migrations_define_the_model_columns(model):
+    assert set(model.COLUMNS) <= _schema()[model.TABLE]
+
+
+def test_schema_follows_renames_and_added_columns():
+    schema = _schema()
+    assert 'tg_src_chat_id' in schema['trade']
+    assert 'created_at' in schema['tradeupdate']
+    assert 'tg_message_unpartitioned' not in schema
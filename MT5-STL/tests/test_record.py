@@ -0,0 +1,71 @@
+from dataclasses import fields
+import pytest
+from data.trade import Trade
+from data.tg_message import Message
+from data.tradeUpdate import TradeUpdate
+
+MODELS = (Trade, Message, TradeUpdate)
+
+
+def _trade_row(columns=Trade.COLUMNS):
+    values = {
+        'trade_id': 1, 'msg_id': 2, 'order_id': 3, 'account_id': 4, 'symbol': 'XAUUSD', 'direction': 'buy',
+        'entry_price': 2000.0, 'stop_loss': 1990.0, 'take_profit': 2020.0, 'break_even': 0.0, 'volume': 0.1,
+        'status': 'open', 'tg_src_chat_id': '-100123',
+    }
+    return tuple(values[column] for column in columns)
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_columns_map_every_field(model):
+    assert set(model.COLUMNS) == {field.name for field in fields(model)}
+    assert len(model.COLUMNS) == len(set(model.COLUMNS))
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_update_columns_are_columns(model):
+    assert set(model.UPDATE_COLUMNS) <= set(model.COLUMNS)
+
+
+def test_from_record_maps_by_column_name():
+    columns = tuple(reversed(Trade.COLUMNS))
+    trade = Trade.from_record(_trade_row(columns), columns)
+    assert trade == Trade.from_record(_trade_row())
+    assert (trade.trade_id, trade.order_id, trade.volume, trade.status) == (1, 3, 0.1, 'open')
+
+
+def test_from_record_leaves_missing_columns_to_none():
+    message = Message.from_record((7, 42, -100123), Message.KEY_COLUMNS)
+    assert (message.msg_id, message.tg_msg_id, message.tg_chat_id) == (7, 42, '-100123')
+    assert message.msg_body is None and message.msg_status is None
+
+
+def test_changes_empty_after_load():
+    assert Trade.from_record(_trade_row()).changes() == {}
+
+
+def test_changes_reports_modified_columns_only():
+    trade = Trade.from_record(_trade_row())
+    trade.stop_loss = 2000.0
+    trade.break_even = 2000.0
+    assert trade.changes() == {'stop_loss': 2000.0, 'break_even': 2000.0}
+    trade.stop_loss = 1990.0
+    assert trade.changes() == {'break_even': 2000.0}
+
+
+def test_mark_clean_resets_changes():
+    trade = Trade.from_record(_trade_row())
+    trade.status = 'close'
+    trade.mark_clean()
+    assert trade.changes() == {}
+
+
+def test_changes_reports_every_column_of_a_new_instance():
+    update = TradeUpdate(trade_id=1, order_id=3, account_id=4, update_action='BE', update_body='sl to entry')
+    assert update.changes() == update.to_dict()
+    assert set(update.changes()) == set(TradeUpdate.UPDATE_COLUMNS)
+
+
+def test_select_list():
+    assert TradeUpdate.select_list(alias='tu') == ', '.join(f"tu.{column}" for column in TradeUpdate.COLUMNS)
+    assert Message.select_list(Message.KEY_COLUMNS) == 'msg_id, tg_msg_id, tg_chat_id'
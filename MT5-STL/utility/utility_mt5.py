@@ -1,132 +1,240 @@
 from business.mt5Handler import MetatraderHandler  # Importa la tua classe
 import time
+from functools import partial
+from datetime import datetime, timezone
 
 from data.trade import Trade
 from data.tradeUpdate import TradeUpdate
-from utility.utility_tg import create_trade_entries
+from utility.utility_tg import create_trade_entries, diff_trade_levels
 import logging
 logger = logging.getLogger(__name__)
 
-def open_trades_multi_account(parsed_text, config, db_message_id):
+# Every *_account function works on the terminal of one account, already initialized, and only on the trades
+# of that account; the *_multi_account functions log in to each configured account in turn and call them.
+
+def open_trades_account(mt_handler, mt5, parsed_text, db_message_id, tg_src_chat_id=None, risk_engine=None, sizer=None, ladder=None):
+    trade_results = []
+    trades = create_trade_entries(parsed_text, db_message_id, mt5, partial(sizer.lots, mt_handler) if sizer is not None else None, ladder is not None)
+    n_trades_to_open = len(trades) if len(trades) > 1 else trades[0]["n_trades"]
+    for i in range(0, n_trades_to_open, 1):
+        trade = trades[i] if len(trades) > 1 else trades[0]
+        if risk_engine is not None:
+            # Market signals carry no entry price, the risk is measured from the current price
+            entry_price = trade['entry_price'] or mt_handler.get_price(trade['symbol'], trade['direction'])
+            if risk_engine.check(mt5["ACCOUNT"], trade['symbol'], trade['direction'], trade['lot_size'], entry_price, trade['SL'], mt_handler.get_symbol_value):
+                continue
+        trade_id = mt_handler.open_trade(trade)
+        if trade_id:
+            if risk_engine is not None:
+                risk_engine.on_fill(mt5["ACCOUNT"], int(trade_id), trade['symbol'], trade['direction'], trade['lot_size'], entry_price, trade['SL'])
+            if ladder is not None and trade.get('ladder'):
+                ladder.add(mt_handler, int(trade_id), trade['symbol'], trade['direction'], trade['lot_size'], trade['ladder'])
+            trade = Trade(
+                msg_id=int(trade['db_message_id']),
+                order_id=int(trade_id),
+                status='open',
+                break_even=0.0,
+                symbol=trade['symbol'],
+                direction=trade['direction'],
+                volume=trade['lot_size'],
+                stop_loss=trade['SL'],
+                take_profit=trade['TP'],
+                entry_price=trade['entry_price'],
+                account_id=int(trade['account_id']),
+                tg_src_chat_id=tg_src_chat_id
+            )
+            trade_results.append(trade)
+    return trade_results
+
+def update_trades_account(mt_handler, mt5, trades_to_update, msg_parsed_text, db_message_id, msg_raw_text, risk_engine=None, ladder=None, previous_parsed_text=None):
+    trade_updates_result, trades_updated = [], []
+    trades = create_trade_entries(msg_parsed_text, db_message_id, mt5, ladder=ladder is not None)
+    previous_trades = create_trade_entries(previous_parsed_text, db_message_id, mt5, ladder=ladder is not None) if previous_parsed_text else []
+    subset_trades_to_update = [item for item in trades_to_update if item.account_id == mt5["ACCOUNT"]]
+    positions = mt_handler.get_positions_snapshot() if subset_trades_to_update else {}
+    modifications = []
+    for i in range(0, len(subset_trades_to_update), 1):
+        trade = subset_trades_to_update[i]
+        new_sl = trades[i]['SL'] if 'SL' in trades[i] and trades[i]['SL'] != 0 else None
+        new_tp = trades[i]['TP'] if 'TP' in trades[i] and trades[i]['TP'] != 0 else None
+        if ladder is not None and trades[i].get('ladder'):
+            ladder.set_levels(trade.account_id, trade.order_id, trades[i]['ladder'])
+        # Only the levels that changed since the stored version of the signal are sent to MT5
+        modified = diff_trade_levels(trade, new_sl, new_tp, previous_trades[i] if i < len(previous_trades) else None)
+        if not modified:
+            continue
+        new_sl = new_sl if 'stop_loss' in modified else None
+        new_tp = new_tp if 'take_profit' in modified else None
+        modifications.append((trade, new_sl, new_tp))
+    done = set()
+    if modifications:
+        done = set(mt_handler.modify_positions([(trade.order_id, new_sl, new_tp) for trade, new_sl, new_tp in modifications], positions)['done'])
+    for trade, new_sl, new_tp in modifications:
+        # The levels rejected by MT5 are not stored
+        if int(trade.order_id) not in done:
+            continue
+        if risk_engine is not None:
+            risk_engine.on_modify(trade.account_id, trade.order_id, new_sl)
+        trade.stop_loss = new_sl if new_sl is not None else trade.stop_loss
+        trade.take_profit = new_tp if new_tp is not None else trade.take_profit
+        trade_update = TradeUpdate(
+            trade_id=trade.trade_id,
+            order_id=trade.order_id,
+            account_id=trade.account_id,
+            update_action="UPDATE",
+            update_body=msg_raw_text
+        )
+        trade_updates_result.append(trade_update)
+        trades_updated.append(trade)
+    return trades_updated, trade_updates_result
+
+def update_trades_be_account(mt_handler, mt5, trades_to_update, msg_parsed_text, msg_raw_text, risk_engine=None):
+    trade_updates_result = []
+    subset_trades_to_update = [trade for trade in trades_to_update if trade.account_id == mt5["ACCOUNT"]]
+    new_sl = msg_parsed_text['stop_loss'] if msg_parsed_text['stop_loss'] is not None and msg_parsed_text[
+        'stop_loss'] != 0 else None
+    outcome = mt_handler.break_even_positions([trade.order_id for trade in subset_trades_to_update], new_sl)
+    done = set(outcome['done'])
+    for trade in subset_trades_to_update:
+        updated_sl = outcome['levels'][int(trade.order_id)] if int(trade.order_id) in done else None
+        if updated_sl:
+            if risk_engine is not None:
+                risk_engine.on_modify(trade.account_id, trade.order_id, updated_sl)
+            trade.stop_loss = updated_sl
+            trade.break_even = updated_sl
+            trade_update = TradeUpdate(
+                trade_id=trade.trade_id,
+                order_id=trade.order_id,
+                account_id=trade.account_id,
+                update_action="BE",
+                update_body=msg_raw_text
+            )
+            trade_updates_result.append(trade_update)
+    return subset_trades_to_update, trade_updates_result
+
+def close_trades_account(mt_handler, mt5, trades_to_close, msg_raw_text, risk_engine=None):
+    trade_updates_result = []
+    subset_trades_to_close = [trade for trade in trades_to_close if trade.account_id == mt5["ACCOUNT"]]
+    positions = mt_handler.get_positions_snapshot()
+    # One snapshot and one tick per symbol for the whole signal, the requests are sent back-to-back
+    closed = set(mt_handler.close_positions([trade.order_id for trade in subset_trades_to_close], positions)['done'])
+    for trade in subset_trades_to_close:
+        if int(trade.order_id) in closed:
+            if risk_engine is not None:
+                # The profit of the snapshot taken just before the close stands for the realized PnL
+                position = positions.get(int(trade.order_id))
+                risk_engine.on_close(trade.account_id, trade.order_id, position.profit if position is not None else None)
+            trade.status = 'close'
+            trade_update = TradeUpdate(
+                trade_id=trade.trade_id,
+                order_id=trade.order_id,
+                account_id=trade.account_id,
+                update_action="CLOSE",
+                update_body=msg_raw_text
+            )
+            trade_updates_result.append(trade_update)
+    return subset_trades_to_close, trade_updates_result
+
+def reconcile_trades_account(mt_handler, open_trades_db, risk_engine=None):
+    open_trades_mt5 = mt_handler.get_positions_snapshot(strict=True)
+    if open_trades_mt5 is None:
+        # Without a snapshot every trade would look closed, the next pass checks them again
+        return []
+    trades_to_update = []
+    for msg_id, trades in open_trades_db.items():
+        order_ids = [trade.order_id for trade in trades]
+        if not all(order_id in open_trades_mt5 for order_id in order_ids):
+            logger.info(f"Not all order_ids for message {msg_id} are in MT5 positions.")
+            for trade in trades:
+                if trade.order_id not in open_trades_mt5:
+                    trade.status = 'close'
+                    if risk_engine is not None and risk_engine.tracks(trade.account_id, trade.order_id):
+                        # Closed on the terminal (SL, TP or by hand), the PnL comes from the deals history
+                        risk_engine.on_close(trade.account_id, trade.order_id, mt_handler.get_closed_profit(trade.order_id))
+                else:
+                    new_sl = mt_handler.update_trade_break_even(trade.order_id, None, open_trades_mt5)
+                    if risk_engine is not None:
+                        risk_engine.on_modify(trade.account_id, trade.order_id, new_sl)
+                    trade.stop_loss = new_sl
+                    trade.break_even = new_sl
+                trades_to_update.append(trade)
+    return trades_to_update
+
+def seed_risk_account(mt_handler, mt5, risk_engine):
+    positions = mt_handler.get_positions_snapshot(strict=True)
+    if positions is None:
+        # An empty exposure would let every order through, the account is rejected until seeded again
+        risk_engine.seed_failed(mt5["ACCOUNT"])
+        return
+    midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    risk_engine.seed(mt5["ACCOUNT"], positions, mt_handler.get_realized_profit(midnight), mt_handler.get_symbol_value)
+
+def monitor_drawdown_account(mt_handler, mt5, monitor):
+    if mt5.get("DRAWDOWN_RULES") is not None:
+        monitor.poll(mt_handler, mt5["DRAWDOWN_RULES"], mt5.get("BALANCE"))
+
+def watch_tp_ladder_account(mt_handler, ladder):
+    if ladder.watches(mt_handler.account):
+        ladder.poll(mt_handler)
+
+def get_account_handler(mt5):
+    mt_handler = MetatraderHandler(account=mt5["ACCOUNT"], password=mt5["PASSWORD"], server=mt5["SERVER"], path=mt5.get("TERMINAL_PATH"))
+    mt_handler.initialize_mt5()
+    return mt_handler
+
+def seed_risk_multi_account(config, risk_engine):
+    for mt5 in config["MT5"]:
+        seed_risk_account(get_account_handler(mt5), mt5, risk_engine)
+
+def monitor_drawdown_multi_account(config, monitor):
+    for mt5 in config["MT5"]:
+        if mt5.get("DRAWDOWN_RULES") is not None:
+            monitor_drawdown_account(get_account_handler(mt5), mt5, monitor)
+
+def watch_tp_ladder_multi_account(config, ladder):
+    # Only the accounts with watched positions are logged in to
+    for mt5 in config["MT5"]:
+        if ladder.watches(mt5["ACCOUNT"]):
+            ladder.poll(get_account_handler(mt5))
+
+def open_trades_multi_account(parsed_text, config, db_message_id, tg_src_chat_id=None, risk_engine=None, sizer=None, ladder=None):
     trade_results = []
     for mt5 in config["MT5"]:
-        mt_handler= MetatraderHandler(account=mt5["ACCOUNT"], password=mt5["PASSWORD"], server=mt5["SERVER"])
-        mt_handler.initialize_mt5()
-        trades = create_trade_entries(parsed_text, db_message_id, mt5)
-        n_trades_to_open = len(trades) if len(trades) > 1 else trades[0]["n_trades"]
-        for i in range(0, n_trades_to_open, 1):
-            trade = trades[i] if len(trades) > 1 else trades[0]
-            trade_id = mt_handler.open_trade(trade)
-            if trade_id:
-                trade = Trade(
-                    msg_id=int(trade['db_message_id']),
-                    order_id=int(trade_id),
-                    status='open',
-                    break_even=0.0,
-                    symbol=trade['symbol'],
-                    direction=trade['direction'],
-                    volume=trade['lot_size'],
-                    stop_loss=trade['SL'],
-                    take_profit=trade['TP'],
-                    entry_price=trade['entry_price'],
-                    account_id=int(trade['account_id'])
-                )
-                trade_results.append(trade)
+        trade_results.extend(open_trades_account(get_account_handler(mt5), mt5, parsed_text, db_message_id, tg_src_chat_id, risk_engine, sizer, ladder))
     return trade_results
 
-def update_trades_multi_account(trades_to_update, config, msg_parsed_text, db_message_id, msg_raw_text):
+def update_trades_multi_account(trades_to_update, config, msg_parsed_text, db_message_id, msg_raw_text, risk_engine=None, ladder=None, previous_parsed_text=None):
     trade_updates_result, trades_updated = [], []
     for mt5 in config["MT5"]:
-        mt_handler= MetatraderHandler(account=mt5["ACCOUNT"], password=mt5["PASSWORD"], server=mt5["SERVER"])
-        mt_handler.initialize_mt5()
-        trades = create_trade_entries(msg_parsed_text, db_message_id, mt5)
-        subset_trades_to_update = [item for item in trades_to_update if item.account_id == mt5["ACCOUNT"]]
-        for i in range(0, len(subset_trades_to_update), 1):
-            trade = subset_trades_to_update[i]
-            if trade.account_id == mt5["ACCOUNT"] :
-                new_sl = trades[i]['SL'] if 'SL' in trades[i] and trades[i]['SL'] != 0 else None
-                new_tp = trades[i]['TP'] if 'TP' in trades[i] and trades[i]['TP'] != 0 else None
-                mt_handler.update_trade(trade.order_id, new_sl, new_tp)
-                trade.stop_loss = new_sl
-                trade.take_profit = new_tp
-                trade_update = TradeUpdate(
-                    trade_id=trade.trade_id,
-                    order_id=trade.order_id,
-                    account_id=trade.account_id,
-                    update_action="UPDATE",
-                    update_body=msg_raw_text
-                )
-                trade_updates_result.append(trade_update)
-                trades_updated.append(trade)
-            else:
-                continue
+        updated, updates = update_trades_account(get_account_handler(mt5), mt5, trades_to_update, msg_parsed_text, db_message_id, msg_raw_text, risk_engine, ladder, previous_parsed_text)
+        trades_updated.extend(updated)
+        trade_updates_result.extend(updates)
     return trades_updated, trade_updates_result
 
-def update_trades_be_multi_account(trades_to_update, config, msg_parsed_text, msg_raw_text):
+def update_trades_be_multi_account(trades_to_update, config, msg_parsed_text, msg_raw_text, risk_engine=None):
     trade_updates_result = []
     for mt5 in config["MT5"]:
-        mt_handler= MetatraderHandler(account=mt5["ACCOUNT"], password=mt5["PASSWORD"], server=mt5["SERVER"])
-        mt_handler.initialize_mt5()
-        for trade in trades_to_update:
-            if trade.account_id == mt5["ACCOUNT"]:
-                new_sl = msg_parsed_text['stop_loss'] if msg_parsed_text['stop_loss'] is not None and msg_parsed_text[
-                    'stop_loss'] != 0 else None
-                updated_sl = mt_handler.update_trade_break_even(trade.order_id, new_sl)
-                if updated_sl:
-                    trade.stop_loss = updated_sl
-                    trade.break_even = updated_sl
-                    trade_update = TradeUpdate(
-                        trade_id=trade.trade_id,
-                        order_id=trade.order_id,
-                        account_id=trade.account_id,
-                        update_action="BE",
-                        update_body=msg_raw_text
-                    )
-                    trade_updates_result.append(trade_update)
-            else:
-                continue
+        _, updates = update_trades_be_account(get_account_handler(mt5), mt5, trades_to_update, msg_parsed_text, msg_raw_text, risk_engine)
+        trade_updates_result.extend(updates)
     return trades_to_update, trade_updates_result
 
-def close_trades_multi_account(trades_to_close, config, msg_raw_text):
+def close_trades_multi_account(trades_to_close, config, msg_raw_text, risk_engine=None):
     trade_updates_result = []
     for mt5 in config["MT5"]:
-        mt_handler= MetatraderHandler(account=mt5["ACCOUNT"], password=mt5["PASSWORD"], server=mt5["SERVER"])
-        mt_handler.initialize_mt5()
-        for trade in trades_to_close:
-            if trade.account_id == mt5["ACCOUNT"]:
-                response_close = mt_handler.close_trade(trade.order_id)
-                if response_close:
-                    trade.status = 'close'
-                    trade_update = TradeUpdate(
-                        trade_id=trade.trade_id,
-                        order_id=trade.order_id,
-                        account_id=trade.account_id,
-                        update_action="CLOSE",
-                        update_body=msg_raw_text
-                    )
-                    trade_updates_result.append(trade_update)
-            else:
-                continue
+        _, updates = close_trades_account(get_account_handler(mt5), mt5, trades_to_close, msg_raw_text, risk_engine)
+        trade_updates_result.extend(updates)
     return trades_to_close, trade_updates_result
 
-def verify_open_trades_or_be(config, db):
+def verify_open_trades_or_be(config, db, writer=None, trade_feed=None, risk_engine=None):
     for mt5 in config["MT5"]:
-        mt_handler = MetatraderHandler(account=mt5["ACCOUNT"], password=mt5["PASSWORD"], server=mt5["SERVER"])
-        open_trades_db = db.get_all_trades(mt5["ACCOUNT"])
+        if risk_engine is not None and risk_engine.needs_seed(mt5["ACCOUNT"]):
+            seed_risk_account(get_account_handler(mt5), mt5, risk_engine)
+        # The change feed keeps the open trades in memory, the database is only queried without it
+        open_trades_db = trade_feed.get_open_trades(mt5["ACCOUNT"]) if trade_feed else db.get_all_trades(mt5["ACCOUNT"])
         if open_trades_db:
-            mt_handler.initialize_mt5()
-            open_trades_mt5 = mt_handler.get_all_position()
-            for msg_id, trades in open_trades_db.items():
-                order_ids = [trade.order_id for trade in trades]
-                if not all(order_id in open_trades_mt5 for order_id in order_ids):
-                    logger.info(f"Not all order_ids for message {msg_id} are in MT5 positions.")
-                    for trade in trades:
-                        if trade.order_id not in open_trades_mt5:
-                            trade.status = 'close'
-                        else:
-                            new_sl = mt_handler.update_trade_break_even(trade.order_id, None)
-                            trade.stop_loss = new_sl
-                            trade.break_even = new_sl
-                        db.update_trade(trade)
-
-
+            trades_to_update = reconcile_trades_account(get_account_handler(mt5), open_trades_db, risk_engine)
+            # Unchanged trades are skipped, the others are written with one statement
+            (writer or db).update_trades(trades_to_update)
+            if trade_feed:
+                # The view does not wait for the notification of the journaled writes
+                trade_feed.apply_trades(trades_to_update)
@@ -1,9 +1,19 @@
 import logging
 import re
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# Alternative names used by channels and brokers for the same instrument.
+INSTRUMENT_ALIASES = {
+    'XAUUSD': ['XAU', 'GOLD'],
+    'US30': ['DJ30', 'DJI30', 'DOW', 'DOW30', 'DJI'],
+    'NAS100': ['NDX100', 'US100', 'NDX', 'NAS', 'USTEC'],
+    'EURUSD': ['EUR'],
+}
+MIN_ALIAS_LENGTH = 3
+
+
 def prefilter_message(message: str) -> bool:
     """Prefilter the message to remove unwanted characters."""
     try:
@@ -102,18 +112,150 @@ def extract_trade_data(message: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def create_trade_entries(trade_data: Dict[str, Any], message_id: str, account_config: Dict[str, Any]) -> list[
-    Dict[str, Any]]:
-    """Create structured trade dictionaries from extracted trade data."""
+# Parsers of the signal messages, selected per source channel by the parser_profile of its route.
+PARSER_PROFILES = {
+    'default': extract_trade_data,
+}
+
+
+def parse_message(message: str, parser_profile: str = 'default') -> Optional[Dict[str, Any]]:
+    """Parse a message with the parser of a profile, the default parser for unknown profiles."""
+    return PARSER_PROFILES.get(parser_profile, extract_trade_data)(message)
+
+
+def find_modified_properties(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare two dictionaries, recursively for nested ones.
+
+    Returns:
+        Dict[str, Any]: Key -> (value in dict1, value in dict2) for every value that differs, 0 standing
+            for the keys missing from dict2.
+    """
+    modified = {}
+    all_keys = set(dict1.keys()).union(set(dict2.keys()))
+
+    for key in all_keys:
+        if key not in dict2:
+            modified[key] = (dict1[key], 0)
+        elif key not in dict1:
+            modified[key] = (0, dict2[key])
+        elif dict1[key] != dict2[key]:
+            if isinstance(dict1[key], dict) and isinstance(dict2[key], dict):
+                nested_modified = find_modified_properties(dict1[key], dict2[key])
+                if nested_modified:
+                    modified[key] = nested_modified
+            else:
+                modified[key] = (dict1[key], dict2[key])
+
+    return modified
+
+
+def diff_trade_levels(trade: Any, new_sl: Optional[float], new_tp: Optional[float],
+                      previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Return the SL/TP of an edited signal that the provider changed.
+
+    The edit is compared with the previous version of the signal, so a level moved on the trade since,
+    e.g. a break even, is not undone by an edit that leaves it as it was. Without the previous version
+    it is compared with the levels stored on the trade.
+
+    Args:
+        trade (Any): The stored Trade.
+        new_sl (Optional[float]): The stop loss of the edited signal, None to keep the current one.
+        new_tp (Optional[float]): The take profit of the edited signal, None to keep the current one.
+        previous (Optional[Dict[str, Any]]): The entry of the trade built from the stored signal, see create_trade_entries().
+
+    Returns:
+        Dict[str, Any]: 'stop_loss' and/or 'take_profit' -> (new value, previous value), empty if nothing changed.
+    """
+    target = {key: value for key, value in (('stop_loss', new_sl), ('take_profit', new_tp)) if value is not None}
+    if previous is not None:
+        stored = {'stop_loss': previous.get('SL'), 'take_profit': previous.get('TP')}
+    else:
+        stored = {key: getattr(trade, key) for key in target}
+    return find_modified_properties(target, {key: stored[key] for key in target})
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Normalize an instrument token, dropping broker suffixes such as '+' or '.cash'."""
+    symbol = symbol.strip().upper()
+    return re.split(r'[^A-Z0-9]', symbol, maxsplit=1)[0] or symbol
+
+
+def build_symbol_index(symbol_configs: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the alias index of an account's symbol configuration.
+
+    Every instrument is reachable by its name, its broker symbol (with and without suffix), the known
+    aliases in INSTRUMENT_ALIASES and, as the old substring lookup did, any part of its name of at
+    least MIN_ALIAS_LENGTH characters. Tokens matching more than one instrument are left out of the
+    index and reported here, once, instead of being resolved arbitrarily at trade time.
+
+    Args:
+        symbol_configs (Dict[str, Dict[str, Any]]): Instrument name mapped to its symbol configuration.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Normalized token mapped to the symbol configuration.
+    """
+    exact, partial = {}, {}
+    for instrument, symbol_data in symbol_configs.items():
+        instrument = normalize_symbol(instrument)
+        broker_symbol = str(symbol_data.get('symbol') or instrument)
+        aliases = {instrument, broker_symbol.upper(), normalize_symbol(broker_symbol), *INSTRUMENT_ALIASES.get(instrument, [])}
+        for alias in aliases:
+            exact.setdefault(alias, {})[instrument] = symbol_data
+        for start in range(len(instrument)):
+            for end in range(start + MIN_ALIAS_LENGTH, len(instrument) + 1):
+                partial.setdefault(instrument[start:end], {})[instrument] = symbol_data
+
+    index, ambiguous = {}, {}
+    for token, matches in partial.items():
+        if len(matches) == 1:
+            index[token] = next(iter(matches.values()))
+        else:
+            ambiguous[token] = sorted(matches)
+    for token, matches in exact.items():
+        if len(matches) == 1:
+            index[token] = next(iter(matches.values()))
+            ambiguous.pop(token, None)
+        else:
+            index.pop(token, None)
+            ambiguous[token] = sorted(matches)
+
+    if ambiguous:
+        logger.warning(f"⚠️ Ambiguous instrument aliases, not resolved: {ambiguous}")
+    return index
+
+
+def create_trade_entries(trade_data: Dict[str, Any], message_id: str, account_config: Dict[str, Any],
+                         size_lots: Optional[Callable[..., Optional[float]]] = None, ladder: bool = False) -> list[Dict[str, Any]]:
+    """
+    Create structured trade dictionaries from extracted trade data.
+
+    Args:
+        trade_data (Dict[str, Any]): The parsed signal.
+        message_id (str): The database ID of the signal message.
+        account_config (Dict[str, Any]): The configuration of the account the trades are opened on.
+        size_lots (Optional[Callable[..., Optional[float]]]): Computes the lots of each position from the risk
+            of the signal, see PositionSizer.lots() bound to the handler of the account. The configured lot
+            size applies when it is None or returns None.
+        ladder (bool): Open a single position for a signal with several take profits, see TpLadder. Its entry
+            holds the volume of all of them, the last take profit as TP and the others as 'ladder'.
+
+    Returns:
+        list[Dict[str, Any]]: One entry per take profit, or a single one in ladder mode, an empty list if the
+        symbol is not configured.
+    """
     try:
         trade_entries = []
         account_id = account_config.get('ACCOUNT')
-        trade_mng = {k.upper(): v for k, v in account_config.get("TRADE_MNG", {}).items()}
-        symbol_key = trade_data['symbol'].upper()
-        symbol_data = trade_mng.get(trade_data['symbol'], {})
-        # If no exact match, search using substring matching.
-        if not symbol_data:
-            symbol_data = next((v for k, v in trade_mng.items() if symbol_key in k), None)
+        symbol_index = account_config.get('SYMBOL_INDEX')
+        if symbol_index is None:
+            symbol_index = build_symbol_index(account_config.get("TRADE_MNG", {}))
+        symbol_data = symbol_index.get(normalize_symbol(trade_data['symbol']))
+        if symbol_data is None:
+            logger.error(f"❌ No symbol configuration for instrument {trade_data['symbol']} on account {account_id}")
+            return []
 
         trade_template = {
             'symbol': symbol_data.get('symbol'),
@@ -129,8 +271,20 @@ def create_trade_entries(trade_data: Dict[str, Any], message_id: str, account_co
         take_profits = trade_data.get('take_profits', [])
         selected_tps = take_profits[-3:] if len(take_profits) >= 6 else take_profits[-2:]
 
+        if size_lots is not None:
+            # The risk of the signal is split between the positions opened for it
+            n_positions = len(selected_tps) if len(selected_tps) > 1 else trade_template['n_trades']
+            lot_size = size_lots(trade_template['symbol'], trade_template['direction'], trade_template['entry_price'],
+                                 trade_template['SL'], n_positions, symbol_data.get('risk_percent'))
+            if lot_size:
+                trade_template['lot_size'] = lot_size
+
         if not selected_tps:
             trade_entries.append({**trade_template, 'TP': 0})
+        elif ladder and len(selected_tps) > 1:
+            # One position for all the take profits, the ladder closes a part of it at each of them
+            trade_entries.append({**trade_template, 'lot_size': round(trade_template['lot_size'] * len(selected_tps), 8),
+                                  'n_trades': 1, 'TP': selected_tps[-1], 'ladder': selected_tps[:-1]})
         else:
             trade_entries.extend([{**trade_template, 'TP': tp} for tp in selected_tps])
 
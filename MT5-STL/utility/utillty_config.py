@@ -1,5 +1,8 @@
 from dotenv import dotenv_values
 from data.account import Account
+from utility.utility_tg import build_symbol_index
+from business.signalBus import DEFAULT_BUS_ADDRESS
+from business.riskEngine import RiskLimits
 
 def read_env_file(file_path: str) -> dict:
     """
@@ -22,11 +25,78 @@ def read_env_file(file_path: str) -> dict:
             "USER": env_dict.get("DB_USER"),
             "PASSWORD": env_dict.get("DB_PWD")
         },
-        "ENV": env_dict.get("ENVIRONMENT", "DEV")
+        "ENV": env_dict.get("ENVIRONMENT", "DEV"),
+        "JOURNAL_PATH": env_dict.get("JOURNAL_PATH", "journal/signals.journal"),
+        "ENTITY_CACHE_PATH": env_dict.get("ENTITY_CACHE_PATH", "sessions/entities.json"),
+        # Last configuration read from the database, used when it is down at startup
+        "CONFIG_CACHE_PATH": env_dict.get("CONFIG_CACHE_PATH", "sessions/config.json"),
+        "EDIT_DEBOUNCE_SECONDS": float(env_dict.get("EDIT_DEBOUNCE_SECONDS", 2.0)),
+        # 'local' runs the trades on the broker thread, 'process' on one executor process per account
+        "EXECUTION_MODE": env_dict.get("EXECUTION_MODE", "local").lower(),
+        "BUS_ADDRESS": env_dict.get("BUS_ADDRESS", DEFAULT_BUS_ADDRESS),
+        "BUS_WINDOW": int(env_dict.get("BUS_WINDOW", 8)),
+        # account=terminal path pairs separated by ";", e.g. 1234=C:/MT5/ftmo/terminal64.exe
+        "MT5_TERMINAL_PATHS": {
+            int(account): path.strip()
+            for account, _, path in (item.partition("=") for item in env_dict.get("MT5_TERMINAL_PATHS", "").split(";") if item.strip())
+        },
+        "RISK_LIMITS": read_risk_limits(env_dict),
+        # Percent of the equity risked per signal, the configured lot sizes apply when unset
+        "RISK_PER_TRADE_PERCENT": read_optional(env_dict, "RISK_PER_TRADE_PERCENT"),
+        "DRAWDOWN": read_drawdown_settings(env_dict),
+        # 'positions' opens one position per take profit, 'ladder' one position closed in parts at the take profits
+        "TP_MODE": env_dict.get("TP_MODE", "positions").lower(),
+        "TP_LADDER_PATH": env_dict.get("TP_LADDER_PATH", "sessions/tp_ladders.json"),
+        "TP_LADDER_INTERVAL": float(env_dict.get("TP_LADDER_INTERVAL_SECONDS", 0.5)),
+        "ARCHIVE_DIR": env_dict.get("ARCHIVE_DIR", "archive"),
+        "RETENTION_MONTHS": int(env_dict.get("RETENTION_MONTHS", 3))
     }
 
     return customized_dict
 
+def read_risk_limits(env_dict: dict) -> RiskLimits:
+    """
+    Reads the pre-trade risk limits, an unset or empty key disables its limit.
+
+    Args:
+        env_dict (dict): The raw content of the .env file.
+
+    Returns:
+        RiskLimits: The limits applied to every account.
+    """
+    return RiskLimits(
+        max_daily_loss=read_optional(env_dict, "RISK_MAX_DAILY_LOSS"),
+        max_total_lots=read_optional(env_dict, "RISK_MAX_TOTAL_LOTS"),
+        max_symbol_lots=read_optional(env_dict, "RISK_MAX_SYMBOL_LOTS"),
+        max_open_risk=read_optional(env_dict, "RISK_MAX_OPEN_RISK"),
+        max_positions=read_optional(env_dict, "RISK_MAX_POSITIONS", int)
+    )
+
+def read_drawdown_settings(env_dict: dict) -> dict:
+    """
+    Reads the settings of the drawdown monitor, the unset rules are the ones of the broker (see PROP_FIRM_RULES).
+
+    Args:
+        env_dict (dict): The raw content of the .env file.
+
+    Returns:
+        dict: The drawdown settings.
+    """
+    return {
+        "ENABLED": env_dict.get("DRAWDOWN_MONITOR", "true").lower() == "true",
+        "DAILY_LOSS_PERCENT": read_optional(env_dict, "DRAWDOWN_DAILY_LOSS_PERCENT"),
+        "MAX_DRAWDOWN_PERCENT": read_optional(env_dict, "DRAWDOWN_MAX_PERCENT"),
+        # Share of a limit used at which new orders are blocked, and at which every position is closed
+        "BLOCK_AT": read_optional(env_dict, "DRAWDOWN_BLOCK_AT"),
+        "FLATTEN_AT": read_optional(env_dict, "DRAWDOWN_FLATTEN_AT"),
+        "INTERVAL": float(env_dict.get("DRAWDOWN_INTERVAL_SECONDS", 2.0))
+    }
+
+def read_optional(env_dict: dict, key: str, cast=float):
+    """Reads an optional number, None when the key is unset or empty."""
+    value = env_dict.get(key)
+    return cast(value) if value else None
+
 def get_sw_configuration_by_account(accounts: list[Account]):
     config, tmp = {},{}
     tmp["MT5_CONF"] = {
@@ -102,18 +172,23 @@ def get_sw_configuration_by_account(accounts: list[Account]):
         "HASH": accounts[0].tg_hash,
         "PHONE": accounts[0].tg_phone,
         "SESSION": accounts[0].tg_session,
+        # Comma separated session names, the source channels are sharded between them
+        "SESSIONS": [session.strip() for session in accounts[0].tg_session.split(",")],
         "CHANNELS": [int(channel) for channel in accounts[0].tg_channels.split(",")],
-        "DST_CHANNEL_GOLD": -1002404066652,
-        "DST_CHANNEL_INDEX": -1002535578509
+        # Forward destination of the subscribed channels without a channel_route row
+        "DST_CHANNEL": -1002535578509
     }
     element = []
+    symbol_indexes = {broker: build_symbol_index(symbol_configs) for broker, symbol_configs in tmp["MT5_CONF"].items()}
     for account in accounts:
         element.append({
             "ACCOUNT": int(account.mt5_account_id),
             "PASSWORD": account.mt5_password,
             "SERVER": account.mt5_server,
             "BROKER": account.mt5_broker,
-            "TRADE_MNG": tmp["MT5_CONF"][account.mt5_broker.lower()]
+            "BALANCE": float(account.mt5_balance) if account.mt5_balance else None,
+            "TRADE_MNG": tmp["MT5_CONF"][account.mt5_broker.lower()],
+            "SYMBOL_INDEX": symbol_indexes[account.mt5_broker.lower()]
         })
 
     config["MT5"] = element